@@ -0,0 +1,17 @@
+# Gunicorn config for the multi-worker deployment mode
+# Usage: uv run --package backend gunicorn -c backend/gunicorn.conf.py backend.main:app
+# Set BACKEND_STATE_BACKEND=sqlite so that all workers share rate limits and histories.
+import multiprocessing
+import os
+
+bind = f"0.0.0.0:{os.getenv('BACKEND_PORT', '9001')}"
+workers = int(os.getenv("BACKEND_WORKERS", multiprocessing.cpu_count()))
+worker_class = "uvicorn_worker.UvicornWorker"
+
+# Streams can take as long as the upstream LLM answer
+timeout = 120
+graceful_timeout = 30
+keepalive = 75
+
+# Each worker must open its own SQLite connection, never share one across fork
+preload_app = False
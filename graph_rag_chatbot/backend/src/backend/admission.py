@@ -0,0 +1,168 @@
+import asyncio
+from collections import deque
+from contextlib import aclosing
+from typing import AsyncIterator
+
+from fastapi import HTTPException, status
+from interfaces.api_keys import ApiKeyInfo
+from interfaces.telemetry import stage
+from prometheus_client import Counter, Gauge
+
+from backend.config import get_settings
+
+OPEN_STREAMS = Gauge("backend_open_streams", "SSE streams currently open.")
+STREAM_QUEUE_DEPTH = Gauge(
+    "backend_stream_queue_depth", "Stream requests waiting for admission."
+)
+STREAMS_REJECTED = Counter(
+    "backend_streams_rejected_total", "Stream requests rejected with 503.", ["reason"]
+)
+
+
+class StreamPermit:
+    """An admitted stream, released exactly once when the stream ends."""
+
+    def __init__(self, admission: "StreamAdmission", key_name: str) -> None:
+        self._admission = admission
+        self._key_name = key_name
+        self._released = False
+
+    def release(self) -> None:
+        if not self._released:
+            self._released = True
+            self._admission._release(self._key_name)
+
+
+class StreamAdmission:
+    """
+    Admission control for concurrently open SSE streams.
+
+    Caps open streams globally and per API key. A request over the cap waits
+    in a FIFO queue for up to queue_timeout_seconds; when the queue is full or
+    the wait times out it is rejected with 503 and Retry-After, so overload
+    turns into fast rejections instead of every stream slowing down.
+    Waiters blocked only by their own key's cap do not hold up other keys.
+
+    The caps are per worker process.
+    """
+
+    def __init__(
+        self,
+        max_streams: int,
+        max_streams_per_key: int,
+        max_queue: int,
+        queue_timeout_seconds: float,
+        retry_after_seconds: int,
+    ) -> None:
+        self.max_streams = max_streams
+        self.max_streams_per_key = max_streams_per_key
+        self.max_queue = max_queue
+        self.queue_timeout_seconds = queue_timeout_seconds
+        self.retry_after_seconds = retry_after_seconds
+
+        self._open = 0
+        self._open_per_key: dict[str, int] = {}
+        self._waiters: deque[tuple[str, int, asyncio.Future]] = deque()
+
+        OPEN_STREAMS.set_function(lambda: self._open)
+        STREAM_QUEUE_DEPTH.set_function(lambda: len(self._waiters))
+
+    def _can_admit(self, key_name: str, key_limit: int) -> bool:
+        return (
+            self._open < self.max_streams
+            and self._open_per_key.get(key_name, 0) < key_limit
+        )
+
+    def _admit(self, key_name: str) -> None:
+        self._open += 1
+        self._open_per_key[key_name] = self._open_per_key.get(key_name, 0) + 1
+
+    def _release(self, key_name: str) -> None:
+        self._open -= 1
+        remaining = self._open_per_key[key_name] - 1
+        if remaining:
+            self._open_per_key[key_name] = remaining
+        else:
+            del self._open_per_key[key_name]
+        self._wake()
+
+    def _wake(self) -> None:
+        # Admit waiters in arrival order, skipping those blocked by their key's cap
+        for waiter in list(self._waiters):
+            if self._open >= self.max_streams:
+                return
+            key_name, key_limit, future = waiter
+            if future.done() or not self._can_admit(key_name, key_limit):
+                continue
+            self._waiters.remove(waiter)
+            self._admit(key_name)
+            future.set_result(None)
+
+    def _reject(self, reason: str, detail: str) -> HTTPException:
+        STREAMS_REJECTED.labels(reason=reason).inc()
+        return HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail=detail,
+            headers={"Retry-After": str(self.retry_after_seconds)},
+        )
+
+    async def acquire(self, api_key: ApiKeyInfo) -> StreamPermit:
+        """
+        Admit a stream for the key, waiting in the queue if needed.
+
+        Raises:
+            HTTPException: 503 if the queue is full or the wait timed out
+        """
+        key_limit = api_key.max_concurrent_streams or self.max_streams_per_key
+        if self._can_admit(api_key.name, key_limit):
+            self._admit(api_key.name)
+            return StreamPermit(self, api_key.name)
+
+        if self.queue_timeout_seconds <= 0 or len(self._waiters) >= self.max_queue:
+            raise self._reject("queue_full", "Too many open streams, try again later.")
+
+        future = asyncio.get_running_loop().create_future()
+        waiter = (api_key.name, key_limit, future)
+        self._waiters.append(waiter)
+        try:
+            with stage("stream_admission"):
+                await asyncio.wait({future}, timeout=self.queue_timeout_seconds)
+        except BaseException:
+            # The client went away while queued (or anything else failed),
+            # never leave a dead waiter or an unreleased slot behind
+            if future.done():
+                self._release(api_key.name)
+            else:
+                future.cancel()
+                self._waiters.remove(waiter)
+            raise
+
+        if not future.done():
+            future.cancel()
+            self._waiters.remove(waiter)
+            raise self._reject(
+                "timeout", "Timed out waiting for a free stream slot, try again later."
+            )
+        return StreamPermit(self, api_key.name)
+
+
+async def hold_permit(
+    stream: AsyncIterator[bytes], permit: StreamPermit
+) -> AsyncIterator[bytes]:
+    """Pass the stream through and release the permit when it ends or is closed."""
+    try:
+        async with aclosing(stream):
+            async for item in stream:
+                yield item
+    finally:
+        permit.release()
+
+
+_settings = get_settings()
+stream_admission = StreamAdmission(
+    max_streams=_settings.max_open_streams,
+    max_streams_per_key=_settings.max_open_streams_per_key,
+    max_queue=_settings.stream_queue_max,
+    queue_timeout_seconds=_settings.stream_queue_timeout_seconds,
+    retry_after_seconds=_settings.stream_retry_after_seconds,
+)
@@ -1,36 +1,11 @@
-from fastapi import HTTPException, Security, status
-from fastapi.security import APIKeyHeader
-from backend.config import get_settings
-
-api_key_header = APIKeyHeader(name="X-API-Key", auto_error=False)
-
-
-async def verify_api_key(api_key: str | None = Security(api_key_header)) -> str:
-    """
-    Verify the API key from the request header.
-
-    Args:
-        api_key: The API key from X-API-Key header
+from interfaces.api_keys import ApiKeyRegistry, api_key_verifier
 
-    Returns:
-        The validated API key
-
-    Raises:
-        HTTPException: If API key is missing or invalid
-    """
-    settings = get_settings()
-
-    if api_key is None:
-        raise HTTPException(
-            status_code=status.HTTP_401_UNAUTHORIZED,
-            detail="Missing API key. Please provide X-API-Key header.",
-        )
-
-    if api_key != settings.api_key:
-        print("Invalid API key provided:", api_key)
-        raise HTTPException(
-            status_code=status.HTTP_403_FORBIDDEN,
-            detail="Invalid API key.",
-        )
+from backend.config import get_settings
 
-    return api_key
+_settings = get_settings()
+key_registry = ApiKeyRegistry(
+    path=_settings.api_keys_file,
+    fallback_key=_settings.api_key,
+    reload_interval_seconds=_settings.api_key_reload_interval_seconds,
+)
+verify_api_key = api_key_verifier(key_registry)
@@ -1,5 +1,5 @@
 import os
-from typing import Callable
+from typing import Callable, Literal
 
 from pydantic_settings import BaseSettings, SettingsConfigDict
 
@@ -29,15 +29,40 @@ class Settings(BaseSettings):
 
     # Authorization
     api_key: str = "dev-api-key"  # Override in production
+    # JSON registry of additional keys, see interfaces.api_keys
+    api_keys_file: str | None = None
+    api_key_reload_interval_seconds: float = 5.0
 
     # Rate Limiting
     rate_limit_requests: int = 100  # Max requests per window
     rate_limit_window_seconds: int = 60  # Time window in seconds
 
+    # Admission control of concurrently open SSE streams (per worker process)
+    max_open_streams: int = 50
+    # Default for keys without max_concurrent_streams
+    max_open_streams_per_key: int = 10
+    # Requests waiting for a slot, more are rejected with 503
+    stream_queue_max: int = 100
+    # 0 rejects immediately instead of queueing
+    stream_queue_timeout_seconds: float = 5.0
+    stream_retry_after_seconds: int = 5
+
+    # Shared state, "sqlite" keeps rate limits and histories consistent across workers
+    state_backend: Literal["memory", "sqlite"] = "memory"
+    state_sqlite_path: str = "backend_state.sqlite3"
+    workers: int = 1  # Worker processes when started via main.py
+    # Conversation histories keep this many newest messages per conversation
+    history_max_messages: int = 200
+    history_retention_seconds: int = 7 * 24 * 3600
+
     # Database Settings
     database_url: str = "http://localhost:9010"  # Override in production
     database_api_key: str = "my-secret"  # Override in production
 
+    # Tracing
+    tracing_exporter: Literal["none", "console", "otlp"] = "none"
+    otlp_endpoint: str = "http://localhost:4318/v1/traces"
+
 
 # delayed singleton pattern for settings
 # want to try it from https://www.lihil.cc/blog/design-patterns-you-should-unlearn-in-python-part1/
@@ -1,19 +1,30 @@
 from interfaces.models import ChatMessage
 
+from backend.state import StateBackend, state_backend
+
 
 class ConversationHistory:
-    def __init__(self) -> None:
-        self._histories: dict[str, list[ChatMessage]] = {}
+    def __init__(self, state: StateBackend) -> None:
+        self._state = state
+
+    async def claim(self, conversation_id: str, owner: str) -> bool:
+        """Start or continue a conversation, False if another key owns it."""
+        return await self._state.claim_conversation(conversation_id, owner)
+
+    async def owner(self, conversation_id: str) -> str | None:
+        """Name of the API key that started the conversation, if known."""
+        return await self._state.conversation_owner(conversation_id)
 
-    def add_message(self, conversation_id: str, message: ChatMessage) -> None:
+    async def add_message(self, conversation_id: str, message: ChatMessage) -> None:
         """Add a message to the conversation history."""
-        if conversation_id not in self._histories:
-            self._histories[conversation_id] = []
-        self._histories[conversation_id].append(message)
+        await self._state.append_message(conversation_id, message.model_dump_json())
 
-    def get_history(self, conversation_id: str) -> list[ChatMessage]:
+    async def get_history(self, conversation_id: str) -> list[ChatMessage]:
         """Retrieve the conversation history for a given conversation ID."""
-        return self._histories.get(conversation_id, [])
+        return [
+            ChatMessage.model_validate_json(payload)
+            for payload in await self._state.get_messages(conversation_id)
+        ]
 
 
-conversation_history = ConversationHistory()
+conversation_history = ConversationHistory(state_backend)
@@ -2,6 +2,7 @@ from contextlib import asynccontextmanager
 
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
+from interfaces.telemetry import TracingMiddleware, setup_tracing
 
 from backend.config import get_settings
 from backend.routes import router
@@ -19,6 +20,12 @@ async def lifespan(app: FastAPI):
     print(
         f"Rate limit: {settings.rate_limit_requests} requests per {settings.rate_limit_window_seconds}s"
     )
+    print(f"State backend: {settings.state_backend}")
+    if settings.workers > 1 and settings.state_backend == "memory":
+        print(
+            "Warning: memory state backend with multiple workers, rate limits and "
+            "conversation histories are per worker. Set BACKEND_STATE_BACKEND=sqlite."
+        )
 
     yield
 
@@ -29,6 +36,7 @@ async def lifespan(app: FastAPI):
 def create_app() -> FastAPI:
     """Create and configure the FastAPI application."""
     settings = get_settings()
+    setup_tracing("backend", settings.tracing_exporter, settings.otlp_endpoint)
 
     app = FastAPI(
         title=settings.api_title,
@@ -46,6 +54,9 @@ def create_app() -> FastAPI:
         allow_headers=["*"],
     )
 
+    # Server span per request, continued from the caller's traceparent
+    app.add_middleware(TracingMiddleware)
+
     # Include routes
     app.include_router(router)
 
@@ -59,6 +70,14 @@ app = create_app()
 if __name__ == "__main__":
     import uvicorn
 
-    uvicorn.run(
-        app, host="0.0.0.0", port=get_settings().port, reload=get_settings().debug
-    )
+    settings = get_settings()
+    if settings.workers > 1:
+        # Workers import the app themselves, so it has to be passed by name
+        uvicorn.run(
+            "backend.main:app",
+            host="0.0.0.0",
+            port=settings.port,
+            workers=settings.workers,
+        )
+    else:
+        uvicorn.run(app, host="0.0.0.0", port=settings.port, reload=settings.debug)
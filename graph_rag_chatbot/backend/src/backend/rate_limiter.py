@@ -1,67 +1,80 @@
 import time
 
 from fastapi import HTTPException, Request, status
+from interfaces.api_keys import ApiKeyInfo
 
 from backend.config import get_settings
+from backend.state import StateBackend, state_backend
+
+GLOBAL_BUCKET = "global"
 
 
 class RateLimiter:
     """
-    Simple in-memory global rate limiter using sliding window.
-    Limits total requests to the backend regardless of client.
-    For production, consider using Redis-based rate limiting.
+    Global rate limiter using sliding window.
+    Limits total requests to the backend regardless of client, and requests
+    per API key for keys that carry their own rate_limit_requests.
+    Request timestamps live in the state backend, so the limit holds
+    across worker processes when the SQLite backend is used.
     """
 
-    def __init__(self):
-        # Store all request timestamps globally
-        self._requests: list[float] = []
-
-    def _cleanup_old_requests(self, window_start: float) -> None:
-        """Remove requests outside the current window."""
-        self._requests = [ts for ts in self._requests if ts > window_start]
+    def __init__(self, state: StateBackend):
+        self._state = state
 
-    async def check_rate_limit(self, request: Request) -> None:
+    async def check_rate_limit(
+        self, request: Request, api_key: ApiKeyInfo | None = None
+    ) -> None:
         """
-        Check if the request is within global rate limits.
+        Check if the request is within global and per-key rate limits.
 
         Args:
             request: The FastAPI request object
+            api_key: Metadata of the authenticated key, if any
 
         Raises:
             HTTPException: If rate limit is exceeded
         """
         settings = get_settings()
-        current_time = time.time()
-        window_start = current_time - settings.rate_limit_window_seconds
 
-        # Cleanup old requests
-        self._cleanup_old_requests(window_start)
-
-        # Check if limit exceeded
-        request_count = len(self._requests)
-        if request_count >= settings.rate_limit_requests:
+        if api_key is not None and api_key.rate_limit_requests is not None:
+            # Per-key quota first, so a key over its quota does not use up the global one
+            allowed = await self._state.hit(
+                f"key:{api_key.name}",
+                time.time(),
+                settings.rate_limit_window_seconds,
+                api_key.rate_limit_requests,
+            )
+            if not allowed:
+                raise HTTPException(
+                    status_code=status.HTTP_429_TOO_MANY_REQUESTS,
+                    detail=f"Rate limit exceeded for API key '{api_key.name}'. Maximum {api_key.rate_limit_requests} requests per {settings.rate_limit_window_seconds} seconds.",
+                    headers={"Retry-After": str(settings.rate_limit_window_seconds)},
+                )
+
+        # Check the limit and record this request in one step
+        allowed = await self._state.hit(
+            GLOBAL_BUCKET,
+            time.time(),
+            settings.rate_limit_window_seconds,
+            settings.rate_limit_requests,
+        )
+        if not allowed:
             raise HTTPException(
                 status_code=status.HTTP_429_TOO_MANY_REQUESTS,
                 detail=f"Rate limit exceeded. Maximum {settings.rate_limit_requests} requests per {settings.rate_limit_window_seconds} seconds.",
                 headers={"Retry-After": str(settings.rate_limit_window_seconds)},
             )
 
-        # Record this request
-        self._requests.append(current_time)
-
-    def get_remaining_requests(self) -> int:
+    async def get_remaining_requests(self) -> int:
         """Get the number of remaining requests in the current window."""
         settings = get_settings()
         current_time = time.time()
         window_start = current_time - settings.rate_limit_window_seconds
 
-        # Cleanup old requests
-        self._cleanup_old_requests(window_start)
-
-        used_requests = len(self._requests)
+        used_requests = await self._state.count(GLOBAL_BUCKET, window_start)
         return max(0, settings.rate_limit_requests - used_requests)
 
 
 # Global rate limiter instance
 # No need for Sigleton pattern here as state is shared in this instance
-rate_limiter = RateLimiter()
+rate_limiter = RateLimiter(state_backend)
@@ -1,21 +1,26 @@
-import json
 import uuid
 from typing import AsyncGenerator
 
-from fastapi import APIRouter, Depends, Request
-from fastapi.responses import StreamingResponse
+from fastapi import APIRouter, Depends, HTTPException, Request, status
+from fastapi.responses import Response, StreamingResponse
+from starlette.background import BackgroundTask
 
 import httpx
 from interfaces.models import (
     ChatRequest,
     ChatResponse,
+    ConversationHistoryResponse,
     StreamChunk,
     DatabaseChatRequest,
     ChatMessage,
     MessageRole,
 )
+from interfaces.codec import JSON_HEADERS, decode_sse_line, encode_json, encode_sse
+from interfaces.api_keys import ApiKeyInfo
 from interfaces.endpoints import APIEndpoints
+from interfaces.telemetry import inject_trace_headers, metrics_payload, stage
 
+from backend.admission import hold_permit, stream_admission
 from backend.auth import verify_api_key
 from backend.rate_limiter import rate_limiter
 from backend.conversation_history import conversation_history
@@ -24,67 +29,95 @@ from backend.config import get_settings
 router = APIRouter()
 
 
-async def check_rate_limit(request: Request):
+async def check_rate_limit(
+    request: Request, api_key: ApiKeyInfo = Depends(verify_api_key)
+):
     """Dependency to check rate limit."""
-    await rate_limiter.check_rate_limit(request)
-    return rate_limiter.get_remaining_requests()
+    await rate_limiter.check_rate_limit(request, api_key)
+    return await rate_limiter.get_remaining_requests()
+
+
+def conversation_not_found() -> HTTPException:
+    # Does not tell that the conversation exists under another key
+    return HTTPException(
+        status_code=status.HTTP_404_NOT_FOUND, detail="Conversation not found."
+    )
 
 
 async def generate_stream_response(
-    message: str, conversation_id: str
-) -> AsyncGenerator[str, None]:
+    message: str, conversation_id: str, request: Request
+) -> AsyncGenerator[bytes, None]:
     """
-    Generate streaming response chunks.
-    This is a placeholder - will be replaced with actual database/LLM call.
+    Generate streaming response chunks proxied from the database service.
+
+    When the client disconnects, the upstream stream is closed, which cancels
+    the answer generation in the database service. The partial answer is
+    stored in the conversation history marked as truncated.
     """
-    previous_messages = conversation_history.get_history(conversation_id)
-    conversation_history.add_message(
+    previous_messages = await conversation_history.get_history(conversation_id)
+    await conversation_history.add_message(
         conversation_id,
         ChatMessage(role=MessageRole.USER, content=message),
     )
-    request = DatabaseChatRequest(
+    database_request = DatabaseChatRequest(
         query=ChatMessage(role=MessageRole.USER, content=message),
         history=previous_messages,
     )
+    full_message = ""
+    completed = False
 
     async with httpx.AsyncClient() as client:
-        async with client.stream(
-            "POST",
-            f"{get_settings().database_url}{APIEndpoints.DATABASE_CHAT_STREAM}",
-            json=request.model_dump(),
-            headers={"X-API-Key": get_settings().database_api_key},
-            timeout=60.0,
-        ) as response:
-            if response.status_code != 200:
-                error_text = await response.aread()
-                stream_chunk = StreamChunk(
-                    content=f"Error: {response.status_code} - {error_text.decode()}",
-                    done=True,
-                    error=None,
-                )
-                yield f"data: {json.dumps(stream_chunk.model_dump())}\n\n"
-                return
-
-            full_message = ""
-            async for line in response.aiter_lines():
-                if line.startswith("data: "):
-                    data = json.loads(line[6:])
-                    chunk = StreamChunk(**data)
-                    yield f"data: {json.dumps(chunk.model_dump())}\n\n"
-                    if chunk.content:
-                        full_message += chunk.content
-            # Update conversation history with assistant's response
-            conversation_history.add_message(
-                conversation_id,
-                ChatMessage(role=MessageRole.ASSISTANT, content=full_message),
-            )
+        with stage("database_stream"):
+            async with client.stream(
+                "POST",
+                f"{get_settings().database_url}{APIEndpoints.DATABASE_CHAT_STREAM}",
+                content=encode_json(database_request),
+                headers=inject_trace_headers(
+                    {"X-API-Key": get_settings().database_api_key, **JSON_HEADERS}
+                ),
+                timeout=60.0,
+            ) as response:
+                if response.status_code != 200:
+                    error_text = await response.aread()
+                    stream_chunk = StreamChunk(
+                        content=f"Error: {response.status_code} - {error_text.decode()}",
+                        done=True,
+                        error=None,
+                    )
+                    yield encode_sse(stream_chunk)
+                    return
+
+                try:
+                    async for line in response.aiter_lines():
+                        chunk = decode_sse_line(line)
+                        if chunk is None:
+                            continue
+                        if await request.is_disconnected():
+                            print("Client disconnected, cancelling upstream stream")
+                            break
+                        # Forward the event as received, it is already valid SSE
+                        yield f"{line}\n\n".encode()
+                        if chunk.content:
+                            full_message += chunk.content
+                        if chunk.done:
+                            completed = chunk.error is None
+                finally:
+                    # Also runs when the response task is cancelled on disconnect
+                    await conversation_history.add_message(
+                        conversation_id,
+                        ChatMessage(
+                            role=MessageRole.ASSISTANT,
+                            content=full_message,
+                            truncated=not completed,
+                        ),
+                    )
 
 
 @router.post(APIEndpoints.BACKEND_CHAT, response_model=ChatResponse)
 async def chat(
     request: Request,
     chat_request: ChatRequest,
-    api_key: str = Depends(verify_api_key),
+    api_key: ApiKeyInfo = Depends(verify_api_key),
     rate_limit: int = Depends(check_rate_limit),
 ) -> ChatResponse:
     """
@@ -111,28 +144,69 @@ async def chat(
 async def chat_stream(
     request: Request,
     chat_request: ChatRequest,
-    api_key: str = Depends(verify_api_key),
+    api_key: ApiKeyInfo = Depends(verify_api_key),
     rate_limit: int = Depends(check_rate_limit),
 ) -> StreamingResponse:
     """
     Handle streaming chat requests.
 
-    Authorization and rate limiting are applied before processing.
+    Authorization, rate limiting and stream admission are applied before processing.
     Returns Server-Sent Events (SSE) stream.
     """
     conversation_id = chat_request.conversation_id or str(uuid.uuid4())
+    if not await conversation_history.claim(conversation_id, api_key.name):
+        raise conversation_not_found()
+    # Admitted only here, after the body is validated, so a 422 holds no slot
+    permit = await stream_admission.acquire(api_key)
 
     return StreamingResponse(
-        generate_stream_response(chat_request.message.content, conversation_id),
+        hold_permit(
+            generate_stream_response(
+                chat_request.message.content, conversation_id, request
+            ),
+            permit,
+        ),
         media_type="text/event-stream",
         headers={
             "Cache-Control": "no-cache",
             "Connection": "keep-alive",
             "X-Conversation-ID": conversation_id,
         },
+        # Covers a response that ends before the stream is iterated
+        background=BackgroundTask(permit.release),
     )
 
 
+@router.get(
+    APIEndpoints.BACKEND_CHAT_HISTORY, response_model=ConversationHistoryResponse
+)
+async def chat_history(
+    conversation_id: str,
+    api_key: ApiKeyInfo = Depends(verify_api_key),
+) -> ConversationHistoryResponse:
+    """
+    Return the stored messages of a conversation, oldest first.
+
+    Used by the frontend to restore a conversation after a page reload.
+    Unknown conversations have an empty history, conversations started with
+    another API key are reported as not found.
+    """
+    owner = await conversation_history.owner(conversation_id)
+    if owner is not None and owner != api_key.name:
+        raise conversation_not_found()
+    return ConversationHistoryResponse(
+        conversation_id=conversation_id,
+        messages=await conversation_history.get_history(conversation_id),
+    )
+
+
+@router.get("/metrics")
+async def metrics() -> Response:
+    """Prometheus metrics endpoint - no auth required."""
+    payload, content_type = metrics_payload()
+    return Response(content=payload, media_type=content_type)
+
+
 @router.get("/health")
 async def health_check() -> dict:
     """Health check endpoint - no auth required."""
@@ -0,0 +1,324 @@
+import asyncio
+import os
+import sqlite3
+import threading
+import time
+from abc import ABC, abstractmethod
+
+from backend.config import Settings, get_settings
+
+# Expired messages are deleted at most this often
+PRUNE_INTERVAL_SECONDS = 60.0
+
+
+class StateBackend(ABC):
+    """
+    Storage for state shared by all requests: rate limit windows and
+    conversation histories. The SQLite backend shares it between worker
+    processes, the memory backend only works with a single worker.
+
+    Histories are bounded: a conversation keeps its newest max_messages
+    messages and messages older than retention_seconds are dropped, as are
+    conversations unused for as long. Every conversation belongs to the API
+    key that started it.
+    """
+
+    def __init__(self, max_messages: int, retention_seconds: float) -> None:
+        self.max_messages = max_messages
+        self.retention_seconds = retention_seconds
+        self._pruned_at = 0.0
+
+    def _prune_due(self, now: float) -> bool:
+        if now - self._pruned_at < PRUNE_INTERVAL_SECONDS:
+            return False
+        self._pruned_at = now
+        return True
+
+    @abstractmethod
+    async def hit(
+        self, bucket: str, now: float, window_seconds: float, limit: int
+    ) -> bool:
+        """
+        Atomically record a request in a sliding window if it is under the limit.
+
+        Returns:
+            True if the request was recorded, False if the limit is reached
+        """
+
+    @abstractmethod
+    async def count(self, bucket: str, since: float) -> int:
+        """Number of requests recorded in the bucket after `since`."""
+
+    @abstractmethod
+    async def claim_conversation(self, conversation_id: str, owner: str) -> bool:
+        """
+        Mark a conversation as used, recording its owner if it is new.
+
+        Returns:
+            False if the conversation belongs to another owner
+        """
+
+    @abstractmethod
+    async def conversation_owner(self, conversation_id: str) -> str | None:
+        """Owner of a conversation, None for an unknown conversation."""
+
+    @abstractmethod
+    async def append_message(self, conversation_id: str, payload: str) -> None:
+        """Append a serialized message to a conversation."""
+
+    @abstractmethod
+    async def get_messages(self, conversation_id: str) -> list[str]:
+        """Serialized messages of a conversation, oldest first."""
+
+
+class MemoryStateBackend(StateBackend):
+    """Process-local state, the default for single-worker deployments."""
+
+    def __init__(self, max_messages: int, retention_seconds: float) -> None:
+        super().__init__(max_messages, retention_seconds)
+        self._requests: dict[str, list[float]] = {}
+        # Conversation id -> (created at, payload), oldest first
+        self._messages: dict[str, list[tuple[float, str]]] = {}
+        # Conversation id -> (owner, last used at)
+        self._conversations: dict[str, tuple[str, float]] = {}
+
+    async def hit(
+        self, bucket: str, now: float, window_seconds: float, limit: int
+    ) -> bool:
+        window_start = now - window_seconds
+        requests = [ts for ts in self._requests.get(bucket, []) if ts > window_start]
+        self._requests[bucket] = requests
+        if len(requests) >= limit:
+            return False
+        requests.append(now)
+        return True
+
+    async def count(self, bucket: str, since: float) -> int:
+        return sum(1 for ts in self._requests.get(bucket, []) if ts > since)
+
+    async def claim_conversation(self, conversation_id: str, owner: str) -> bool:
+        current = await self.conversation_owner(conversation_id)
+        if current is not None and current != owner:
+            return False
+        self._conversations[conversation_id] = (owner, time.time())
+        return True
+
+    async def conversation_owner(self, conversation_id: str) -> str | None:
+        owner, used_at = self._conversations.get(conversation_id, (None, 0.0))
+        return owner if used_at > time.time() - self.retention_seconds else None
+
+    async def append_message(self, conversation_id: str, payload: str) -> None:
+        now = time.time()
+        messages = self._messages.setdefault(conversation_id, [])
+        messages.append((now, payload))
+        del messages[: -self.max_messages]
+        if self._prune_due(now):
+            expired = now - self.retention_seconds
+            for key in list(self._messages):
+                kept = [m for m in self._messages[key] if m[0] > expired]
+                if kept:
+                    self._messages[key] = kept
+                else:
+                    del self._messages[key]
+            for key, (_, used_at) in list(self._conversations.items()):
+                if used_at <= expired:
+                    del self._conversations[key]
+
+    async def get_messages(self, conversation_id: str) -> list[str]:
+        expired = time.time() - self.retention_seconds
+        return [
+            payload
+            for created_at, payload in self._messages.get(conversation_id, [])
+            if created_at > expired
+        ]
+
+
+class SQLiteStateBackend(StateBackend):
+    """
+    State in a local SQLite database in WAL mode, shared by all workers on the host.
+    Every operation is a single short transaction run in a worker thread, so
+    waiting for the write lock of another process never blocks the event loop.
+    """
+
+    def __init__(self, path: str, max_messages: int, retention_seconds: float) -> None:
+        super().__init__(max_messages, retention_seconds)
+        self.path = path
+        self._local = threading.local()
+
+    def _connection(self) -> sqlite3.Connection:
+        # One connection per process and thread, never shared across a fork
+        connection = getattr(self._local, "connection", None)
+        if connection is None or self._local.pid != os.getpid():
+            connection = sqlite3.connect(self.path, timeout=5.0, isolation_level=None)
+            connection.execute("PRAGMA journal_mode=WAL")
+            connection.execute("PRAGMA synchronous=NORMAL")
+            connection.executescript(
+                """
+                CREATE TABLE IF NOT EXISTS requests (bucket TEXT NOT NULL, ts REAL NOT NULL);
+                CREATE INDEX IF NOT EXISTS requests_bucket_ts ON requests (bucket, ts);
+                CREATE TABLE IF NOT EXISTS messages (
+                    id INTEGER PRIMARY KEY AUTOINCREMENT,
+                    conversation_id TEXT NOT NULL,
+                    payload TEXT NOT NULL,
+                    created_at REAL NOT NULL
+                );
+                CREATE INDEX IF NOT EXISTS messages_conversation ON messages (conversation_id, id);
+                CREATE INDEX IF NOT EXISTS messages_created_at ON messages (created_at);
+                CREATE TABLE IF NOT EXISTS conversations (
+                    conversation_id TEXT PRIMARY KEY,
+                    owner TEXT NOT NULL,
+                    used_at REAL NOT NULL
+                );
+                """
+            )
+            self._local.connection = connection
+            self._local.pid = os.getpid()
+        return connection
+
+    def _hit(self, bucket: str, now: float, window_seconds: float, limit: int) -> bool:
+        connection = self._connection()
+        # IMMEDIATE takes the write lock up front, so check and insert are atomic
+        connection.execute("BEGIN IMMEDIATE")
+        try:
+            connection.execute(
+                "DELETE FROM requests WHERE bucket = ? AND ts <= ?",
+                (bucket, now - window_seconds),
+            )
+            (used,) = connection.execute(
+                "SELECT count(*) FROM requests WHERE bucket = ?", (bucket,)
+            ).fetchone()
+            allowed = used < limit
+            if allowed:
+                connection.execute(
+                    "INSERT INTO requests (bucket, ts) VALUES (?, ?)", (bucket, now)
+                )
+            connection.execute("COMMIT")
+        except Exception:
+            connection.execute("ROLLBACK")
+            raise
+        return allowed
+
+    def _count(self, bucket: str, since: float) -> int:
+        (used,) = (
+            self._connection()
+            .execute(
+                "SELECT count(*) FROM requests WHERE bucket = ? AND ts > ?",
+                (bucket, since),
+            )
+            .fetchone()
+        )
+        return used
+
+    def _append_message(self, conversation_id: str, payload: str) -> None:
+        now = time.time()
+        connection = self._connection()
+        connection.execute("BEGIN IMMEDIATE")
+        try:
+            connection.execute(
+                "INSERT INTO messages (conversation_id, payload, created_at) "
+                "VALUES (?, ?, ?)",
+                (conversation_id, payload, now),
+            )
+            # Keep only the newest messages of the conversation
+            connection.execute(
+                "DELETE FROM messages WHERE conversation_id = ? AND id NOT IN "
+                "(SELECT id FROM messages WHERE conversation_id = ? "
+                "ORDER BY id DESC LIMIT ?)",
+                (conversation_id, conversation_id, self.max_messages),
+            )
+            if self._prune_due(now):
+                expired = now - self.retention_seconds
+                connection.execute(
+                    "DELETE FROM messages WHERE created_at <= ?", (expired,)
+                )
+                connection.execute(
+                    "DELETE FROM conversations WHERE used_at <= ?", (expired,)
+                )
+            connection.execute("COMMIT")
+        except Exception:
+            connection.execute("ROLLBACK")
+            raise
+
+    def _claim_conversation(self, conversation_id: str, owner: str) -> bool:
+        now = time.time()
+        connection = self._connection()
+        connection.execute("BEGIN IMMEDIATE")
+        try:
+            # An expired conversation is free to be started again
+            connection.execute(
+                "DELETE FROM conversations WHERE conversation_id = ? AND used_at <= ?",
+                (conversation_id, now - self.retention_seconds),
+            )
+            connection.execute(
+                "INSERT INTO conversations (conversation_id, owner, used_at) "
+                "VALUES (?, ?, ?) ON CONFLICT (conversation_id) "
+                "DO UPDATE SET used_at = excluded.used_at WHERE owner = excluded.owner",
+                (conversation_id, owner, now),
+            )
+            (current,) = connection.execute(
+                "SELECT owner FROM conversations WHERE conversation_id = ?",
+                (conversation_id,),
+            ).fetchone()
+            connection.execute("COMMIT")
+        except Exception:
+            connection.execute("ROLLBACK")
+            raise
+        return current == owner
+
+    def _conversation_owner(self, conversation_id: str) -> str | None:
+        row = (
+            self._connection()
+            .execute(
+                "SELECT owner FROM conversations WHERE conversation_id = ? "
+                "AND used_at > ?",
+                (conversation_id, time.time() - self.retention_seconds),
+            )
+            .fetchone()
+        )
+        return row[0] if row else None
+
+    def _get_messages(self, conversation_id: str) -> list[str]:
+        rows = self._connection().execute(
+            "SELECT payload FROM messages WHERE conversation_id = ? AND created_at > ? "
+            "ORDER BY id",
+            (conversation_id, time.time() - self.retention_seconds),
+        )
+        return [payload for (payload,) in rows]
+
+    async def hit(
+        self, bucket: str, now: float, window_seconds: float, limit: int
+    ) -> bool:
+        return await asyncio.to_thread(self._hit, bucket, now, window_seconds, limit)
+
+    async def count(self, bucket: str, since: float) -> int:
+        return await asyncio.to_thread(self._count, bucket, since)
+
+    async def claim_conversation(self, conversation_id: str, owner: str) -> bool:
+        return await asyncio.to_thread(self._claim_conversation, conversation_id, owner)
+
+    async def conversation_owner(self, conversation_id: str) -> str | None:
+        return await asyncio.to_thread(self._conversation_owner, conversation_id)
+
+    async def append_message(self, conversation_id: str, payload: str) -> None:
+        # Shielded, the answer of a cancelled stream is still stored
+        await asyncio.shield(
+            asyncio.to_thread(self._append_message, conversation_id, payload)
+        )
+
+    async def get_messages(self, conversation_id: str) -> list[str]:
+        return await asyncio.to_thread(self._get_messages, conversation_id)
+
+
+def create_state_backend(settings: Settings) -> StateBackend:
+    """Create the state backend selected by settings.state_backend."""
+    retention = {
+        "max_messages": settings.history_max_messages,
+        "retention_seconds": settings.history_retention_seconds,
+    }
+    if settings.state_backend == "sqlite":
+        return SQLiteStateBackend(settings.state_sqlite_path, **retention)
+    return MemoryStateBackend(**retention)
+
+
+# Shared by the rate limiter and the conversation history
+state_backend = create_state_backend(get_settings())
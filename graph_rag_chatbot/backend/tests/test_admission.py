@@ -0,0 +1,127 @@
+import asyncio
+
+import pytest
+from backend.admission import StreamAdmission
+from fastapi import HTTPException
+from interfaces.api_keys import ApiKeyInfo
+
+KEY = ApiKeyInfo(name="a")
+OTHER_KEY = ApiKeyInfo(name="b")
+
+
+def make_admission(**overrides) -> StreamAdmission:
+    options = dict(
+        max_streams=1,
+        max_streams_per_key=1,
+        max_queue=2,
+        queue_timeout_seconds=1.0,
+        retry_after_seconds=3,
+    )
+    options.update(overrides)
+    return StreamAdmission(**options)
+
+
+def test_admits_up_to_the_caps():
+    async def scenario():
+        admission = make_admission(max_streams=2)
+        await admission.acquire(KEY)
+        await admission.acquire(OTHER_KEY)
+        assert admission._open == 2
+
+    asyncio.run(scenario())
+
+
+def test_queued_request_is_admitted_after_release():
+    async def scenario():
+        admission = make_admission()
+        permit = await admission.acquire(KEY)
+        queued = asyncio.create_task(admission.acquire(KEY))
+        await asyncio.sleep(0)
+        assert len(admission._waiters) == 1
+
+        permit.release()
+        second = await queued
+        assert admission._open == 1
+        assert not admission._waiters
+
+        second.release()
+        second.release()
+        assert admission._open == 0
+
+    asyncio.run(scenario())
+
+
+def test_rejects_when_queue_is_full():
+    async def scenario():
+        admission = make_admission(max_queue=0)
+        await admission.acquire(KEY)
+        with pytest.raises(HTTPException) as error:
+            await admission.acquire(KEY)
+        assert error.value.status_code == 503
+        assert error.value.headers["Retry-After"] == "3"
+
+    asyncio.run(scenario())
+
+
+def test_timeout_leaves_no_waiter_behind():
+    async def scenario():
+        admission = make_admission(queue_timeout_seconds=0.01)
+        await admission.acquire(KEY)
+        with pytest.raises(HTTPException) as error:
+            await admission.acquire(KEY)
+        assert error.value.status_code == 503
+        assert not admission._waiters
+
+    asyncio.run(scenario())
+
+
+def test_cancelled_waiter_does_not_leak_capacity():
+    async def scenario():
+        admission = make_admission()
+        permit = await admission.acquire(KEY)
+        queued = asyncio.create_task(admission.acquire(KEY))
+        await asyncio.sleep(0)
+        queued.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await queued
+        assert not admission._waiters
+
+        permit.release()
+        assert admission._open == 0
+        (await admission.acquire(KEY)).release()
+
+    asyncio.run(scenario())
+
+
+def test_waiter_cancelled_after_grant_releases_its_slot():
+    async def scenario():
+        admission = make_admission()
+        permit = await admission.acquire(KEY)
+        queued = asyncio.create_task(admission.acquire(KEY))
+        await asyncio.sleep(0)
+
+        # The slot is granted, but the waiter is cancelled before it resumes
+        permit.release()
+        queued.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await queued
+        assert admission._open == 0
+        assert not admission._open_per_key
+
+    asyncio.run(scenario())
+
+
+def test_per_key_cap_does_not_block_other_keys():
+    async def scenario():
+        admission = make_admission(max_streams=2)
+        permit = await admission.acquire(KEY)
+        queued = asyncio.create_task(admission.acquire(KEY))
+        await asyncio.sleep(0)
+
+        await admission.acquire(OTHER_KEY)
+        assert len(admission._waiters) == 1
+        permit.release()
+        await queued
+        assert admission._open_per_key == {"a": 1, "b": 1}
+
+    asyncio.run(scenario())
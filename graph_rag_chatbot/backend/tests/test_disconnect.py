@@ -0,0 +1,43 @@
+import asyncio
+
+import httpx
+from backend.conversation_history import conversation_history
+from backend.routes import generate_stream_response
+from interfaces.codec import encode_sse
+from interfaces.models import StreamChunk
+
+
+class FakeRequest:
+    """Reports the client as disconnected after the given number of checks."""
+
+    def __init__(self, connected_checks: int) -> None:
+        self.connected_checks = connected_checks
+
+    async def is_disconnected(self) -> bool:
+        self.connected_checks -= 1
+        return self.connected_checks < 0
+
+
+def test_partial_answer_is_stored_as_truncated(monkeypatch):
+    upstream = b"".join(
+        encode_sse(StreamChunk(content=token)) for token in ["Robotika", " v Brně"]
+    )
+    transport = httpx.MockTransport(
+        lambda request: httpx.Response(200, content=upstream)
+    )
+    client = httpx.AsyncClient
+    monkeypatch.setattr(httpx, "AsyncClient", lambda: client(transport=transport))
+
+    async def scenario():
+        stream = generate_stream_response(
+            "Kroužky?", "disconnected", FakeRequest(connected_checks=1)
+        )
+        forwarded = [event async for event in stream]
+        return forwarded, await conversation_history.get_history("disconnected")
+
+    forwarded, history = asyncio.run(scenario())
+    assert len(forwarded) == 1
+    question, answer = history
+    assert question.content == "Kroužky?"
+    assert answer.content == "Robotika"
+    assert answer.truncated
@@ -0,0 +1,75 @@
+import asyncio
+
+from backend.admission import stream_admission
+from backend.config import get_settings
+from backend.conversation_history import conversation_history
+from backend.main import app
+from fastapi.testclient import TestClient
+from interfaces.endpoints import APIEndpoints
+from interfaces.telemetry import UNMATCHED_ROUTE
+from prometheus_client import REGISTRY
+
+client = TestClient(app)
+
+
+def test_invalid_stream_request_holds_no_slot():
+    headers = {"X-API-Key": get_settings().api_key}
+    for _ in range(stream_admission.max_streams_per_key + 1):
+        response = client.post(
+            APIEndpoints.BACKEND_CHAT_STREAM, json={"message": 1}, headers=headers
+        )
+        assert response.status_code == 422
+    assert stream_admission._open == 0
+
+
+def test_conversation_of_another_key_is_not_found():
+    headers = {"X-API-Key": get_settings().api_key}
+    asyncio.run(conversation_history.claim("foreign", "another-key"))
+    history = APIEndpoints.BACKEND_CHAT_HISTORY.format(conversation_id="foreign")
+    assert client.get(history, headers=headers).status_code == 404
+
+    response = client.post(
+        APIEndpoints.BACKEND_CHAT_STREAM,
+        json={
+            "message": {"role": "user", "content": "Ahoj"},
+            "conversation_id": "foreign",
+        },
+        headers=headers,
+    )
+    assert response.status_code == 404
+    assert stream_admission._open == 0
+
+
+def test_own_and_unknown_conversations_have_a_history():
+    headers = {"X-API-Key": get_settings().api_key}
+    asyncio.run(conversation_history.claim("own", "default"))
+    for conversation_id in ["own", "unknown"]:
+        history = APIEndpoints.BACKEND_CHAT_HISTORY.format(
+            conversation_id=conversation_id
+        )
+        response = client.get(history, headers=headers)
+        assert response.status_code == 200
+        assert response.json()["messages"] == []
+
+
+def stage_count(stage: str) -> float:
+    # Any service label, the tracing setup is process-wide
+    return sum(
+        sample.value
+        for metric in REGISTRY.collect()
+        for sample in metric.samples
+        if sample.name == "chat_stage_duration_seconds_count"
+        and sample.labels["stage"] == stage
+    )
+
+
+def test_request_metrics_are_labelled_by_route_template():
+    headers = {"X-API-Key": get_settings().api_key}
+    stage = f"GET {APIEndpoints.BACKEND_CHAT_HISTORY}"
+    before = stage_count(stage), stage_count(UNMATCHED_ROUTE)
+    client.get("/chat/history/first", headers=headers)
+    client.get("/chat/history/second", headers=headers)
+    client.get("/no/such/path")
+    assert stage_count(stage) == before[0] + 2
+    assert stage_count(UNMATCHED_ROUTE) == before[1] + 1
+    assert stage_count("GET /chat/history/first") == 0
@@ -0,0 +1,92 @@
+import asyncio
+
+import pytest
+from backend.state import MemoryStateBackend, SQLiteStateBackend, StateBackend
+
+
+@pytest.fixture(params=["memory", "sqlite"])
+def make_backend(request, tmp_path):
+    def make(max_messages: int = 10, retention_seconds: float = 3600) -> StateBackend:
+        if request.param == "sqlite":
+            return SQLiteStateBackend(
+                str(tmp_path / "state.sqlite3"), max_messages, retention_seconds
+            )
+        return MemoryStateBackend(max_messages, retention_seconds)
+
+    return make
+
+
+def test_hit_enforces_the_sliding_window(make_backend):
+    async def scenario():
+        state = make_backend()
+        assert await state.hit("b", now=100.0, window_seconds=10, limit=2)
+        assert await state.hit("b", now=101.0, window_seconds=10, limit=2)
+        assert not await state.hit("b", now=102.0, window_seconds=10, limit=2)
+        assert await state.count("b", since=100.5) == 1
+        # The first request has left the window
+        assert await state.hit("b", now=110.5, window_seconds=10, limit=2)
+        assert await state.hit("other", now=102.0, window_seconds=10, limit=2)
+
+    asyncio.run(scenario())
+
+
+def test_messages_keep_order_and_cap(make_backend):
+    async def scenario():
+        state = make_backend(max_messages=3)
+        for i in range(5):
+            await state.append_message("c", f"m{i}")
+        await state.append_message("d", "other")
+        assert await state.get_messages("c") == ["m2", "m3", "m4"]
+        assert await state.get_messages("d") == ["other"]
+        assert await state.get_messages("unknown") == []
+
+    asyncio.run(scenario())
+
+
+def test_expired_messages_are_not_returned(make_backend):
+    async def scenario():
+        state = make_backend(retention_seconds=0)
+        await state.append_message("c", "old")
+        assert await state.get_messages("c") == []
+
+    asyncio.run(scenario())
+
+
+def test_sqlite_state_is_shared_between_instances(tmp_path):
+    async def scenario():
+        path = str(tmp_path / "state.sqlite3")
+        first = SQLiteStateBackend(path, max_messages=10, retention_seconds=3600)
+        second = SQLiteStateBackend(path, max_messages=10, retention_seconds=3600)
+        results = await asyncio.gather(
+            *(
+                state.hit("b", now=100.0, window_seconds=10, limit=3)
+                for state in [first, second] * 3
+            )
+        )
+        assert sorted(results) == [False, False, False, True, True, True]
+        await first.append_message("c", "hello")
+        assert await second.get_messages("c") == ["hello"]
+
+    asyncio.run(scenario())
+
+
+def test_conversation_belongs_to_the_key_that_started_it(make_backend):
+    async def scenario():
+        state = make_backend()
+        assert await state.conversation_owner("c") is None
+        assert await state.claim_conversation("c", "alice")
+        assert await state.claim_conversation("c", "alice")
+        assert not await state.claim_conversation("c", "bob")
+        assert await state.conversation_owner("c") == "alice"
+
+    asyncio.run(scenario())
+
+
+def test_expired_conversation_can_be_started_again(make_backend):
+    async def scenario():
+        state = make_backend(retention_seconds=0)
+        assert await state.claim_conversation("c", "alice")
+        assert await state.conversation_owner("c") is None
+        assert await state.claim_conversation("c", "bob")
+
+    asyncio.run(scenario())
@@ -0,0 +1,57 @@
+"""
+Micro-benchmark of the per-chunk cost of SSE encoding and decoding.
+
+Compares the previous path (model_dump + json.dumps, json.loads + StreamChunk(**data))
+with the interfaces.codec fast path.
+
+Usage:
+    uv run --package backend python benchmarks/codec_bench.py [--number 200000]
+"""
+
+import argparse
+import json
+import sys
+import timeit
+
+from interfaces.codec import decode_sse_line, encode_sse
+from interfaces.models import StreamChunk
+
+CHUNK = StreamChunk(content="aktivit", done=False)
+LINE = encode_sse(CHUNK).decode().rstrip("\n")
+
+
+def encode_stdlib() -> str:
+    return f"data: {json.dumps(CHUNK.model_dump())}\n\n"
+
+
+def encode_fast() -> bytes:
+    return encode_sse(CHUNK)
+
+
+def decode_stdlib() -> StreamChunk:
+    return StreamChunk(**json.loads(LINE[6:]))
+
+
+def decode_fast() -> StreamChunk | None:
+    return decode_sse_line(LINE)
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="StreamChunk codec micro-benchmark")
+    parser.add_argument("--number", type=int, default=200_000)
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    for name, fn in [
+        ("encode stdlib", encode_stdlib),
+        ("encode fast", encode_fast),
+        ("decode stdlib", decode_stdlib),
+        ("decode fast", decode_fast),
+    ]:
+        best = min(timeit.repeat(fn, number=args.number, repeat=args.repeat))
+        print(f"{name:<16}{best / args.number * 1e9:>10.0f} ns/chunk")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,325 @@
+"""
+End-to-end SSE load generator and latency benchmark for the chat path.
+
+Drives /chat/stream of the backend (or the database service directly) with
+N concurrent simulated users, each asking several Czech questions within one
+conversation, and records time-to-first-token, inter-token gaps, total
+latency, throughput and error/429 rates. Results are written as JSON and
+HTML reports that can be compared between commits.
+
+Usage:
+    uv run --package backend python benchmarks/load_test.py --users 20 --turns 3
+    uv run --package backend python benchmarks/load_test.py --target database --url http://localhost:9010 --api-key my-secret
+    uv run --package backend python benchmarks/load_test.py --compare before.json after.json
+
+Run the database service with DATABASE_LLM_PROVIDER=fake and
+DATABASE_GRAPH_PROVIDER=fake for repeatable numbers without network access.
+"""
+
+import argparse
+import asyncio
+import html
+import json
+import random
+import subprocess
+import sys
+import time
+from dataclasses import asdict, dataclass, field
+from datetime import UTC, datetime
+from pathlib import Path
+
+import httpx
+from interfaces.codec import JSON_HEADERS, decode_sse_line, encode_json
+from interfaces.endpoints import APIEndpoints
+from interfaces.models import (
+    ChatMessage,
+    ChatRequest,
+    DatabaseChatRequest,
+    MessageRole,
+)
+
+QUESTIONS = [
+    "Najdi mi všechny aktivity spojené s programováním na Vysočině.",
+    "Jaké stáže jsou dostupné pro studenty vysokých škol v Brně?",
+    "Které soutěže jsou určené pro studenty středních škol?",
+    "Hledám dobrovolnický program v Praze.",
+    "Jaké kurzy rozvíjí komunikační dovednosti?",
+    "Existují nějaké výjezdy do zahraničí zaměřené na přírodní vědy?",
+    "Které aktivity mi pomohou stát se datovým analytikem?",
+    "Najdi online kurzy zdarma pro studenty základních škol.",
+    "Jaké letní školy se konají v Jihomoravském kraji?",
+    "Doporuč mi aktivity podobné robotické olympiádě.",
+]
+
+FOLLOW_UPS = [
+    "A které z nich jsou zdarma?",
+    "Můžeš mi k první z nich říct víc?",
+    "Jsou některé z nich online?",
+    "A co podobné aktivity v jiném kraji?",
+]
+
+SUMMARY_METRICS = [
+    ("ttft_p50", "TTFT p50 [s]"),
+    ("ttft_p95", "TTFT p95 [s]"),
+    ("ttft_p99", "TTFT p99 [s]"),
+    ("gap_p50", "Inter-token gap p50 [s]"),
+    ("gap_p99", "Inter-token gap p99 [s]"),
+    ("latency_p50", "Total latency p50 [s]"),
+    ("latency_p95", "Total latency p95 [s]"),
+    ("latency_p99", "Total latency p99 [s]"),
+    ("requests_per_second", "Throughput [req/s]"),
+    ("chunks_per_second", "Throughput [chunks/s]"),
+    ("error_rate", "Error rate"),
+    ("rate_limited_rate", "429 rate"),
+]
+
+
+@dataclass
+class RequestResult:
+    user: int
+    turn: int
+    status_code: int = 0
+    ttft: float | None = None
+    latency: float = 0.0
+    chunks: int = 0
+    characters: int = 0
+    gaps: list[float] = field(default_factory=list)
+    error: str | None = None
+
+
+def percentile(values: list[float], q: float) -> float | None:
+    """Nearest-rank percentile, None for an empty sample."""
+    if not values:
+        return None
+    ordered = sorted(values)
+    index = min(len(ordered) - 1, max(0, round(q / 100 * len(ordered)) - 1))
+    return ordered[index]
+
+
+class LoadTest:
+    def __init__(self, args: argparse.Namespace) -> None:
+        self.args = args
+        self.results: list[RequestResult] = []
+
+    def _request(self, question: str, conversation_id: str | None, history: list):
+        if self.args.target == "database":
+            payload = DatabaseChatRequest(
+                query=ChatMessage(role=MessageRole.USER, content=question),
+                history=history,
+            )
+            path = APIEndpoints.DATABASE_CHAT_STREAM
+        else:
+            payload = ChatRequest(
+                message=ChatMessage(role=MessageRole.USER, content=question),
+                conversation_id=conversation_id,
+            )
+            path = APIEndpoints.BACKEND_CHAT_STREAM
+        return f"{self.args.url}{path}", encode_json(payload)
+
+    async def _ask(
+        self,
+        client: httpx.AsyncClient,
+        result: RequestResult,
+        question: str,
+        conversation_id: str | None,
+        history: list[ChatMessage],
+    ) -> tuple[str | None, str]:
+        url, payload = self._request(question, conversation_id, history)
+        answer = ""
+        started = time.perf_counter()
+        last_chunk = started
+        try:
+            async with client.stream(
+                "POST",
+                url,
+                content=payload,
+                headers={"X-API-Key": self.args.api_key, **JSON_HEADERS},
+                timeout=self.args.timeout,
+            ) as response:
+                result.status_code = response.status_code
+                conversation_id = response.headers.get(
+                    "X-Conversation-ID", conversation_id
+                )
+                if response.status_code != 200:
+                    result.error = (await response.aread()).decode()[:200]
+                    return conversation_id, answer
+
+                async for line in response.aiter_lines():
+                    chunk = decode_sse_line(line)
+                    if chunk is None:
+                        continue
+                    now = time.perf_counter()
+                    if chunk.error:
+                        result.error = chunk.error
+                        break
+                    if chunk.content:
+                        if result.ttft is None:
+                            result.ttft = now - started
+                        else:
+                            result.gaps.append(now - last_chunk)
+                        last_chunk = now
+                        result.chunks += 1
+                        result.characters += len(chunk.content)
+                        answer += chunk.content
+                    if chunk.done:
+                        break
+        except httpx.HTTPError as e:
+            result.error = f"{type(e).__name__}: {e}"
+        finally:
+            result.latency = time.perf_counter() - started
+        return conversation_id, answer
+
+    async def _user(self, client: httpx.AsyncClient, user: int) -> None:
+        rng = random.Random(self.args.seed + user)
+        # Spread user start over the ramp-up period
+        await asyncio.sleep(rng.uniform(0, self.args.ramp_up))
+        conversation_id: str | None = None
+        history: list[ChatMessage] = []
+
+        for turn in range(self.args.turns):
+            question = rng.choice(QUESTIONS if turn == 0 else FOLLOW_UPS)
+            result = RequestResult(user=user, turn=turn)
+            conversation_id, answer = await self._ask(
+                client, result, question, conversation_id, history
+            )
+            self.results.append(result)
+            history += [
+                ChatMessage(role=MessageRole.USER, content=question),
+                ChatMessage(role=MessageRole.ASSISTANT, content=answer),
+            ]
+            await asyncio.sleep(rng.uniform(0, 2 * self.args.think_time))
+
+    async def run(self) -> dict:
+        limits = httpx.Limits(max_connections=self.args.users)
+        started = time.perf_counter()
+        async with httpx.AsyncClient(limits=limits) as client:
+            await asyncio.gather(
+                *(self._user(client, user) for user in range(self.args.users))
+            )
+        return self.report(time.perf_counter() - started)
+
+    def report(self, duration: float) -> dict:
+        ok = [r for r in self.results if r.error is None and r.status_code == 200]
+        ttfts = [r.ttft for r in ok if r.ttft is not None]
+        gaps = [gap for r in ok for gap in r.gaps]
+        latencies = [r.latency for r in ok]
+        total = max(1, len(self.results))
+
+        summary = {
+            "requests": len(self.results),
+            "successful": len(ok),
+            "duration_seconds": duration,
+            "requests_per_second": len(ok) / duration,
+            "chunks_per_second": sum(r.chunks for r in ok) / duration,
+            "error_rate": (len(self.results) - len(ok)) / total,
+            "rate_limited_rate": sum(r.status_code == 429 for r in self.results)
+            / total,
+        }
+        for name, sample in (("ttft", ttfts), ("gap", gaps), ("latency", latencies)):
+            for q in (50, 90, 95, 99):
+                summary[f"{name}_p{q}"] = percentile(sample, q)
+
+        return {
+            "meta": {
+                "commit": git_commit(),
+                "started_at": datetime.now(UTC).isoformat(),
+                "target": self.args.target,
+                "url": self.args.url,
+                "users": self.args.users,
+                "turns": self.args.turns,
+                "think_time": self.args.think_time,
+            },
+            "summary": summary,
+            "requests": [asdict(r) for r in self.results],
+        }
+
+
+def git_commit() -> str:
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"],
+            capture_output=True,
+            text=True,
+            check=True,
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return "unknown"
+
+
+def format_value(value: float | None) -> str:
+    return "-" if value is None else f"{value:.3f}"
+
+
+def render_html(report: dict) -> str:
+    meta = report["meta"]
+    rows = "\n".join(
+        f"<tr><td>{label}</td><td>{format_value(report['summary'][key])}</td></tr>"
+        for key, label in SUMMARY_METRICS
+    )
+    errors = "\n".join(
+        f"<li>user {r['user']} turn {r['turn']}: {html.escape(r['error'])}</li>"
+        for r in report["requests"]
+        if r["error"]
+    )
+    return f"""<!DOCTYPE html>
+<html><head><meta charset="utf-8"><title>Chat load test {meta["commit"]}</title>
+<style>body{{font-family:sans-serif}}td{{padding:2px 12px}}</style></head>
+<body>
+<h1>Chat load test</h1>
+<p>commit {meta["commit"]}, {meta["started_at"]}, target {meta["target"]} ({html.escape(meta["url"])}),
+{meta["users"]} users x {meta["turns"]} turns, {report["summary"]["requests"]} requests</p>
+<table>{rows}</table>
+<h2>Errors</h2><ul>{errors or "<li>none</li>"}</ul>
+</body></html>
+"""
+
+
+def compare(before_path: str, after_path: str) -> None:
+    before = json.loads(Path(before_path).read_text())
+    after = json.loads(Path(after_path).read_text())
+    print(
+        f"{'metric':<28}{before['meta']['commit']:>12}{after['meta']['commit']:>12}{'change':>10}"
+    )
+    for key, label in SUMMARY_METRICS:
+        old, new = before["summary"].get(key), after["summary"].get(key)
+        change = f"{(new - old) / old:+.1%}" if old and new is not None else "-"
+        print(f"{label:<28}{format_value(old):>12}{format_value(new):>12}{change:>10}")
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="SSE chat load test")
+    parser.add_argument("--target", choices=["backend", "database"], default="backend")
+    parser.add_argument("--url", default="http://localhost:9001")
+    parser.add_argument("--api-key", default="dev-api-key")
+    parser.add_argument("--users", type=int, default=10)
+    parser.add_argument("--turns", type=int, default=3)
+    parser.add_argument("--think-time", type=float, default=1.0)
+    parser.add_argument("--ramp-up", type=float, default=2.0)
+    parser.add_argument("--timeout", type=float, default=60.0)
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--output-dir", default="benchmarks/results")
+    parser.add_argument(
+        "--compare", nargs=2, metavar=("BEFORE", "AFTER"), help="Compare two reports"
+    )
+    args = parser.parse_args()
+
+    if args.compare:
+        compare(*args.compare)
+        return 0
+
+    report = asyncio.run(LoadTest(args).run())
+
+    output_dir = Path(args.output_dir)
+    output_dir.mkdir(parents=True, exist_ok=True)
+    name = f"load_{report['meta']['commit']}_{int(time.time())}"
+    (output_dir / f"{name}.json").write_text(json.dumps(report, indent=2))
+    (output_dir / f"{name}.html").write_text(render_html(report))
+
+    for key, label in SUMMARY_METRICS:
+        print(f"{label:<28}{format_value(report['summary'][key]):>12}")
+    print(f"\nReports written to {output_dir / name}.json/.html")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
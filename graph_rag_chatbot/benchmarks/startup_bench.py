@@ -0,0 +1,150 @@
+"""
+Cold start benchmark of the database service.
+
+Profiles the imports of the app module with `python -X importtime` and
+measures how long a fresh uvicorn process takes until /health answers
+(the server accepts requests) and until /ready answers (the agent is
+initialized in the background).
+
+Usage:
+    uv run --package database python benchmarks/startup_bench.py [--runs 5] [--top 15]
+    uv run --package database python benchmarks/startup_bench.py --module database.cypher_agent.agent_langchain
+
+The service is started with DATABASE_LLM_PROVIDER=fake and
+DATABASE_GRAPH_PROVIDER=fake, so no network access is needed.
+"""
+
+import argparse
+import os
+import re
+import statistics
+import subprocess
+import sys
+import time
+
+import httpx
+
+IMPORT_LINE = re.compile(r"import time:\s+(\d+) \|\s+(\d+) \|( *)(\S+)")
+
+FAKE_ENV = {
+    "DATABASE_LLM_PROVIDER": "fake",
+    "DATABASE_GRAPH_PROVIDER": "fake",
+    "DATABASE_EMBEDDING_PROVIDER": "none",
+}
+
+
+def profile_imports(module: str, top: int) -> None:
+    """Print the total import time of a module and its slowest imports."""
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+        capture_output=True,
+        text=True,
+        env={**os.environ, **FAKE_ENV},
+        check=False,
+    )
+    if result.returncode != 0:
+        print(result.stderr.splitlines()[-1] if result.stderr else "import failed")
+        return
+
+    entries = []
+    total_us = 0
+    for line in result.stderr.splitlines():
+        match = IMPORT_LINE.match(line)
+        if not match:
+            continue
+        self_us, cumulative_us, indent, name = match.groups()
+        entries.append((int(cumulative_us), int(self_us), len(indent), name))
+        if len(indent) == 1:
+            total_us += int(cumulative_us)
+
+    print(f"import {module}: {total_us / 1000:.0f} ms")
+    # Nested packages repeat their parents' cost, show the outermost import of each package
+    seen: set[str] = set()
+    rows = []
+    for cumulative_us, self_us, _, name in sorted(entries, reverse=True):
+        root = name.split(".")[0]
+        if root in seen:
+            continue
+        seen.add(root)
+        rows.append((cumulative_us, self_us, name))
+    print(f"  {'cumulative':>12}{'self':>10}  module")
+    for cumulative_us, self_us, name in rows[:top]:
+        print(f"  {cumulative_us / 1000:>10.1f}ms{self_us / 1000:>8.1f}ms  {name}")
+
+
+def wait_for(
+    client: httpx.Client, url: str, started: float, timeout: float
+) -> float | None:
+    """Seconds since start until url answers 200, None on timeout."""
+    while time.perf_counter() - started < timeout:
+        try:
+            if client.get(url).status_code == 200:
+                return time.perf_counter() - started
+        except httpx.TransportError:
+            pass
+        time.sleep(0.01)
+    return None
+
+
+def cold_start(port: int, timeout: float) -> tuple[float | None, float | None]:
+    """Time until /health and /ready answer for one fresh server process."""
+    base_url = f"http://127.0.0.1:{port}"
+    started = time.perf_counter()
+    server = subprocess.Popen(
+        [sys.executable, "-m", "uvicorn", "database.main:app", "--port", str(port)],
+        env={**os.environ, **FAKE_ENV},
+        stdout=subprocess.DEVNULL,
+        stderr=subprocess.DEVNULL,
+    )
+    try:
+        with httpx.Client(timeout=1.0) as client:
+            health = wait_for(client, f"{base_url}/health", started, timeout)
+            ready = wait_for(client, f"{base_url}/ready", started, timeout)
+    finally:
+        server.terminate()
+        server.wait()
+    return health, ready
+
+
+def summary(name: str, values: list[float | None]) -> str:
+    measured = [v for v in values if v is not None]
+    if not measured:
+        return f"{name:<8} timed out"
+    return (
+        f"{name:<8} median {statistics.median(measured) * 1000:>7.0f} ms, "
+        f"min {min(measured) * 1000:>7.0f} ms, max {max(measured) * 1000:>7.0f} ms"
+        + (
+            f" ({len(values) - len(measured)} timed out)"
+            if len(measured) < len(values)
+            else ""
+        )
+    )
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(
+        description="Database service cold start benchmark"
+    )
+    parser.add_argument(
+        "--module", default="database.main", help="Module to profile imports of"
+    )
+    parser.add_argument("--top", type=int, default=15, help="Slowest imports to show")
+    parser.add_argument(
+        "--runs", type=int, default=5, help="Server starts to measure (0 skips)"
+    )
+    parser.add_argument("--port", type=int, default=9099)
+    parser.add_argument("--timeout", type=float, default=60.0)
+    args = parser.parse_args()
+
+    profile_imports(args.module, args.top)
+
+    if args.runs:
+        results = [cold_start(args.port, args.timeout) for _ in range(args.runs)]
+        print(f"\nCold start over {args.runs} runs:")
+        print(summary("/health", [health for health, _ in results]))
+        print(summary("/ready", [ready for _, ready in results]))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
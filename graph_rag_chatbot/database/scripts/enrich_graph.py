@@ -0,0 +1,445 @@
+"""
+LLM enrichment of activities with Concepts, MentionedEntities and Technologies
+
+Sends activities to the LLM in batches, with bounded concurrency and
+retries through the LLM gateway, and writes the structured extractions
+to the graph with bulk UNWIND statements:
+
+    (Activity)-[:HAS_CONCEPT]->(Concept)
+    (Activity)-[:MENTIONS]->(MentionedEntity)
+    (Activity)-[:USES_TECHNOLOGY]->(Technology)
+    (Activity)-[:PREPARES_FOR]->(Job)
+    (Organisation)-[:PARTNERS_WITH]->(Organisation)
+
+Extractions are cached on disk keyed by a hash of the activity text and
+the prompt version, so reruns only send new or changed activities. The
+cache is saved after every batch, an interrupted run loses nothing.
+Writing replaces the extracted edges of each enriched activity, edges
+from an older extraction do not survive a rerun.
+
+Usage:
+    uv run --package database python database/scripts/enrich_graph.py [--fake] [--dry-run]
+
+    --fake: Use the fake LLM with a keyword-based extractor, runs offline,
+            implies --dry-run unless --write-fake is given
+    --dry-run: Extract and cache only, do not write to the graph
+    --limit N: Only process the first N activities
+
+Run load_graph.py first, the activities and jobs must exist in the graph.
+"""
+
+import argparse
+import asyncio
+import hashlib
+import json
+import re
+import sys
+import time
+from pathlib import Path
+
+from database.config import get_settings
+from database.fakes import FakeChatModel
+from database.graph_projection import SET_GRAPH_VERSION_QUERY
+from database.llm_gateway import PRIORITY_ANSWER, LLMGateway
+from database.providers import create_driver, create_llm
+from dotenv import load_dotenv
+from langchain_core.language_models.chat_models import BaseChatModel
+from neo4j.exceptions import Neo4jError
+from ontology import JOBS
+from organisations import normalize_name
+
+# Bump when the prompt or the output format changes, invalidates the cache
+PROMPT_VERSION = "1"
+
+EXTRACTION_PROMPT = """Extract structured information from the descriptions of the activities below.
+For every activity return an object with:
+- "id": the activity id
+- "concepts": up to 5 abstract themes of the activity, short Czech nouns (e.g. "udržitelnost")
+- "mentioned_entities": other organisations, programmes or competitions named in the text, as objects {{"name": ..., "type": "organisation" | "program" | "competition"}}
+- "technologies": tools, platforms and technologies used (e.g. "Python", "Arduino")
+- "prepares_for": jobs the activity prepares for, only from this list: {jobs}
+- "partners": names of partner organisations of the organiser named in the text
+
+Answer with a JSON array only, without any other text.
+
+Activities:
+{activities}"""
+
+ENTITY_TYPES = {"organisation", "program", "competition"}
+
+CODE_FENCE = re.compile(r"^```(?:json)?\s*|\s*```$")
+
+# Edges owned by the extraction of one activity, replaced on every write.
+# PARTNERS_WITH links organisations and may come from several activities.
+DELETE_QUERY = """
+    UNWIND $ids AS id
+    MATCH (a:Activity {id: id})-[r:HAS_CONCEPT|MENTIONS|USES_TECHNOLOGY|PREPARES_FOR]->()
+    DELETE r
+"""
+
+DELETE_ORPHANS_QUERY = """
+    MATCH (n)
+    WHERE (n:Concept OR n:MentionedEntity OR n:Technology) AND NOT EXISTS { (n)--() }
+    DELETE n
+"""
+
+WRITE_QUERIES = {
+    "concepts": """
+        UNWIND $rows AS row
+        MATCH (a:Activity {id: row.id})
+        UNWIND row.concepts AS item
+        MERGE (c:Concept {key: item.key})
+        ON CREATE SET c.name = item.name
+        MERGE (a)-[:HAS_CONCEPT]->(c)
+    """,
+    "mentioned_entities": """
+        UNWIND $rows AS row
+        MATCH (a:Activity {id: row.id})
+        UNWIND row.mentioned_entities AS item
+        MERGE (e:MentionedEntity {key: item.key})
+        ON CREATE SET e.name = item.name, e.type = item.type
+        MERGE (a)-[:MENTIONS]->(e)
+    """,
+    "technologies": """
+        UNWIND $rows AS row
+        MATCH (a:Activity {id: row.id})
+        UNWIND row.technologies AS item
+        MERGE (t:Technology {key: item.key})
+        ON CREATE SET t.name = item.name
+        MERGE (a)-[:USES_TECHNOLOGY]->(t)
+    """,
+    "prepares_for": """
+        UNWIND $rows AS row
+        MATCH (a:Activity {id: row.id})
+        UNWIND row.prepares_for AS item
+        MATCH (j:Job {name: item.name})
+        MERGE (a)-[:PREPARES_FOR]->(j)
+    """,
+    "partners": """
+        UNWIND $rows AS row
+        MATCH (a:Activity {id: row.id})-[:ORGANIZED_BY]->(o:Organisation)
+        UNWIND row.partners AS item
+        MATCH (p:Organisation {normalizedName: item.key})
+        WHERE p <> o
+        MERGE (o)-[:PARTNERS_WITH]->(p)
+    """,
+}
+
+ENRICHMENT_INDEXES = [
+    "CREATE CONSTRAINT concept_key IF NOT EXISTS FOR (n:Concept) REQUIRE n.key IS UNIQUE",
+    "CREATE CONSTRAINT mentioned_entity_key IF NOT EXISTS FOR (n:MentionedEntity) REQUIRE n.key IS UNIQUE",
+    "CREATE CONSTRAINT technology_key IF NOT EXISTS FOR (n:Technology) REQUIRE n.key IS UNIQUE",
+]
+
+# Keywords of the offline extractor used with --fake
+FAKE_TECHNOLOGIES = [
+    "Python",
+    "Java",
+    "JavaScript",
+    "Arduino",
+    "Raspberry Pi",
+    "Scratch",
+    "Excel",
+    "SQL",
+    "Lego",
+    "3D tisk",
+    "Minecraft",
+    "Unity",
+    "R",
+]
+FAKE_CONCEPTS = {
+    "programování": "programování",
+    "příroda": "ochrana přírody",
+    "podnikání": "podnikavost",
+    "věda": "věda",
+    "robot": "robotika",
+    "dobrovol": "dobrovolnictví",
+    "soutěž": "soutěžení",
+    "jazyk": "jazyky",
+    "zdraví": "zdraví",
+    "umění": "umění",
+}
+
+
+def activity_text(activity: dict) -> str:
+    return "\n".join(
+        part
+        for part in (
+            activity["title"],
+            activity.get("short_description", ""),
+            activity.get("long_description", ""),
+        )
+        if part
+    )
+
+
+def cache_key(text: str) -> str:
+    return hashlib.sha256(f"{PROMPT_VERSION}\n{text}".encode()).hexdigest()
+
+
+def fake_extraction(prompt: str) -> str:
+    """Keyword-based extraction in the format the prompt asks for."""
+    section = prompt.split("Activities:", 1)[-1]
+    results = []
+    for block in re.split(r"\n(?=### )", section.strip()):
+        match = re.match(r"### (\S+)\n", block)
+        if not match:
+            continue
+        lower = block.lower()
+        results.append(
+            {
+                "id": match.group(1),
+                "concepts": [c for k, c in FAKE_CONCEPTS.items() if k in lower][:5],
+                "mentioned_entities": [],
+                "technologies": [
+                    t
+                    for t in FAKE_TECHNOLOGIES
+                    if re.search(rf"\b{re.escape(t.lower())}\b", lower)
+                ],
+                "prepares_for": [
+                    job["name"] for job in JOBS if job["name"].lower() in lower
+                ],
+                "partners": [],
+            }
+        )
+    return json.dumps(results, ensure_ascii=False)
+
+
+def normalize(extraction: dict) -> dict:
+    """Clean names and add the merge keys, drops anything malformed."""
+
+    def names(values) -> list[str]:
+        if not isinstance(values, list):
+            return []
+        cleaned = (" ".join(str(v).split()) for v in values if isinstance(v, str))
+        return list(dict.fromkeys(v for v in cleaned if 1 < len(v) <= 80))
+
+    def items(values) -> list[dict]:
+        return [{"key": name.lower(), "name": name} for name in names(values)]
+
+    entities = []
+    for entity in extraction.get("mentioned_entities") or []:
+        if isinstance(entity, dict) and isinstance(entity.get("name"), str):
+            name = " ".join(entity["name"].split())
+            kind = (
+                entity.get("type")
+                if entity.get("type") in ENTITY_TYPES
+                else "organisation"
+            )
+            entities.append({"key": name.lower(), "name": name, "type": kind})
+
+    job_names = {job["name"] for job in JOBS}
+    return {
+        "concepts": items(extraction.get("concepts"))[:5],
+        "mentioned_entities": entities,
+        "technologies": items(extraction.get("technologies")),
+        "prepares_for": [
+            {"name": name}
+            for name in names(extraction.get("prepares_for"))
+            if name in job_names
+        ],
+        "partners": [
+            {"key": normalize_name(name), "name": name}
+            for name in names(extraction.get("partners"))
+        ],
+    }
+
+
+class ExtractionCache:
+    """Extractions keyed by cache_key, persisted as one JSON file."""
+
+    def __init__(self, path: Path) -> None:
+        self.path = path
+        self.entries: dict[str, dict] = {}
+        if path.exists():
+            with open(path, encoding="utf-8") as f:
+                self.entries = json.load(f)
+
+    def save(self) -> None:
+        tmp = self.path.with_suffix(self.path.suffix + ".tmp")
+        with open(tmp, "w", encoding="utf-8") as f:
+            json.dump(self.entries, f, ensure_ascii=False)
+        tmp.replace(self.path)
+
+
+class Enricher:
+    def __init__(
+        self,
+        llm: BaseChatModel,
+        gateway: LLMGateway,
+        cache: ExtractionCache,
+        batch_size: int,
+        max_text_length: int = 2000,
+    ) -> None:
+        self.llm = llm
+        self.gateway = gateway
+        self.cache = cache
+        self.batch_size = batch_size
+        self.max_text_length = max_text_length
+        self.failed_batches = 0
+
+    def _prompt(self, batch: list[dict]) -> str:
+        activities = "\n\n".join(
+            f"### {a['id']}\n{activity_text(a)[: self.max_text_length]}" for a in batch
+        )
+        jobs = ", ".join(job["name"] for job in JOBS)
+        return EXTRACTION_PROMPT.format(jobs=jobs, activities=activities)
+
+    async def _extract_batch(self, batch: list[dict]) -> None:
+        prompt = self._prompt(batch)
+        try:
+            message = await self.gateway.call(
+                lambda: self.llm.ainvoke(prompt), PRIORITY_ANSWER
+            )
+            content = CODE_FENCE.sub("", str(message.content).strip())
+            results = {
+                str(r["id"]): r for r in json.loads(content) if isinstance(r, dict)
+            }
+        except Exception as e:  # noqa: BLE001
+            # Any failure of the model or its output, not cached, retried on the next run
+            self.failed_batches += 1
+            print(f"  Warning: batch of {len(batch)} failed: {e}")
+            return
+
+        for activity in batch:
+            extraction = results.get(str(activity["id"]))
+            if extraction is not None:
+                self.cache.entries[cache_key(activity_text(activity))] = normalize(
+                    extraction
+                )
+        # Saved per batch, an interrupted run keeps the calls already paid for
+        self.cache.save()
+
+    async def extract(self, activities: list[dict]) -> int:
+        """Extract all activities missing from the cache, returns how many were sent."""
+        missing = [
+            a
+            for a in activities
+            if cache_key(activity_text(a)) not in self.cache.entries
+        ]
+        batches = [
+            missing[i : i + self.batch_size]
+            for i in range(0, len(missing), self.batch_size)
+        ]
+        # The gateway bounds the number of concurrent LLM calls
+        await asyncio.gather(*(self._extract_batch(batch) for batch in batches))
+        return len(missing)
+
+
+def write_enrichments(
+    driver, activities: list[dict], cache: ExtractionCache, batch_size: int = 500
+):
+    """Bulk write the cached extractions of the activities to the graph."""
+    rows = []
+    for activity in activities:
+        extraction = cache.entries.get(cache_key(activity_text(activity)))
+        if extraction is not None:
+            rows.append({"id": activity["id"], **extraction})
+
+    with driver.session(database="neo4j") as session:
+        for statement in ENRICHMENT_INDEXES:
+            try:
+                session.run(statement).consume()
+            except Neo4jError as e:
+                print(f"  Warning: {e}")
+        for start in range(0, len(rows), batch_size):
+            ids = [row["id"] for row in rows[start : start + batch_size]]
+            session.run(DELETE_QUERY, {"ids": ids}).consume()
+        for kind, query in WRITE_QUERIES.items():
+            for start in range(0, len(rows), batch_size):
+                session.run(query, {"rows": rows[start : start + batch_size]}).consume()
+            print(f"  Wrote {kind} of {len(rows)} activities")
+        session.run(DELETE_ORPHANS_QUERY).consume()
+        session.run(
+            SET_GRAPH_VERSION_QUERY, {"version": f"enriched-{int(time.time())}"}
+        ).consume()
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Enrich activities in the graph with an LLM"
+    )
+    parser.add_argument(
+        "--fake",
+        action="store_true",
+        help="Use the offline fake LLM, implies --dry-run",
+    )
+    parser.add_argument(
+        "--write-fake",
+        action="store_true",
+        help="Write the fake extractions to the graph anyway",
+    )
+    parser.add_argument(
+        "--dry-run", action="store_true", help="Do not write to the graph"
+    )
+    parser.add_argument(
+        "--limit", type=int, default=None, help="Only the first N activities"
+    )
+    parser.add_argument(
+        "--batch-size", type=int, default=8, help="Activities per LLM call"
+    )
+    parser.add_argument(
+        "--concurrency", type=int, default=4, help="Concurrent LLM calls"
+    )
+    args = parser.parse_args()
+
+    load_dotenv()
+    settings = get_settings()
+
+    script_dir = Path(__file__).parent
+    json_path = script_dir / "activities_real.json"
+    if not json_path.exists():
+        print(f"Error: {json_path} not found")
+        return 1
+    with open(json_path, encoding="utf-8") as f:
+        activities = json.load(f).get("activities", [])[: args.limit]
+
+    if args.fake:
+        llm = FakeChatModel(
+            first_token_delay_seconds=0.0,
+            tokens_per_second=1e9,
+            responder=fake_extraction,
+        )
+    else:
+        llm = create_llm(settings)
+    gateway = LLMGateway(
+        max_in_flight=args.concurrency,
+        max_retries=settings.llm_max_retries,
+        backoff_base_seconds=settings.llm_backoff_base_seconds,
+        backoff_max_seconds=settings.llm_backoff_max_seconds,
+    )
+    # Fake extractions are kept apart so they never end up in the real graph
+    cache_name = (
+        "activities_real_enrichment_fake.json"
+        if args.fake
+        else "activities_real_enrichment.json"
+    )
+    cache = ExtractionCache(script_dir / cache_name)
+    enricher = Enricher(llm, gateway, cache, args.batch_size)
+
+    print(f"Enriching {len(activities)} activities...")
+    started = time.perf_counter()
+    sent = asyncio.run(enricher.extract(activities))
+    cache.save()
+    print(
+        f"  Sent {sent} activities to the LLM ({len(activities) - sent} cached, "
+        f"{enricher.failed_batches} failed batches) in {time.perf_counter() - started:.1f}s"
+    )
+
+    if args.dry_run:
+        return 0
+    if args.fake and not args.write_fake:
+        print("  Fake extractions are not written, pass --write-fake to write them")
+        return 0
+
+    driver = create_driver(settings)
+    try:
+        write_enrichments(driver, activities, cache)
+    finally:
+        driver.close()
+    print("\n✓ Graph enriched")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -5,18 +5,59 @@ This script loads activities data into Memgraph graph database.
 It creates nodes and relationships based on the defined schema.
 
 Usage:
-    python load_graph.py [--clear]
+    uv run --package database python database/scripts/load_graph.py [--clear] [--embeddings PROVIDER]
 
     --clear: Clear existing data before loading
+    --embeddings: Embed activities for vector search (sentence_transformers, hashing, none)
+    --facet-depth: Maximum number of facets per materialized count
+    --no-communities: Skip community detection (needs networkx otherwise)
 
 Requirements:
     pip install neo4j # working with memgraph and neo4j too
+    Full-text indexes are created with the Neo4j syntax, on Memgraph they are skipped with a warning.
 """
 
 import json
 import argparse
+import uuid
 from pathlib import Path
 from neo4j import GraphDatabase
+from neo4j.exceptions import Neo4jError
+
+from database.communities import (
+    ACTIVITY_FEATURES_QUERY,
+    COMMUNITY_INDEXES,
+    CREATE_COMMUNITIES_QUERY,
+    DELETE_COMMUNITIES_QUERY,
+    SET_COMMUNITY_IDS_QUERY,
+    detect_communities,
+    summarize_communities,
+)
+from database.embeddings import (
+    DEFAULT_MODEL,
+    EmbeddingCache,
+    activity_text,
+    content_hash,
+    create_embedder,
+    create_vector_index_statement,
+)
+from database.facets import (
+    ACTIVITY_FACETS_QUERY,
+    CREATE_FACET_COUNTS_QUERY,
+    DEFAULT_DEPTH,
+    DELETE_FACET_COUNTS_QUERY,
+    FACET_COUNT_INDEXES,
+    SET_FACET_DEPTH_QUERY,
+    compute_facet_counts,
+)
+from database.fulltext import FULLTEXT_INDEXES, create_index_statement
+from database.graph_projection import (
+    NAMED_NODES_QUERY,
+    SEARCH_NAME_LABELS,
+    SET_GRAPH_VERSION_QUERY,
+    SET_SEARCH_NAMES_QUERY,
+    fold,
+)
 
 from ontology import (
     LEVELS_OF_STUDY,
@@ -37,6 +78,7 @@ from ontology import (
     FORMAT_KEYWORDS,
     FUNDING_KEYWORDS,
 )
+from organisations import OrganisationResolver
 
 # Graph connection settings
 GRAPH_URI = "bolt://localhost:7687"
@@ -47,7 +89,7 @@ GRAPH_PASSWORD = ""
 class GraphLoader:
     def __init__(self, uri: str, user: str, password: str):
         self.driver = GraphDatabase.driver(uri, auth=(user, password) if user else None)
-        self.organisations = {}  # Track created organisations {name: id}
+        self.organisations = OrganisationResolver()
 
     def close(self):
         self.driver.close()
@@ -94,6 +136,10 @@ class GraphLoader:
         indexes = [
             "CREATE INDEX ON :Activity(name)",
             "CREATE INDEX ON :Organisation(name)",
+            "CREATE INDEX organisation_normalized_name IF NOT EXISTS "
+            "FOR (o:Organisation) ON (o.normalizedName)",
+            "CREATE INDEX organisation_domain IF NOT EXISTS "
+            "FOR (o:Organisation) ON (o.domain)",
             "CREATE INDEX ON :ActivityType(name)",
             "CREATE INDEX ON :Location(name)",
         ]
@@ -104,6 +150,13 @@ class GraphLoader:
             except Exception:
                 pass  # Index might already exist
 
+        # Full-text indexes for keyword search over names and descriptions
+        for name in FULLTEXT_INDEXES:
+            try:
+                self.execute(create_index_statement(name))
+            except Neo4jError as e:
+                print(f"Warning: full-text index {name} not created: {e}")
+
         print("Constraints and indexes created.")
 
     def load_static_nodes(self):
@@ -293,22 +346,44 @@ class GraphLoader:
                     break
         return detected
 
-    def get_or_create_organisation(self, name: str, is_nonprofit: bool = True) -> int:
-        """Get existing organisation ID or create new one."""
-        if name in self.organisations:
-            return self.organisations[name]
-
-        org_id = len(self.organisations) + 1
-
+    def create_organisations(self, organised_by: list[dict]):
+        """Create the deduplicated Organisation nodes and ORGANIZED_BY relationships."""
         self.execute(
             """
-            CREATE (n:Organisation {id: $id, name: $name, isNonProfit: $isNonProfit})
+            UNWIND $rows AS row
+            CREATE (n:Organisation {
+                id: row.id,
+                name: row.name,
+                normalizedName: row.normalizedName,
+                domain: row.domain,
+                aliases: row.aliases,
+                isNonProfit: row.isNonProfit
+            })
         """,
-            {"id": org_id, "name": name, "isNonProfit": is_nonprofit},
+            {
+                "rows": [
+                    {
+                        "id": o.id,
+                        "name": o.name,
+                        "normalizedName": o.normalized_name,
+                        "domain": o.domain,
+                        "aliases": sorted(o.aliases),
+                        # None, an unknown legal form, leaves the property unset
+                        "isNonProfit": o.is_nonprofit,
+                    }
+                    for o in self.organisations.organisations
+                ]
+            },
+        )
+        self.execute(
+            """
+            UNWIND $rows AS row
+            MATCH (a:Activity {id: row.activity_id})
+            MATCH (o:Organisation {id: row.org_id})
+            CREATE (a)-[:ORGANIZED_BY]->(o)
+        """,
+            {"rows": organised_by},
         )
-
-        self.organisations[name] = org_id
-        return org_id
 
     def load_activities(self, json_path: str):
         """Load activities from JSON file."""
@@ -319,6 +394,7 @@ class GraphLoader:
 
         activities = data.get("activities", [])
         print(f"  Found {len(activities)} activities")
+        organised_by = []
 
         for activity in activities:
             # Create Activity node
@@ -358,16 +434,12 @@ class GraphLoader:
                 },
             )
 
-            # Create Organisation and ORGANIZED_BY relationship
-            org_id = self.get_or_create_organisation(name)
-            self.execute(
-                """
-                MATCH (a:Activity {id: $activity_id})
-                MATCH (o:Organisation {id: $org_id})
-                CREATE (a)-[:ORGANIZED_BY]->(o)
-            """,
-                {"activity_id": activity_id, "org_id": org_id},
-            )
+            # Resolve the organiser, nodes are created once all are known
+            organisation = self.organisations.resolve(metadata, url)
+            if organisation is not None:
+                organised_by.append(
+                    {"activity_id": activity_id, "org_id": organisation.id}
+                )
 
             # AIMS_TO -> LevelOfStudy
             for edu_level in activity.get("education_level", []):
@@ -454,8 +526,14 @@ class GraphLoader:
                     {"activity_id": activity_id, "funding_id": funding_id},
                 )
 
+        self.create_organisations(organised_by)
+
         print(f"  Created {len(activities)} Activity nodes with relationships")
-        print(f"  Created {len(self.organisations)} Organisation nodes")
+        print(
+            f"  Created {len(self.organisations)} Organisation nodes "
+            f"({self.organisations.fuzzy_matches} fuzzy matches, "
+            f"{len(activities) - len(organised_by)} activities without a known organiser)"
+        )
 
     def create_organisation_relationships(self):
         """Create Organisation relationships (PARTNERS_WITH, OPERATES_IN)."""
@@ -482,29 +560,174 @@ class GraphLoader:
 
         print("  Organisation relationships created")
 
+    def embed_activities(
+        self,
+        provider: str,
+        cache_path: Path,
+        batch_size: int = 64,
+        write_batch_size: int = 500,
+    ):
+        """Embed activity texts and store them in the Activity vector index."""
+        print(f"Embedding activities ({provider})...")
+        try:
+            embedder = create_embedder(provider, DEFAULT_MODEL)
+            dimensions = embedder.dimensions
+        except ImportError:
+            print("  Warning: sentence-transformers not installed, skipping embeddings")
+            print("  Install with: uv sync --package database --extra embeddings")
+            return
+
+        activities = self.execute("""
+            MATCH (a:Activity)
+            RETURN a.id AS id, a.name AS name,
+                   a.shortDescription AS short, a.longDescription AS long
+        """)
+        texts = {
+            record["id"]: activity_text(
+                record["name"], record["short"] or "", record["long"] or ""
+            )
+            for record in activities
+        }
+        hashes = {id_: content_hash(embedder.name, text) for id_, text in texts.items()}
+
+        # Only new or changed texts are embedded
+        cache = EmbeddingCache(cache_path)
+        missing = [id_ for id_, key in hashes.items() if key not in cache]
+        for start in range(0, len(missing), batch_size):
+            batch = missing[start : start + batch_size]
+            vectors = embedder.embed([texts[id_] for id_ in batch])
+            for id_, vector in zip(batch, vectors, strict=True):
+                cache[hashes[id_]] = vector
+        cache.prune(set(hashes.values()))
+        cache.save()
+        print(
+            f"  Embedded {len(missing)} activities, {len(hashes) - len(missing)} from cache"
+        )
+
+        rows = [
+            {"id": id_, "embedding": cache[key], "hash": key}
+            for id_, key in hashes.items()
+        ]
+        for start in range(0, len(rows), write_batch_size):
+            self.execute(
+                """
+                UNWIND $rows AS row
+                MATCH (a:Activity {id: row.id})
+                SET a.embedding = row.embedding, a.embeddingHash = row.hash
+            """,
+                {"rows": rows[start : start + write_batch_size]},
+            )
+
+        try:
+            self.execute(create_vector_index_statement(dimensions))
+        except Neo4jError as e:
+            print(f"  Warning: vector index not created: {e}")
+        print(f"  Stored {len(rows)} embeddings ({dimensions} dimensions)")
+
+    def materialize_facets(self, depth: int, write_batch_size: int = 1000):
+        """Store activity counts per facet combination as FacetCount nodes."""
+        print(f"Materializing facet counts (up to {depth} facets)...")
+        activities = [record.data() for record in self.execute(ACTIVITY_FACETS_QUERY)]
+        rows = compute_facet_counts(activities, depth)
+
+        self.execute(DELETE_FACET_COUNTS_QUERY)
+        for start in range(0, len(rows), write_batch_size):
+            self.execute(
+                CREATE_FACET_COUNTS_QUERY,
+                {"rows": rows[start : start + write_batch_size]},
+            )
+        for index in FACET_COUNT_INDEXES:
+            try:
+                self.execute(index)
+            except Neo4jError as e:
+                print(f"  Warning: {e}")
+        self.execute(SET_FACET_DEPTH_QUERY, {"depth": depth})
+        print(f"  Created {len(rows)} FacetCount nodes")
+
+    def detect_communities(self, write_batch_size: int = 1000):
+        """Cluster similar activities and store communityId and Community summaries."""
+        print("Detecting communities...")
+        activities = [record.data() for record in self.execute(ACTIVITY_FEATURES_QUERY)]
+        try:
+            membership = detect_communities(activities)
+        except ImportError:
+            print("  Warning: networkx not installed, skipping communities")
+            print("  Install with: uv sync --package database --extra communities")
+            return
+        summaries = summarize_communities(activities, membership)
+
+        rows = [{"id": id_, "community": c} for id_, c in membership.items()]
+        for start in range(0, len(rows), write_batch_size):
+            self.execute(
+                SET_COMMUNITY_IDS_QUERY,
+                {"rows": rows[start : start + write_batch_size]},
+            )
+        self.execute(DELETE_COMMUNITIES_QUERY)
+        self.execute(CREATE_COMMUNITIES_QUERY, {"rows": summaries})
+        for index in COMMUNITY_INDEXES:
+            try:
+                self.execute(index)
+            except Neo4jError as e:
+                print(f"  Warning: {e}")
+
+        print(f"  Found {len(summaries)} communities")
+        for summary in summaries[:10]:
+            print(
+                f"    {summary['id']}: {summary['label']} ({summary['size']} activities)"
+            )
+
+    def store_search_names(self, write_batch_size: int = 1000):
+        """Store the folded name of looked up nodes, matched by the Neo4j fallback queries."""
+        print("Storing search names...")
+        rows = [
+            {"eid": record["eid"], "searchName": fold(record["name"])}
+            for record in self.execute(
+                NAMED_NODES_QUERY, {"labels": SEARCH_NAME_LABELS}
+            )
+        ]
+        for start in range(0, len(rows), write_batch_size):
+            self.execute(
+                SET_SEARCH_NAMES_QUERY, {"rows": rows[start : start + write_batch_size]}
+            )
+        print(f"  Stored {len(rows)} search names")
+
+    def stamp_version(self) -> str:
+        """Mark the graph with a new version, services reload their projection on change."""
+        version = uuid.uuid4().hex
+        self.execute(SET_GRAPH_VERSION_QUERY, {"version": version})
+        print(f"Graph version: {version}")
+        return version
+
     def print_statistics(self):
-        """Print database statistics."""
+        """Print database statistics, from the count store instead of full scans."""
         print("\n=== Database Statistics ===")
 
-        node_counts = self.execute("""
-            MATCH (n)
-            RETURN labels(n)[0] AS label, count(*) AS count
-            ORDER BY count DESC
-        """)
+        labels = [record["label"] for record in self.execute("CALL db.labels()")]
+        node_counts = {
+            label: self.execute(f"MATCH (n:`{label}`) RETURN count(n) AS count")[0][
+                "count"
+            ]
+            for label in labels
+        }
 
         print("\nNode counts:")
-        for record in node_counts:
-            print(f"  {record['label']}: {record['count']}")
+        for label, count in sorted(node_counts.items(), key=lambda x: -x[1]):
+            print(f"  {label}: {count}")
 
-        rel_counts = self.execute("""
-            MATCH ()-[r]->()
-            RETURN type(r) AS type, count(*) AS count
-            ORDER BY count DESC
-        """)
+        rel_types = [
+            record["relationshipType"]
+            for record in self.execute("CALL db.relationshipTypes()")
+        ]
+        rel_counts = {
+            rel_type: self.execute(
+                f"MATCH ()-[r:`{rel_type}`]->() RETURN count(r) AS count"
+            )[0]["count"]
+            for rel_type in rel_types
+        }
 
         print("\nRelationship counts:")
-        for record in rel_counts:
-            print(f"  {record['type']}: {record['count']}")
+        for rel_type, count in sorted(rel_counts.items(), key=lambda x: -x[1]):
+            print(f"  {rel_type}: {count}")
 
 
 def main():
@@ -512,6 +735,23 @@ def main():
     parser.add_argument(
         "--clear", action="store_true", help="Clear existing data before loading"
     )
+    parser.add_argument(
+        "--embeddings",
+        choices=["sentence_transformers", "hashing", "none"],
+        default="sentence_transformers",
+        help="Embedder for the activity vector index, must match DATABASE_EMBEDDING_PROVIDER",
+    )
+    parser.add_argument(
+        "--facet-depth",
+        type=int,
+        default=DEFAULT_DEPTH,
+        help="Maximum number of facets per materialized count (0 disables)",
+    )
+    parser.add_argument(
+        "--no-communities",
+        action="store_true",
+        help="Skip community detection of similar activities",
+    )
     args = parser.parse_args()
 
     # Get the path to activities_real.json
@@ -533,6 +773,16 @@ def main():
         loader.load_static_nodes()
         loader.load_activities(str(json_path))
         loader.create_organisation_relationships()
+        loader.store_search_names()
+        if args.embeddings != "none":
+            loader.embed_activities(
+                args.embeddings, script_dir / "activities_real_embeddings.json"
+            )
+        if not args.no_communities:
+            loader.detect_communities()
+        if args.facet_depth > 0:
+            loader.materialize_facets(args.facet_depth)
+        loader.stamp_version()
         loader.print_statistics()
 
         print("\n✓ Graph data loaded successfully!")
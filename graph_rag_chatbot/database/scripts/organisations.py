@@ -0,0 +1,236 @@
+"""
+Organisation extraction and deduplication for the graph loader
+
+The organiser of an activity is taken from its metadata, or from the
+domain of its website when the metadata does not name one. Names are
+normalized (case, diacritics, punctuation, legal form suffixes) and
+resolved against the organisations seen so far:
+
+    1. Exact match on the normalized name
+    2. Fuzzy match within the block of names sharing the blocking key
+    3. Match on the website domain, only when the organiser is not named
+       (or the organisation matched so far is known only by its domain),
+       since one domain often hosts differently named organisers such as
+       the faculties of a university
+
+so "Junior Achievement, z. s.", "JUNIOR ACHIEVEMENT z.s." and an activity
+without an organiser linking to www.jacr.cz end up as one Organisation node.
+"""
+
+import re
+import unicodedata
+from dataclasses import dataclass, field
+from difflib import SequenceMatcher
+from urllib.parse import urlparse
+
+# Metadata keys that may name the organiser, in order of preference
+ORGANISER_KEYS = [
+    "organizer",
+    "organiser",
+    "organizer_name",
+    "organization",
+    "organisation",
+    "organization_name",
+    "provider",
+    "author",
+]
+
+# Legal form suffixes, written normalized (folded, without punctuation).
+# The value says whether the legal form is a non-profit one, names without
+# a known legal form leave it unknown (None).
+LEGAL_FORMS = {
+    "z s": True,  # zapsaný spolek
+    "o s": True,  # občanské sdružení
+    "o p s": True,  # obecně prospěšná společnost
+    "z u": True,  # zapsaný ústav
+    "p o": True,  # příspěvková organizace
+    "prispevkova organizace": True,
+    "v v i": True,  # veřejná výzkumná instituce
+    "s r o": False,
+    "spol s r o": False,
+    "a s": False,
+    "k s": False,
+    "v o s": False,
+    "se": False,
+    "ltd": False,
+    "inc": False,
+    "gmbh": False,
+}
+_LEGAL_FORM_PATTERN = re.compile(
+    r"\s+(" + "|".join(sorted(LEGAL_FORMS, key=len, reverse=True)) + r")$"
+)
+
+# Websites that host pages of many organisations, their domain says nothing
+# about the organiser
+SHARED_HOSTS = {
+    "facebook.com",
+    "instagram.com",
+    "linkedin.com",
+    "youtube.com",
+    "google.com",
+    "forms.gle",
+    "eventbrite.com",
+    "linktr.ee",
+    "wixsite.com",
+    "webnode.cz",
+    "github.io",
+    "bit.ly",
+}
+
+# Second-level domains under which the organisation is one level deeper
+COMPOUND_SUFFIXES = {"co.uk", "com.au", "org.uk", "ac.uk"}
+
+# Minimum SequenceMatcher ratio of two normalized names within a block
+FUZZY_THRESHOLD = 0.9
+
+
+def fold(text: str) -> str:
+    """Lower case without diacritics and punctuation, single spaces."""
+    folded = unicodedata.normalize("NFKD", text.lower())
+    folded = "".join(c for c in folded if not unicodedata.combining(c))
+    return " ".join(re.sub(r"[^\w]+", " ", folded).split())
+
+
+def split_legal_form(name: str) -> tuple[str, str | None]:
+    """Normalized name and its legal form suffix, if any."""
+    normalized = fold(name)
+    legal_form = None
+    while match := _LEGAL_FORM_PATTERN.search(normalized):
+        legal_form = legal_form or match.group(1)
+        normalized = normalized[: match.start()]
+    return normalized, legal_form
+
+
+def normalize_name(name: str) -> str:
+    """Comparable form of an organisation name."""
+    return split_legal_form(name)[0]
+
+
+def blocking_key(normalized: str) -> str:
+    """Names are only fuzzy-compared to names with the same key."""
+    return normalized.replace(" ", "")[:4]
+
+
+def website_domain(url: str) -> str | None:
+    """Registrable domain of a website, None for shared hosts."""
+    if not url:
+        return None
+    host = urlparse(url if "//" in url else f"//{url}").hostname or ""
+    labels = host.lower().removeprefix("www.").split(".")
+    if len(labels) < 2:
+        return None
+    size = 3 if ".".join(labels[-2:]) in COMPOUND_SUFFIXES else 2
+    domain = ".".join(labels[-size:])
+    if domain in SHARED_HOSTS:
+        return None
+    return domain
+
+
+def organiser_name(metadata: dict) -> str | None:
+    """Organiser named in the activity metadata."""
+    for key in ORGANISER_KEYS:
+        value = metadata.get(key)
+        if isinstance(value, dict):
+            value = value.get("name")
+        if isinstance(value, str) and value.strip():
+            return " ".join(value.split())
+    return None
+
+
+@dataclass
+class Organisation:
+    id: int
+    name: str
+    normalized_name: str
+    domain: str | None
+    is_nonprofit: bool | None
+    aliases: set[str] = field(default_factory=set)
+
+    @property
+    def is_domain_only(self) -> bool:
+        """Created from a website domain, no organiser name seen yet."""
+        return not self.aliases
+
+
+class OrganisationResolver:
+    """Deduplicating index of the organisations seen by the loader."""
+
+    def __init__(self, fuzzy_threshold: float = FUZZY_THRESHOLD) -> None:
+        self.fuzzy_threshold = fuzzy_threshold
+        self.organisations: list[Organisation] = []
+        self._by_name: dict[str, Organisation] = {}
+        self._by_domain: dict[str, Organisation] = {}
+        self._blocks: dict[str, list[str]] = {}
+        self.fuzzy_matches = 0
+
+    def __len__(self) -> int:
+        return len(self.organisations)
+
+    def _fuzzy_match(self, normalized: str) -> Organisation | None:
+        best, best_ratio = None, self.fuzzy_threshold
+        for candidate in self._blocks.get(blocking_key(normalized), []):
+            ratio = SequenceMatcher(None, normalized, candidate).ratio()
+            if ratio >= best_ratio:
+                best, best_ratio = candidate, ratio
+        return self._by_name[best] if best is not None else None
+
+    def _index_name(self, normalized: str, organisation: Organisation) -> None:
+        if normalized and normalized not in self._by_name:
+            self._by_name[normalized] = organisation
+            self._blocks.setdefault(blocking_key(normalized), []).append(normalized)
+
+    def resolve(self, metadata: dict, url: str = "") -> Organisation | None:
+        """
+        Organisation of an activity.
+
+        Args:
+            metadata: Activity metadata
+            url: Activity website
+
+        Returns:
+            The existing or newly created organisation, None when neither
+            the metadata nor the website identify one
+        """
+        name = organiser_name(metadata)
+        domain = website_domain(url)
+        normalized, legal_form = split_legal_form(name) if name else ("", None)
+        if not normalized and not domain:
+            return None
+
+        organisation = None
+        if normalized:
+            organisation = self._by_name.get(normalized)
+            if organisation is None:
+                organisation = self._fuzzy_match(normalized)
+                if organisation is not None:
+                    self.fuzzy_matches += 1
+        if organisation is None and domain:
+            by_domain = self._by_domain.get(domain)
+            if by_domain is not None and (not normalized or by_domain.is_domain_only):
+                organisation = by_domain
+                if normalized and by_domain.is_domain_only:
+                    # First name seen for the organisation replaces its domain
+                    organisation.name = name
+                    organisation.normalized_name = normalized
+
+        if organisation is None:
+            organisation = Organisation(
+                id=len(self.organisations) + 1,
+                name=name or domain,
+                normalized_name=normalized or domain,
+                domain=domain,
+                is_nonprofit=LEGAL_FORMS.get(legal_form),
+            )
+            self.organisations.append(organisation)
+        elif domain and organisation.domain is None:
+            organisation.domain = domain
+        if organisation.is_nonprofit is None:
+            # Any later name variant with a known legal form settles it
+            organisation.is_nonprofit = LEGAL_FORMS.get(legal_form)
+
+        if name:
+            organisation.aliases.add(name)
+        self._index_name(normalized, organisation)
+        if domain:
+            self._by_domain.setdefault(domain, organisation)
+        return organisation
@@ -0,0 +1,124 @@
+"""
+Graph snapshot export and import
+
+Dumps the fully loaded graph (enrichments, embeddings, facet counts and
+communities included) to a compressed columnar snapshot, and restores it
+into an empty database with bulk UNWIND batches, which is much faster than
+replaying load_graph.py and enrich_graph.py.
+
+Usage:
+    uv run --package database python database/scripts/snapshot.py export [--path DIR]
+    uv run --package database python database/scripts/snapshot.py import [--path DIR] [--clear]
+
+    --path: Snapshot directory (default: database/scripts/graph_snapshot)
+    --clear: Clear existing data before importing
+    --batch-size: Rows per UNWIND statement on import
+
+The database service can build its first graph projection from the same
+snapshot, see DATABASE_GRAPH_SNAPSHOT_PATH.
+"""
+
+import argparse
+import sys
+import time
+from pathlib import Path
+
+from database.communities import COMMUNITY_INDEXES
+from database.embeddings import create_vector_index_statement
+from database.facets import FACET_COUNT_INDEXES
+from database.graph_projection import GRAPH_VERSION_QUERY
+from database.snapshot import export_snapshot, import_snapshot
+from enrich_graph import ENRICHMENT_INDEXES
+from load_graph import GRAPH_PASSWORD, GRAPH_URI, GRAPH_USER, GraphLoader
+from neo4j.exceptions import Neo4jError
+
+EMBEDDING_DIMENSIONS_QUERY = """
+MATCH (a:Activity) WHERE a.embedding IS NOT NULL
+RETURN size(a.embedding) AS dimensions LIMIT 1
+"""
+
+
+def create_indexes(loader: GraphLoader):
+    """Recreate the indexes of a loaded graph after a bulk import."""
+    loader.create_constraints()
+    for index in FACET_COUNT_INDEXES + COMMUNITY_INDEXES + ENRICHMENT_INDEXES:
+        try:
+            loader.execute(index)
+        except Neo4jError as e:
+            print(f"  Warning: {e}")
+
+    records = loader.execute(EMBEDDING_DIMENSIONS_QUERY)
+    if records:
+        try:
+            loader.execute(create_vector_index_statement(records[0]["dimensions"]))
+        except Neo4jError as e:
+            print(f"  Warning: vector index not created: {e}")
+
+
+def export_command(loader: GraphLoader, path: Path):
+    print(f"Exporting graph to {path}...")
+    records = loader.execute(GRAPH_VERSION_QUERY)
+    version = records[0]["version"] if records else None
+    manifest = export_snapshot(loader.driver, path, version)
+    print(
+        f"  Exported {manifest['nodeCount']} nodes and {manifest['relationshipCount']} "
+        f"relationships (version {version}) in {manifest['exportSeconds']:.1f}s"
+    )
+
+
+def import_command(loader: GraphLoader, path: Path, clear: bool, batch_size: int):
+    existing = loader.execute("MATCH (n) RETURN count(n) AS count")[0]["count"]
+    if existing and not clear:
+        print(f"Error: database already has {existing} nodes, use --clear")
+        return 1
+    if clear:
+        loader.clear_database()
+
+    print(f"Importing snapshot from {path}...")
+    manifest = import_snapshot(loader.driver, path, batch_size)
+    print(
+        f"  Imported {manifest['nodeCount']} nodes and {manifest['relationshipCount']} "
+        f"relationships (version {manifest['graphVersion']}) in {manifest['importSeconds']:.1f}s"
+    )
+
+    started = time.perf_counter()
+    create_indexes(loader)
+    print(f"  Indexes created in {time.perf_counter() - started:.1f}s")
+    loader.print_statistics()
+    return 0
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Export or import a graph snapshot")
+    parser.add_argument("command", choices=["export", "import"])
+    parser.add_argument(
+        "--path",
+        type=Path,
+        default=Path(__file__).parent / "graph_snapshot",
+        help="Snapshot directory",
+    )
+    parser.add_argument(
+        "--clear", action="store_true", help="Clear existing data before importing"
+    )
+    parser.add_argument(
+        "--batch-size", type=int, default=5000, help="Rows per UNWIND statement"
+    )
+    args = parser.parse_args()
+
+    print(f"Connecting to graph database at {GRAPH_URI}...")
+    loader = GraphLoader(GRAPH_URI, GRAPH_USER, GRAPH_PASSWORD)
+    started = time.perf_counter()
+    try:
+        if args.command == "export":
+            export_command(loader, args.path)
+        elif import_command(loader, args.path, args.clear, args.batch_size):
+            return 1
+    finally:
+        loader.close()
+
+    print(f"\n✓ Snapshot {args.command} done in {time.perf_counter() - started:.1f}s")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,10 @@
+from database.config import get_settings
+from interfaces.api_keys import ApiKeyRegistry, api_key_verifier
+
+_settings = get_settings()
+key_registry = ApiKeyRegistry(
+    path=_settings.api_keys_file,
+    fallback_key=_settings.api_key,
+    reload_interval_seconds=_settings.api_key_reload_interval_seconds,
+)
+verify_api_key = api_key_verifier(key_registry)
@@ -0,0 +1,150 @@
+"""
+Communities of similar activities, detected at load time.
+
+Activities are linked by the feature nodes they share (fields, skills,
+types, levels, locations, formats, funding), the resulting weighted
+activity graph is clustered with Louvain and every activity gets a
+communityId. A Community node per cluster holds a precomputed summary,
+so "similar programmes" are one indexed property lookup at query time.
+
+networkx is an optional dependency (`database[communities]`), imported
+only by the loader stage.
+"""
+
+import math
+from collections import Counter, defaultdict
+from itertools import combinations
+
+from database.facets import FACETS
+
+# Names of the directly linked feature nodes of every activity
+ACTIVITY_FEATURES_QUERY = (
+    "MATCH (a:Activity)\nRETURN a.id AS id, a.name AS name"
+    + "".join(
+        f",\n       [(a)-[:{rel_type}]->(n:{label}) | n.name] AS {facet}"
+        for facet, (rel_type, label) in FACETS.items()
+    )
+)
+
+DELETE_COMMUNITIES_QUERY = "MATCH (c:Community) DETACH DELETE c"
+
+SET_COMMUNITY_IDS_QUERY = """
+UNWIND $rows AS row
+MATCH (a:Activity {id: row.id})
+SET a.communityId = row.community
+"""
+
+CREATE_COMMUNITIES_QUERY = """
+UNWIND $rows AS row
+CREATE (c:Community)
+SET c = row
+"""
+
+COMMUNITY_INDEXES = [
+    "CREATE INDEX activity_community IF NOT EXISTS FOR (a:Activity) ON (a.communityId)",
+    "CREATE INDEX community_id IF NOT EXISTS FOR (c:Community) ON (c.id)",
+]
+
+SIMILAR_ACTIVITIES_QUERY = """
+MATCH (a:Activity)
+WHERE toLower(a.name) CONTAINS toLower($name) AND a.communityId IS NOT NULL
+WITH a ORDER BY size(a.name) LIMIT 1
+MATCH (c:Community {id: a.communityId})
+MATCH (b:Activity {communityId: a.communityId})
+WHERE b <> a
+RETURN a.name AS activity, c.label AS community, b.name AS name,
+       b.shortDescription AS description, b.url AS url
+LIMIT $k
+"""
+
+# Features shared by more than this share of activities (e.g. the country)
+# say nothing about similarity and would link everything together
+MAX_FEATURE_SHARE = 0.5
+
+SUMMARY_FACETS = ["field", "skill", "activity_type", "level", "location"]
+
+
+def activity_graph(activities: list[dict]):
+    """Weighted activity graph, rarer shared features weigh more."""
+    import networkx as nx
+
+    by_feature: dict[tuple[str, str], list[int]] = defaultdict(list)
+    for activity in activities:
+        for facet in FACETS:
+            for value in set(activity[facet] or []):
+                by_feature[(facet, value)].append(activity["id"])
+
+    graph = nx.Graph()
+    graph.add_nodes_from(activity["id"] for activity in activities)
+    max_members = max(2, int(MAX_FEATURE_SHARE * len(activities)))
+    for members in by_feature.values():
+        if len(members) > max_members:
+            continue
+        weight = 1.0 / math.log(1 + len(members))
+        for a, b in combinations(members, 2):
+            if graph.has_edge(a, b):
+                graph[a][b]["weight"] += weight
+            else:
+                graph.add_edge(a, b, weight=weight)
+    return graph
+
+
+def detect_communities(
+    activities: list[dict], resolution: float = 1.0, seed: int = 42
+) -> dict[int, int]:
+    """
+    Louvain communities of the activities.
+
+    Args:
+        activities: Rows of ACTIVITY_FEATURES_QUERY
+        resolution: Higher values give more, smaller communities
+        seed: Makes the result reproducible between loads
+
+    Returns:
+        Community id of every activity id, 0 is the largest community
+    """
+    import networkx as nx
+
+    communities = nx.community.louvain_communities(
+        activity_graph(activities), weight="weight", resolution=resolution, seed=seed
+    )
+    communities = sorted(communities, key=len, reverse=True)
+    return {
+        activity_id: community_id
+        for community_id, members in enumerate(communities)
+        for activity_id in members
+    }
+
+
+def summarize_communities(
+    activities: list[dict], membership: dict[int, int], top: int = 3
+) -> list[dict]:
+    """Community node properties: size, label, most common features and sample names."""
+    members: dict[int, list[dict]] = defaultdict(list)
+    for activity in activities:
+        members[membership[activity["id"]]].append(activity)
+
+    summaries = []
+    for community_id, group in sorted(members.items()):
+        top_values = {}
+        for facet in SUMMARY_FACETS:
+            counts = Counter(value for a in group for value in set(a[facet] or []))
+            top_values[facet] = [value for value, _ in counts.most_common(top)]
+        label = ", ".join(
+            (top_values["field"][:2] + top_values["activity_type"][:1])
+            or top_values["skill"][:2]
+        )
+        summaries.append(
+            {
+                "id": community_id,
+                "size": len(group),
+                "label": label or f"Komunita {community_id}",
+                "topFields": top_values["field"],
+                "topSkills": top_values["skill"],
+                "topTypes": top_values["activity_type"],
+                "topLevels": top_values["level"],
+                "topLocations": top_values["location"],
+                "sampleActivities": [a["name"] for a in group[:5]],
+            }
+        )
+    return summaries
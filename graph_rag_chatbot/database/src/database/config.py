@@ -1,5 +1,5 @@
 import os
-from typing import Callable
+from typing import Callable, Literal
 
 from pydantic_settings import BaseSettings, SettingsConfigDict
 
@@ -29,6 +29,63 @@ class Settings(BaseSettings):
 
     # Authorization
     api_key: str = "my-secret"  # Override in production
+    # JSON registry of additional keys, see interfaces.api_keys
+    api_keys_file: str | None = None
+    api_key_reload_interval_seconds: float = 5.0
+
+    # Providers, "fake" runs the service offline for load testing
+    llm_provider: Literal["azure", "fake"] = "azure"
+    graph_provider: Literal["neo4j", "fake"] = "neo4j"
+
+    # Fake LLM and graph behaviour
+    fake_llm_first_token_delay_seconds: float = 0.5
+    fake_llm_tokens_per_second: float = 50.0
+    fake_llm_cypher: str = (
+        "MATCH (a:Activity) RETURN a.name AS name, a.shortDescription AS description"
+    )
+    fake_graph_query_latency_seconds: float = 0.005
+
+    # Vector search, has to use the same embedder as the graph loader
+    embedding_provider: Literal["sentence_transformers", "hashing", "none"] = (
+        "sentence_transformers"
+    )
+    embedding_model: str = "sentence-transformers/paraphrase-multilingual-MiniLM-L12-v2"
+    # Candidates fetched per result before graph filters
+    vector_search_candidates_factor: int = 5
+
+    # In-memory graph projection for common traversals
+    graph_projection_enabled: bool = True
+    # How often the graph version is checked
+    graph_projection_refresh_seconds: float = 30.0
+    # Snapshot directory to build the first projection from
+    graph_snapshot_path: str | None = None
+
+    # Cypher guard (applied to every LLM-generated query)
+    cypher_max_estimated_rows: int = 100_000  # Reject plans estimated above this
+    cypher_result_limit: int = 25  # LIMIT enforced on every query
+    cypher_timeout_seconds: float = 5.0  # Server-side transaction timeout
+    cypher_schema_cache_seconds: float = 300.0  # Schema reused in the generation prompt
+    cypher_examples_k: int = 3  # Few-shot examples per Cypher generation
+
+    # Tool output sent back to the LLM
+    tool_output_max_rows: int = 20
+    tool_output_max_text_length: int = 200  # Longer strings are truncated
+    tool_output_max_tokens: int = 1500
+
+    # SSE coalescing of LLM tokens
+    stream_flush_bytes: int = 64
+    stream_flush_interval_seconds: float = 0.03
+
+    # LLM gateway
+    llm_max_in_flight: int = 8  # Concurrent calls to the LLM provider
+    llm_request_deadline_seconds: float = 55.0  # Below the backend's 60s timeout
+    llm_max_retries: int = 3
+    llm_backoff_base_seconds: float = 0.5
+    llm_backoff_max_seconds: float = 8.0
+
+    # Tracing
+    tracing_exporter: Literal["none", "console", "otlp"] = "none"
+    otlp_endpoint: str = "http://localhost:4318/v1/traces"
 
 
 # delayed singleton pattern for settings
@@ -1,84 +1,629 @@
+import asyncio
+from contextlib import aclosing
+from contextvars import ContextVar
+from dataclasses import dataclass
+from typing import Any, AsyncIterator, Awaitable, Callable, TypeVar
+
+from langchain_core.callbacks import AsyncCallbackHandler
 from langchain_core.language_models.chat_models import BaseChatModel
 from langchain_core.output_parsers import StrOutputParser
-from langchain_core.messages import HumanMessage
+from langchain_core.messages import BaseMessage, HumanMessage
 from langchain_core.tools import tool
+from langchain_core.tracers.context import register_configure_hook
 from langchain.agents import create_agent
-from neo4j import Driver, RoutingControl
-from neo4j_graphrag.schema import get_schema
+from langchain.agents.middleware import AgentMiddleware
+from neo4j import Driver, Query, READ_ACCESS
+from neo4j.exceptions import DriverError, Neo4jError
 
+from database.communities import SIMILAR_ACTIVITIES_QUERY
+from database.config import get_settings
+from database.cypher_agent.cypher_guard import CypherGuard, CypherRejected
+from database.cypher_agent.examples import (
+    CYPHER_EXAMPLES,
+    ExampleIndex,
+    format_examples,
+)
 from database.cypher_agent.prompts import CYPHER_GENERATION_PROMPT, CYPHER_QA_PROMPT
+from database.cypher_agent.result_formatter import ResultFormatter
+from database.embeddings import VECTOR_SEARCH_QUERY, Embedder
+from database.facets import (
+    FACET_COUNT_QUERY,
+    FACETS,
+    TOP_FACET_VALUES_QUERY,
+    count_fallback_query,
+    facet_key,
+    facet_set,
+    names_query,
+    resolve_query,
+    top_fallback_query,
+)
+from database.fulltext import SEARCH_ACTIVITIES_QUERY, to_lucene_query
+from database.graph_projection import (
+    ACTIVITY_DETAILS_QUERY,
+    FIND_ACTIVITIES_QUERY,
+    JOBS_FOR_SKILL_QUERY,
+    GraphProjectionManager,
+    fold,
+)
+from database.llm_gateway import (
+    PRIORITY_ANSWER,
+    PRIORITY_SHORT,
+    LLMGateway,
+)
+from database.providers import SchemaCache
+from interfaces.telemetry import stage
 
 SYSTEM_PROMPT = """You are a helpful assistant that answers questions using a Neo4j Graph Database.
 
 Use the available tools to retrieve information from the database and provide accurate answers.
+For keyword or topic lookups of activities use search_activities instead of generating Cypher with CONTAINS or regular expressions.
+For filters by location, level of study, field, skill or activity type use find_activities, for details of a known activity use activity_details.
+For "how many" questions use count_activities, for "which ... have the most activities" use top_facet_values.
+Generate Cypher only for questions these tools cannot answer.
 Limit answer to 5 results maximum. Only focus on the names of activities.
 Always answer in Czech language."""
 
+# Tag attached to the QA chain so its tokens can be picked out of the event stream
+ANSWER_TAG = "final_answer"
+
+# Progress messages shown to the user while a tool is running
+TOOL_PROGRESS = {
+    "get_schema_neo4j": "Načítám schéma grafu…",
+    "search_activities": "Vyhledávám aktivity…",
+    "vector_search_activities": "Hledám podobné aktivity…",
+    "find_activities": "Vyhledávám aktivity…",
+    "activity_details": "Načítám detail aktivity…",
+    "jobs_for_skill": "Hledám související profese…",
+    "similar_activities": "Hledám podobné programy…",
+    "count_activities": "Počítám aktivity…",
+    "top_facet_values": "Počítám aktivity…",
+    "generate_cypher": "Připravuji dotaz do grafu…",
+    "run_cypher_query": "Prohledávám graf…",
+    "answer_question": "Formuluji odpověď…",
+}
+
+
+T = TypeVar("T")
+
+
+class TokenWatch(AsyncCallbackHandler):
+    """Notes whether a model call has streamed any text yet."""
+
+    def __init__(self) -> None:
+        self.started = False
+
+    async def on_llm_new_token(self, token: str, **kwargs: Any) -> None:
+        # Tool call chunks carry no text and are not streamed to the client
+        if token:
+            self.started = True
+
+
+# Attached to every model call made while set, see streamed_call
+_token_watch: ContextVar[TokenWatch | None] = ContextVar("token_watch", default=None)
+register_configure_hook(_token_watch, inheritable=True)
+
+
+async def streamed_call(
+    gateway: LLMGateway, fn: Callable[[], Awaitable[T]], priority: int
+) -> T:
+    """
+    Run a model call whose tokens may be streamed to the client.
 
-def get_agent(llm: BaseChatModel, driver: Driver):
-    """Create a Cypher agent using LangGraph."""
+    The call is retried only until its first token, after that a failure is
+    raised (and turned into an error chunk) instead of streaming the answer
+    a second time.
+    """
+    watch = TokenWatch()
+    reset = _token_watch.set(watch)
+    try:
+        return await gateway.call(fn, priority, started=lambda: watch.started)
+    finally:
+        _token_watch.reset(reset)
+
+
+@dataclass
+class AgentEvent:
+    """Piece of the agent's output: answer tokens or a tool progress status."""
+
+    content: str = ""
+    status: str | None = None
+
+
+class GatewayMiddleware(AgentMiddleware):
+    """Route the agent's own model calls through the LLM gateway."""
+
+    def __init__(self, gateway: LLMGateway) -> None:
+        super().__init__()
+        self.gateway = gateway
+
+    async def awrap_model_call(self, request, handler):
+        with stage("agent_model"):
+            return await streamed_call(
+                self.gateway, lambda: handler(request), PRIORITY_SHORT
+            )
+
+
+def get_agent(
+    llm: BaseChatModel,
+    driver: Driver,
+    gateway: LLMGateway,
+    embedder: Embedder | None = None,
+    projection: GraphProjectionManager | None = None,
+):
+    """
+    Create a Cypher agent using LangGraph.
+
+    Vector search is only offered with an embedder. Common traversals are
+    served from the in-memory projection once it is loaded, from Neo4j before.
+    """
+    settings = get_settings()
+    guard = CypherGuard(
+        driver,
+        max_estimated_rows=settings.cypher_max_estimated_rows,
+        result_limit=settings.cypher_result_limit,
+        timeout_seconds=settings.cypher_timeout_seconds,
+    )
+    schema_cache = SchemaCache(driver, settings.cypher_schema_cache_seconds)
+    example_index = ExampleIndex(CYPHER_EXAMPLES)
+    formatter = ResultFormatter(
+        max_rows=settings.tool_output_max_rows,
+        max_text_length=settings.tool_output_max_text_length,
+        max_tokens=settings.tool_output_max_tokens,
+    )
+
+    def _run_cypher(cypher_query: str) -> str:
+        try:
+            with stage("cypher_guard"):
+                guarded = guard.prepare(cypher_query)
+        except CypherRejected as e:
+            return e.to_feedback()
+
+        try:
+            with (
+                stage("graph_query", estimated_rows=guarded.estimated_rows),
+                driver.session(
+                    database="neo4j", default_access_mode=READ_ACCESS
+                ) as session,
+            ):
+                result = session.run(guarded.to_query(guard.timeout_seconds))
+                # Records are streamed and formatting stops at the row cap
+                return formatter.format(result)
+        except Exception as e:
+            return f"Error executing Cypher query: {e}"
 
     @tool
-    def run_cypher_query(cypher_query: str) -> str:
-        """Run a Cypher query against the Neo4j database and return results. Always generate a Cypher query before calling this tool.
+    async def run_cypher_query(cypher_query: str) -> str:
+        """Run a read-only Cypher query against the Neo4j database and return results. Always generate a Cypher query before calling this tool.
+        If the query is rejected, a JSON object with the reason and a hint is returned; fix the query and try again.
 
         Args:
             cypher_query: The Cypher query string to execute
         """
+        # The neo4j driver is blocking, keep it off the event loop
+        with stage("run_cypher_query"):
+            return await asyncio.to_thread(_run_cypher, cypher_query)
+
+    def _read(query: str, parameters: dict, **stage_attrs) -> str:
+        """Run a fixed read-only query of a tool and format its result."""
+        try:
+            with (
+                stage("graph_query", **stage_attrs),
+                driver.session(
+                    database="neo4j", default_access_mode=READ_ACCESS
+                ) as session,
+            ):
+                result = session.run(
+                    Query(query, timeout=guard.timeout_seconds), parameters
+                )
+                return formatter.format(result)
+        except (DriverError, Neo4jError) as e:
+            return f"Error querying the graph: {e}"
+
+    def _search(text: str, k: int) -> str:
+        query = to_lucene_query(text)
+        if not query:
+            return "No results found."
+        return _read(
+            SEARCH_ACTIVITIES_QUERY, {"query": query, "k": k}, index="fulltext"
+        )
+
+    @tool
+    async def search_activities(text: str, k: int = 10) -> str:
+        """Full-text search of activities by keywords in their name and descriptions, ranked by relevance. Use it for topic or keyword questions (e.g. "programování", "dobrovolnictví"), then filter further with Cypher if needed.
+
+        Args:
+            text: Keywords to search for, in Czech
+            k: Maximum number of activities to return
+        """
+        k = max(1, min(k, settings.cypher_result_limit))
+        with stage("search_activities"):
+            return await asyncio.to_thread(_search, text, k)
+
+    def _vector_search(
+        question: str, location: str | None, level: str | None, k: int
+    ) -> str:
+        with stage("embed_question"):
+            (embedding,) = embedder.embed([question])
+        return _read(
+            VECTOR_SEARCH_QUERY,
+            {
+                "embedding": embedding,
+                "candidates": k * settings.vector_search_candidates_factor,
+                "location": location or None,
+                "level": level or None,
+                "k": k,
+            },
+            index="vector",
+        )
+
+    @tool
+    async def vector_search_activities(
+        question: str,
+        location: str | None = None,
+        level: str | None = None,
+        k: int = 10,
+    ) -> str:
+        """Semantic search of activities similar in meaning to a vague or descriptive question, optionally filtered by location and level of study. Use it when keywords alone would miss relevant activities (e.g. "něco pro budoucí datové analytiky").
+
+        Args:
+            question: The user's question or a description of the wanted activity
+            location: Name of a city or region the activity must be available in, e.g. "Brno" or "Vysočina"
+            level: Level of study the activity must aim at, name or code
+            k: Maximum number of activities to return
+        """
+        k = max(1, min(k, settings.cypher_result_limit))
+        with stage("vector_search_activities"):
+            return await asyncio.to_thread(_vector_search, question, location, level, k)
+
+    def _rows(session, query: str, parameters: dict) -> list[dict]:
+        result = session.run(Query(query, timeout=guard.timeout_seconds), parameters)
+        return [record.data() for record in result]
+
+    def _resolve(session, filters: dict[str, str | None]) -> tuple[dict, dict]:
+        """Facet value names to node ids, raises LookupError for unknown names."""
+        ids, names = {}, {}
+        for facet, name in filters.items():
+            if not name:
+                continue
+            matches = _rows(session, resolve_query(facet), {"name": name})
+            if not matches:
+                raise LookupError(f"No {facet} matching '{name}'.")
+            ids[facet], names[facet] = matches[0]["id"], matches[0]["name"]
+        return ids, names
+
+    def _count(filters: dict[str, str | None]) -> str:
+        try:
+            with (
+                stage("graph_query", index="facets"),
+                driver.session(
+                    database="neo4j", default_access_mode=READ_ACCESS
+                ) as session,
+            ):
+                ids, names = _resolve(session, filters)
+                (row,) = _rows(session, FACET_COUNT_QUERY, {"key": facet_key(ids)})
+                count = row["count"]
+                if row["depth"] is None or len(ids) > row["depth"]:
+                    # Combination too deep to be materialized, count live
+                    (row,) = _rows(session, count_fallback_query(ids), {"values": ids})
+                    count = row["count"]
+            return formatter.format([{"count": count, **names}])
+        except LookupError as e:
+            return str(e)
+        except (DriverError, Neo4jError) as e:
+            return f"Error querying the graph: {e}"
+
+    def _top(facet: str, filters: dict[str, str | None], k: int) -> str:
         try:
-            result = driver.execute_query(
-                cypher_query, database_="neo4j", routing_control=RoutingControl.READ
+            with (
+                stage("graph_query", index="facets"),
+                driver.session(
+                    database="neo4j", default_access_mode=READ_ACCESS
+                ) as session,
+            ):
+                ids, names = _resolve(session, filters)
+                depth = _rows(session, FACET_COUNT_QUERY, {"key": ""})[0]["depth"]
+                if depth is not None and len(ids) + 1 <= depth:
+                    top = _rows(
+                        session,
+                        TOP_FACET_VALUES_QUERY,
+                        {
+                            "facets": facet_set([facet, *ids]),
+                            "filters": ids,
+                            "facet": facet,
+                            "k": k,
+                        },
+                    )
+                else:
+                    top = _rows(
+                        session, top_fallback_query(facet, ids), {"values": ids, "k": k}
+                    )
+                labels = {
+                    row["id"]: row["name"]
+                    for row in _rows(
+                        session, names_query(facet), {"ids": [row["id"] for row in top]}
+                    )
+                }
+            return formatter.format(
+                {facet: labels.get(row["id"]), "count": row["count"], **names}
+                for row in top
             )
-            records = [record.data() for record in result.records]
-            if not records:
-                return "No results found."
-            return str(records)
-        except Exception as e:
-            return f"Error executing Cypher query: {e}"
+        except LookupError as e:
+            return str(e)
+        except (DriverError, Neo4jError) as e:
+            return f"Error querying the graph: {e}"
+
+    @tool
+    async def similar_activities(name: str, k: int = 5) -> str:
+        """Activities similar to a given activity (same precomputed community of related programmes). Use it for "something like X" or "explore similar programmes" questions.
+
+        Args:
+            name: Name or part of the name of the activity
+            k: Maximum number of similar activities to return
+        """
+        k = max(1, min(k, settings.cypher_result_limit))
+        with stage("similar_activities"):
+            return await asyncio.to_thread(
+                _read,
+                SIMILAR_ACTIVITIES_QUERY,
+                {"name": name, "k": k},
+                index="community",
+            )
+
+    @tool
+    async def count_activities(
+        location: str | None = None,
+        level: str | None = None,
+        field: str | None = None,
+        skill: str | None = None,
+        activity_type: str | None = None,
+        funding: str | None = None,
+        format: str | None = None,
+    ) -> str:
+        """Count activities matching all given filters, e.g. "how many internships are in Brno". Names may be partial; a region includes its cities, a type its sub-types. The output shows which values were matched.
+
+        Args:
+            location: City or region
+            level: Level of study
+            field: Field the activity focuses on
+            skill: Skill the activity develops
+            activity_type: Type of activity, e.g. "stáž"
+            funding: Funding type, e.g. "zdarma"
+            format: Format of the activity, e.g. "online"
+        """
+        filters = {
+            "location": location,
+            "level": level,
+            "field": field,
+            "skill": skill,
+            "activity_type": activity_type,
+            "funding": funding,
+            "format": format,
+        }
+        with stage("count_activities"):
+            return await asyncio.to_thread(_count, filters)
+
+    @tool
+    async def top_facet_values(
+        facet: str,
+        k: int = 5,
+        location: str | None = None,
+        level: str | None = None,
+        field: str | None = None,
+        skill: str | None = None,
+        activity_type: str | None = None,
+    ) -> str:
+        """Values of a facet with the most activities, optionally within filters, e.g. "which fields have the most activities in Brno".
+
+        Args:
+            facet: One of location, level, field, skill, activity_type, funding, format
+            k: Number of values to return
+            location: Only count activities in this city or region
+            level: Only count activities for this level of study
+            field: Only count activities in this field
+            skill: Only count activities developing this skill
+            activity_type: Only count activities of this type
+        """
+        if facet not in FACETS:
+            return f"Unknown facet '{facet}', use one of: {', '.join(FACETS)}."
+        filters = {
+            "location": location,
+            "level": level,
+            "field": field,
+            "skill": skill,
+            "activity_type": activity_type,
+        }
+        filters.pop(facet, None)
+        k = max(1, min(k, settings.tool_output_max_rows))
+        with stage("top_facet_values"):
+            return await asyncio.to_thread(_top, facet, filters, k)
+
+    def _projection():
+        return projection.current if projection is not None else None
 
     @tool
-    def generate_cypher(question: str, database_schema: str) -> str:
-        """Generate a Cypher query based on the user question and database schema.
+    async def find_activities(
+        location: str | None = None,
+        level: str | None = None,
+        field: str | None = None,
+        skill: str | None = None,
+        activity_type: str | None = None,
+        k: int = 10,
+    ) -> str:
+        """Find activities by location, level of study, field, skill and activity type. All given filters must match; names may be partial. A region also matches its cities, a type also matches its sub-types. Prefer this over generating Cypher for such questions.
+
+        Args:
+            location: City or region, e.g. "Brno" or "Vysočina"
+            level: Level of study, e.g. "Střední škola"
+            field: Field the activity focuses on
+            skill: Skill the activity develops
+            activity_type: Type of activity, e.g. "stáž" or "soutěž"
+            k: Maximum number of activities to return
+        """
+        k = max(1, min(k, settings.cypher_result_limit))
+        filters = {
+            "location": location or None,
+            "level": level or None,
+            "field": field or None,
+            "skill": skill or None,
+            "activity_type": activity_type or None,
+        }
+        graph = _projection()
+        with stage("find_activities", source="memory" if graph else "neo4j"):
+            if graph is None:
+                folded = {key: value and fold(value) for key, value in filters.items()}
+                return await asyncio.to_thread(
+                    _read, FIND_ACTIVITIES_QUERY, {**folded, "k": k}
+                )
+            return formatter.format(
+                {
+                    "name": graph.get(i, "name"),
+                    "description": graph.get(i, "shortDescription"),
+                    "url": graph.get(i, "url"),
+                }
+                for i in graph.find_activities(**filters)[:k]
+            )
+
+    @tool
+    async def activity_details(name: str) -> str:
+        """Details of activities by (partial) name: organisation, locations, levels, types, fields, skills, formats and funding.
+
+        Args:
+            name: Name or part of the name of the activity
+        """
+        k = settings.tool_output_max_rows
+        graph = _projection()
+        with stage("activity_details", source="memory" if graph else "neo4j"):
+            if graph is None:
+                return await asyncio.to_thread(
+                    _read, ACTIVITY_DETAILS_QUERY, {"name": fold(name), "k": k}
+                )
+            return formatter.format(
+                graph.activity_profile(i) for i in graph.find("Activity", name)[:k]
+            )
+
+    @tool
+    async def jobs_for_skill(skill: str) -> str:
+        """Jobs in which a skill is used, with their average salary.
+
+        Args:
+            skill: Name or part of the name of the skill
+        """
+        graph = _projection()
+        with stage("jobs_for_skill", source="memory" if graph else "neo4j"):
+            if graph is None:
+                return await asyncio.to_thread(
+                    _read, JOBS_FOR_SKILL_QUERY, {"skill": fold(skill)}
+                )
+            return formatter.format(graph.jobs_for_skill(skill))
+
+    @tool
+    async def generate_cypher(question: str) -> str:
+        """Generate a Cypher query for the user question, the database schema is added automatically.
 
         Args:
             question: The user's question in natural language
-            database_schema: The Neo4j database schema
         """
         chain = CYPHER_GENERATION_PROMPT | llm | StrOutputParser()
-        return chain.invoke({"schema": database_schema, "question": question})
+        with stage("generate_cypher"):
+            inputs = {
+                "schema": await schema_cache.get(),
+                "examples": format_examples(
+                    example_index.nearest(question, settings.cypher_examples_k)
+                ),
+                "question": question,
+            }
+            return await gateway.call(lambda: chain.ainvoke(inputs), PRIORITY_SHORT)
 
     @tool
-    def get_schema_neo4j() -> str:
+    async def get_schema_neo4j() -> str:
         """Retrieve the Neo4j database schema including node labels, relationship types, and properties."""
         try:
-            schema = get_schema(driver)
-            return schema
+            with stage("get_schema"):
+                return await schema_cache.get()
         except Exception as e:
             return f"Error retrieving schema: {e}"
 
     @tool
-    def answer_question(context: str, question: str) -> str:
+    async def answer_question(context: str, question: str) -> str:
         """Generate a human-understandable answer based on the database context and original question. Usually as last step before returning the final answer. This is usually the final answer.
 
         Args:
             context: The data retrieved from the database
             question: The original user question
         """
-        chain = CYPHER_QA_PROMPT | llm | StrOutputParser()
-        return chain.invoke({"context": context, "question": question})
+        chain = (CYPHER_QA_PROMPT | llm | StrOutputParser()).with_config(
+            tags=[ANSWER_TAG]
+        )
+        with stage("answer_question"):
+            return await streamed_call(
+                gateway,
+                lambda: chain.ainvoke({"context": context, "question": question}),
+                PRIORITY_ANSWER,
+            )
 
-    tools = [run_cypher_query, generate_cypher, get_schema_neo4j, answer_question]
+    tools = [
+        find_activities,
+        activity_details,
+        jobs_for_skill,
+        similar_activities,
+        count_activities,
+        top_facet_values,
+        search_activities,
+        run_cypher_query,
+        generate_cypher,
+        get_schema_neo4j,
+        answer_question,
+    ]
+    if embedder is not None:
+        tools.insert(tools.index(search_activities) + 1, vector_search_activities)
 
     # Create an agent using LangChain
     agent = create_agent(
         model=llm,
         tools=tools,
         system_prompt=SYSTEM_PROMPT,
+        middleware=[GatewayMiddleware(gateway)],
         debug=True,
     )
     return agent
 
 
+async def astream_answer(
+    agent, messages: list[BaseMessage]
+) -> AsyncIterator[AgentEvent]:
+    """
+    Run the agent and stream its answer as soon as the QA step starts.
+
+    Tokens of the answer_question tool are streamed directly and the agent
+    is stopped once that tool finishes, so no extra LLM round trip is spent
+    repeating the answer. If the agent answers without the tool, its own
+    tokens are streamed instead.
+
+    Args:
+        agent: Agent created by get_agent
+        messages: Conversation history followed by the user question
+
+    Yields:
+        AgentEvent with answer tokens or a tool progress status
+    """
+    events = agent.astream_events({"messages": messages}, version="v2")
+    async with aclosing(events):
+        async for event in events:
+            kind = event["event"]
+            if kind == "on_tool_start" and event["name"] in TOOL_PROGRESS:
+                yield AgentEvent(status=TOOL_PROGRESS[event["name"]])
+            elif kind == "on_tool_end" and event["name"] == "answer_question":
+                return
+            elif kind == "on_chat_model_stream":
+                chunk = event["data"]["chunk"]
+                if getattr(chunk, "tool_call_chunks", None):
+                    continue
+                is_answer = ANSWER_TAG in event.get("tags", [])
+                is_agent_reply = event["metadata"].get("langgraph_node") == "model"
+                if (is_answer or is_agent_reply) and chunk.text:
+                    yield AgentEvent(content=chunk.text)
+
+
 if __name__ == "__main__":
     from langchain_openai import AzureChatOpenAI
     from neo4j import GraphDatabase
@@ -104,13 +649,21 @@ if __name__ == "__main__":
         azure_deployment="gpt-5-mini-2025-08-07",
     )
 
-    agent = get_agent(llm, driver)
+    gateway = LLMGateway(
+        max_in_flight=4,
+        max_retries=3,
+        backoff_base_seconds=0.5,
+        backoff_max_seconds=8.0,
+    )
+    agent = get_agent(llm, driver, gateway)
 
     # Example usage - invoke with messages format for LangGraph
     question = "Najdi mi všechny aktivity spojené s programováním na Vysočině."
 
-    # LangGraph agents expect messages format
-    response = agent.invoke({"messages": [HumanMessage(content=question)]})
+    # LangGraph agents expect messages format, tools are async so use ainvoke
+    response = asyncio.run(
+        agent.ainvoke({"messages": [HumanMessage(content=question)]})
+    )
 
     # Extract the final response
     print("Agent response:")
@@ -0,0 +1,261 @@
+import json
+import re
+from dataclasses import dataclass
+
+from neo4j import READ_ACCESS, Driver, Query
+from neo4j.exceptions import Neo4jError
+
+# Clauses that modify the graph or the database itself, only in clause position:
+# not a property (n.set), a parameter ($set) or a map key ({set: 1})
+WRITE_CLAUSES = re.compile(
+    r"(?<![.$])\b(CREATE|MERGE|DELETE|DETACH|SET|REMOVE|DROP|FOREACH|LOAD\s+CSV|"
+    r"GRANT|DENY|REVOKE|ALTER|RENAME|TERMINATE|IN\s+TRANSACTIONS)\b(?!\s*:)",
+    re.IGNORECASE,
+)
+
+# Only read-only procedures may be called by the agent
+ALLOWED_PROCEDURES = (
+    "db.index.fulltext.querynodes",
+    "db.index.vector.querynodes",
+    "db.labels",
+    "db.relationshiptypes",
+    "db.propertykeys",
+    "db.schema.",
+)
+
+CALL_PROCEDURE = re.compile(r"\bCALL\s+([A-Za-z_][\w.]*)", re.IGNORECASE)
+STRING_LITERAL = re.compile(r"'(?:[^'\\]|\\.)*'|\"(?:[^\"\\]|\\.)*\"")
+COMMENT = re.compile(r"//[^\n]*|/\*.*?\*/", re.DOTALL)
+QUOTED_IDENTIFIER = re.compile(r"`[^`]*`")
+ALIAS = re.compile(r"(\bAS\s+)([A-Za-z_]\w*)", re.IGNORECASE)
+UNION = re.compile(r"\bUNION(?:\s+ALL)?\b", re.IGNORECASE)
+FINAL_LIMIT = re.compile(r"\bLIMIT\s+(\d+|\$\w+)\s*$", re.IGNORECASE)
+
+
+class CypherRejected(Exception):
+    """Raised when a generated Cypher query must not be executed."""
+
+    def __init__(self, reason: str, hint: str, cypher: str) -> None:
+        super().__init__(reason)
+        self.reason = reason
+        self.hint = hint
+        self.cypher = cypher
+
+    def to_feedback(self) -> str:
+        """Structured feedback for the agent so it can fix the query and retry."""
+        return json.dumps(
+            {
+                "status": "rejected",
+                "reason": self.reason,
+                "hint": self.hint,
+                "query": self.cypher,
+            },
+            ensure_ascii=False,
+        )
+
+
+@dataclass
+class GuardedQuery:
+    cypher: str
+    estimated_rows: float
+
+    def to_query(self, timeout_seconds: float) -> Query:
+        """Wrap the statement so the server aborts it after the timeout."""
+        return Query(self.cypher, timeout=timeout_seconds)
+
+
+def _mask(cypher: str) -> str:
+    """
+    Blank out comments, string literals, quoted identifiers and aliases
+    so keywords inside them are ignored. Offsets are kept.
+    """
+    cypher = COMMENT.sub(lambda m: " " * len(m.group()), cypher)
+    cypher = STRING_LITERAL.sub(
+        lambda m: "'" + "_" * (len(m.group()) - 2) + "'", cypher
+    )
+    cypher = QUOTED_IDENTIFIER.sub(
+        lambda m: "`" + "_" * (len(m.group()) - 2) + "`", cypher
+    )
+    return ALIAS.sub(lambda m: m.group(1) + "_" * len(m.group(2)), cypher)
+
+
+def _top_level(masked: str) -> str:
+    """Blank out everything inside braces (subqueries, maps), offsets are kept."""
+    chars = []
+    depth = 0
+    for c in masked:
+        if c == "}":
+            depth = max(0, depth - 1)
+        chars.append(c if depth == 0 or c in "{}" else " ")
+        if c == "{":
+            depth += 1
+    return "".join(chars)
+
+
+def _branches(top: str) -> list[tuple[int, int]]:
+    """Spans of the UNION branches of the statement."""
+    spans = []
+    start = 0
+    for union in UNION.finditer(top):
+        spans.append((start, union.start()))
+        start = union.end()
+    spans.append((start, len(top)))
+    return spans
+
+
+def _max_estimated_rows(plan: dict | None) -> float:
+    """Largest row estimate of any operator in the plan tree."""
+    if not plan:
+        return 0.0
+    estimate = float(
+        plan.get("args", plan.get("arguments", {})).get("EstimatedRows", 0)
+    )
+    for child in plan.get("children", []):
+        estimate = max(estimate, _max_estimated_rows(child))
+    return estimate
+
+
+class CypherGuard:
+    """
+    Pre-execution stage for LLM-generated Cypher.
+
+    Validates that the statement is read-only, enforces a result LIMIT,
+    rejects plans whose estimated cardinality exceeds the threshold
+    and applies a server-side transaction timeout.
+    """
+
+    def __init__(
+        self,
+        driver: Driver,
+        max_estimated_rows: int,
+        result_limit: int,
+        timeout_seconds: float,
+        database: str = "neo4j",
+    ) -> None:
+        self.driver = driver
+        self.max_estimated_rows = max_estimated_rows
+        self.result_limit = result_limit
+        self.timeout_seconds = timeout_seconds
+        self.database = database
+
+    def validate(self, cypher: str) -> str:
+        """
+        Check that the statement is read-only and enforce the result LIMIT.
+
+        Args:
+            cypher: The generated Cypher statement
+
+        Returns:
+            The statement, rewritten to carry a LIMIT of at most result_limit
+
+        Raises:
+            CypherRejected: If the statement is not a single read-only query
+        """
+        cypher = cypher.strip().strip("`").strip()
+        if cypher.lower().startswith("cypher"):
+            cypher = cypher[len("cypher") :].strip()
+        cypher = cypher.rstrip(";").strip()
+        masked = _mask(cypher)
+
+        if ";" in masked:
+            raise CypherRejected(
+                "Multiple statements are not allowed.",
+                "Send exactly one read-only Cypher statement.",
+                cypher,
+            )
+
+        write_clause = WRITE_CLAUSES.search(masked)
+        if write_clause:
+            raise CypherRejected(
+                f"Clause '{write_clause.group(1).upper()}' modifies the database.",
+                "Only read the graph with MATCH/OPTIONAL MATCH/WITH/RETURN.",
+                cypher,
+            )
+
+        for procedure in CALL_PROCEDURE.findall(masked):
+            if not procedure.lower().startswith(ALLOWED_PROCEDURES):
+                raise CypherRejected(
+                    f"Procedure '{procedure}' is not allowed.",
+                    "Use plain MATCH patterns instead of procedure calls.",
+                    cypher,
+                )
+
+        return self._enforce_limit(cypher, masked)
+
+    def _enforce_limit(self, cypher: str, masked: str) -> str:
+        """Limit the final RETURN of every UNION branch."""
+        top = _top_level(masked)
+        parts = []
+        end = 0
+        for start, stop in _branches(top):
+            parts.append(cypher[end:start])
+            parts.append(self._limit_branch(cypher[start:stop], top[start:stop]))
+            end = stop
+        return "".join(parts)
+
+    def _limit_branch(self, branch: str, top: str) -> str:
+        """Append a LIMIT to the branch's RETURN or clamp an existing one."""
+        if not re.search(r"\bRETURN\b", top, re.IGNORECASE):
+            return branch
+
+        body = branch.rstrip()
+        trailing = branch[len(body) :]
+        limit = FINAL_LIMIT.search(top)
+        if limit is None:
+            return f"{body}\nLIMIT {self.result_limit}{trailing}"
+        # A parameter cannot be checked, the statement runs without parameters anyway
+        value = limit.group(1)
+        if value.startswith("$") or int(value) > self.result_limit:
+            return f"{branch[: limit.start()]}LIMIT {self.result_limit}{trailing}"
+        return branch
+
+    def explain(self, cypher: str) -> float:
+        """
+        Plan the statement without executing it.
+
+        Returns:
+            The largest estimated row count of any operator in the plan
+
+        Raises:
+            CypherRejected: If the statement does not compile
+        """
+        try:
+            with self.driver.session(
+                database=self.database, default_access_mode=READ_ACCESS
+            ) as session:
+                summary = session.run(
+                    Query(f"EXPLAIN {cypher}", timeout=self.timeout_seconds)
+                ).consume()
+        except Neo4jError as e:
+            raise CypherRejected(
+                f"Query does not compile: {e.message}",
+                "Fix the syntax and use only labels, relationships and properties from the schema.",
+                cypher,
+            ) from e
+        return _max_estimated_rows(summary.plan)
+
+    def prepare(self, cypher: str) -> GuardedQuery:
+        """
+        Run the whole pre-execution stage.
+
+        Args:
+            cypher: The generated Cypher statement
+
+        Returns:
+            The validated, limited statement with its plan estimate
+
+        Raises:
+            CypherRejected: If the statement is not read-only, does not compile
+                or is estimated to touch too many rows
+        """
+        cypher = self.validate(cypher)
+        estimated_rows = self.explain(cypher)
+        if estimated_rows > self.max_estimated_rows:
+            raise CypherRejected(
+                f"Query plan is too expensive ({estimated_rows:.0f} estimated rows, "
+                f"limit is {self.max_estimated_rows}).",
+                "Avoid cartesian products (comma-separated MATCH patterns without "
+                "a connecting relationship) and filter on indexed properties early.",
+                cypher,
+            )
+        return GuardedQuery(cypher=cypher, estimated_rows=estimated_rows)
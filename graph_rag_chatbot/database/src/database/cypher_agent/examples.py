@@ -0,0 +1,161 @@
+"""
+Few-shot Cypher examples for the activity graph.
+
+The examples closest to the question are picked with a small local index
+over character trigrams (TF-IDF weighted, cosine similarity), without any
+model or network call. They go after the static, cacheable part of the
+Cypher generation prompt.
+"""
+
+import math
+import unicodedata
+from collections import Counter
+from dataclasses import dataclass
+
+
+@dataclass(frozen=True)
+class CypherExample:
+    question: str
+    cypher: str
+
+
+CYPHER_EXAMPLES = [
+    CypherExample(
+        "Jaké aktivity jsou v Brně?",
+        "MATCH (a:Activity)-[:AVAILABLE_IN]->(:Location)-[:LOCATED_IN*0..3]->(l:Location)\n"
+        "WHERE toLower(l.name) CONTAINS 'brno'\n"
+        "RETURN DISTINCT a.name AS name, a.url AS url LIMIT 5",
+    ),
+    CypherExample(
+        "Najdi stáže pro studenty vysoké školy",
+        "MATCH (a:Activity)-[:HAS_TYPE]->(:ActivityType)<-[:PARENT_OF*0..3]-(t:ActivityType {name: 'stáž'})\n"
+        "MATCH (a)-[:AIMS_TO]->(:LevelOfStudy {code: 'student_vs'})\n"
+        "RETURN DISTINCT a.name AS name, a.shortDescription AS description LIMIT 5",
+    ),
+    CypherExample(
+        "Které soutěže jsou pro středoškoláky zdarma?",
+        "MATCH (a:Activity)-[:HAS_TYPE]->(:ActivityType {name: 'soutěž'})\n"
+        "MATCH (a)-[:AIMS_TO]->(:LevelOfStudy {code: 'student_ss'})\n"
+        "MATCH (a)-[:FUNDED_BY]->(:FundingType {name: 'zdarma'})\n"
+        "RETURN a.name AS name, a.url AS url LIMIT 5",
+    ),
+    CypherExample(
+        "Aktivity zaměřené na IT a technologie v Praze",
+        "MATCH (a:Activity)-[:FOCUSES_ON]->(f:Field)\n"
+        "WHERE toLower(f.name) CONTAINS 'it a technologie'\n"
+        "MATCH (a)-[:AVAILABLE_IN]->(:Location)-[:LOCATED_IN*0..3]->(:Location {name: 'Praha'})\n"
+        "RETURN DISTINCT a.name AS name LIMIT 5",
+    ),
+    CypherExample(
+        "Kde se naučím programovat?",
+        "MATCH (a:Activity)-[:REQUIRES|DEVELOPS]->(s:Skill)\n"
+        "WHERE toLower(s.name) CONTAINS 'programování'\n"
+        "RETURN DISTINCT a.name AS name, a.shortDescription AS description LIMIT 5",
+    ),
+    CypherExample(
+        "Na jaké povolání se hodí grafika a jaký je plat?",
+        "MATCH (s:Skill)-[:USED_IN]->(j:Job)\n"
+        "WHERE toLower(s.name) CONTAINS 'grafik'\n"
+        "RETURN j.name AS job, j.averageSalary AS averageSalary\n"
+        "ORDER BY averageSalary DESC LIMIT 5",
+    ),
+    CypherExample(
+        "Kolik je víkendových akcí pro základní školy?",
+        "MATCH (a:Activity)-[:DELIVERED_AS]->(:Format {name: 'víkendovka'})\n"
+        "MATCH (a)-[:AIMS_TO]->(:LevelOfStudy {code: 'student_zs'})\n"
+        "RETURN count(DISTINCT a) AS count",
+    ),
+    CypherExample(
+        "Které organizace pořádají nejvíce aktivit?",
+        "MATCH (a:Activity)-[:ORGANIZED_BY]->(o:Organisation)\n"
+        "RETURN o.name AS organisation, count(a) AS activities\n"
+        "ORDER BY activities DESC LIMIT 5",
+    ),
+    CypherExample(
+        "Ve kterých krajích působí neziskové organizace?",
+        "MATCH (o:Organisation {isNonProfit: true})-[:OPERATES_IN]->(l:Location)\n"
+        "RETURN l.name AS location, count(DISTINCT o) AS organisations\n"
+        "ORDER BY organisations DESC LIMIT 5",
+    ),
+    CypherExample(
+        "Jaké aktivity pořádá Junior Achievement?",
+        "MATCH (a:Activity)-[:ORGANIZED_BY]->(o:Organisation)\n"
+        "WHERE toLower(o.name) CONTAINS 'junior achievement'\n"
+        "RETURN a.name AS name, a.url AS url LIMIT 5",
+    ),
+    CypherExample(
+        "Které aktivity používají Arduino nebo Python?",
+        "MATCH (a:Activity)-[:USES_TECHNOLOGY]->(t:Technology)\n"
+        "WHERE t.key IN ['arduino', 'python']\n"
+        "RETURN a.name AS name, collect(t.name) AS technologies LIMIT 5",
+    ),
+    CypherExample(
+        "Aktivity o udržitelnosti a ochraně přírody",
+        "MATCH (a:Activity)-[:HAS_CONCEPT]->(c:Concept)\n"
+        "WHERE c.key CONTAINS 'udržitelnost' OR c.key CONTAINS 'ochrana přírody'\n"
+        "RETURN DISTINCT a.name AS name, a.shortDescription AS description LIMIT 5",
+    ),
+    CypherExample(
+        "Co mě připraví na práci programátora?",
+        "MATCH (a:Activity)-[:PREPARES_FOR]->(j:Job)\n"
+        "WHERE toLower(j.name) CONTAINS 'programátor'\n"
+        "RETURN a.name AS name, a.url AS url LIMIT 5",
+    ),
+    CypherExample(
+        "Jaké dlouhodobé programy jsou v zahraničí?",
+        "MATCH (a:Activity)-[:DELIVERED_AS]->(f:Format {durationCategory: 'long'})\n"
+        "MATCH (a)-[:AVAILABLE_IN]->(:Location)-[:LOCATED_IN*0..3]->(s)\n"
+        "WHERE s:State AND s.shortcut <> 'CZ'\n"
+        "RETURN DISTINCT a.name AS name, f.name AS format LIMIT 5",
+    ),
+]
+
+
+def _trigrams(text: str) -> Counter[str]:
+    folded = unicodedata.normalize("NFKD", text.lower())
+    folded = "".join(c for c in folded if not unicodedata.combining(c))
+    grams: Counter[str] = Counter()
+    for word in folded.split():
+        padded = f" {word.strip('?,.!')} "
+        grams.update(padded[i : i + 3] for i in range(len(padded) - 2))
+    return grams
+
+
+class ExampleIndex:
+    """Nearest examples to a question by TF-IDF weighted character trigrams."""
+
+    def __init__(self, examples: list[CypherExample]) -> None:
+        self.examples = examples
+        counts = [_trigrams(example.question) for example in examples]
+        document_frequency = Counter(gram for c in counts for gram in c)
+        self._idf = {
+            gram: math.log((1 + len(examples)) / (1 + df)) + 1
+            for gram, df in document_frequency.items()
+        }
+        self._vectors = [self._vector(c) for c in counts]
+
+    def _vector(self, counts: Counter[str]) -> dict[str, float]:
+        vector = {
+            gram: (1 + math.log(count)) * self._idf[gram]
+            for gram, count in counts.items()
+            if gram in self._idf
+        }
+        norm = math.sqrt(sum(w * w for w in vector.values())) or 1.0
+        return {gram: w / norm for gram, w in vector.items()}
+
+    def nearest(self, question: str, k: int) -> list[CypherExample]:
+        """Up to k most similar examples, the most similar last (next to the question)."""
+        query = self._vector(_trigrams(question))
+        scored = [
+            (sum(w * vector.get(gram, 0.0) for gram, w in query.items()), i)
+            for i, vector in enumerate(self._vectors)
+        ]
+        best = sorted(scored, reverse=True)[:k]
+        return [self.examples[i] for score, i in reversed(best) if score > 0]
+
+
+def format_examples(examples: list[CypherExample]) -> str:
+    return "\n\n".join(
+        f"Question: {example.question}\nCypher:\n{example.cypher}"
+        for example in examples
+    )
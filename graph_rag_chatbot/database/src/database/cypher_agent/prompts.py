@@ -1,23 +1,37 @@
 # flake8: noqa
+from langchain_core.prompts import ChatPromptTemplate
 from langchain_core.prompts.prompt import PromptTemplate
 
-CYPHER_GENERATION_TEMPLATE = """Task:Generate Cypher statement to query a graph database.
+# Static prefix: identical for every question as long as the schema does not
+# change, so the provider can serve it from its prompt cache
+CYPHER_GENERATION_SYSTEM_TEMPLATE = """Task:Generate Cypher statement to query a graph database.
 Instructions:
 Use only the provided relationship types and properties in the schema.
 Do not use any other relationship types or properties that are not provided.
-Schema:
-{schema}
+Match names case-insensitively with toLower(...) CONTAINS, names are in Czech.
+Locations form a hierarchy, use -[:LOCATED_IN*0..3]-> to include towns of a region.
 Note: Do not include any explanations or apologies in your responses.
 Do not respond to any questions that might ask anything else than for you to construct a Cypher statement.
 Do not include any text except the generated Cypher statement.
 
 Always limit the number of returned results to maximum 5. Even when the user does not specify this in the question.
 
-The question is:
+Schema:
+{schema}"""
+
+# Dynamic suffix: the examples closest to the question, then the question
+CYPHER_GENERATION_QUESTION_TEMPLATE = """Examples of similar questions:
+
+{examples}
+
+Generate the Cypher statement for this question:
 {question}"""
 
-CYPHER_GENERATION_PROMPT = PromptTemplate(
-    input_variables=["schema", "question"], template=CYPHER_GENERATION_TEMPLATE
+CYPHER_GENERATION_PROMPT = ChatPromptTemplate.from_messages(
+    [
+        ("system", CYPHER_GENERATION_SYSTEM_TEMPLATE),
+        ("human", CYPHER_GENERATION_QUESTION_TEMPLATE),
+    ]
 )
 
 CYPHER_QA_TEMPLATE = """You are an assistant that helps to form nice and human understandable answers.
@@ -0,0 +1,102 @@
+import json
+from typing import Any, Iterable
+
+from neo4j import Record
+from neo4j.graph import Node, Path, Relationship
+
+# Node properties that are never useful in the answer prompt
+EXCLUDED_PROPERTIES = {"longDescription", "embedding", "createdAt", "updatedAt"}
+
+# Rough estimate used for the token budget, good enough for Czech and English
+CHARS_PER_TOKEN = 4
+
+
+class ResultFormatter:
+    """
+    Compact serialization of Cypher results for the agent's tool output.
+
+    Records are consumed lazily up to a row cap, nodes are projected to
+    their useful properties, long strings are truncated and the output is
+    a pipe-separated table that stays under the token budget.
+    """
+
+    def __init__(self, max_rows: int, max_text_length: int, max_tokens: int) -> None:
+        self.max_rows = max_rows
+        self.max_text_length = max_text_length
+        self.max_tokens = max_tokens
+
+    def _truncate(self, text: str) -> str:
+        text = " ".join(text.split())
+        if len(text) > self.max_text_length:
+            return text[: self.max_text_length - 1] + "…"
+        return text
+
+    def _project(self, value: Any) -> Any:
+        """Reduce a Cypher value to plain, small Python data."""
+        if isinstance(value, Node):
+            return {
+                key: self._project(val)
+                for key, val in value.items()
+                if key not in EXCLUDED_PROPERTIES
+            }
+        if isinstance(value, Relationship):
+            return value.type
+        if isinstance(value, Path):
+            return [self._project(node) for node in value.nodes]
+        if isinstance(value, str):
+            return self._truncate(value)
+        if isinstance(value, list):
+            return [self._project(item) for item in value[: self.max_rows]]
+        if isinstance(value, dict):
+            return {
+                key: self._project(val)
+                for key, val in value.items()
+                if key not in EXCLUDED_PROPERTIES
+            }
+        return value
+
+    def _cell(self, value: Any) -> str:
+        value = self._project(value)
+        if value is None:
+            return ""
+        if isinstance(value, str):
+            return value.replace("|", "/")
+        return json.dumps(value, ensure_ascii=False, separators=(",", ":"), default=str)
+
+    def format(self, records: Iterable[Record]) -> str:
+        """
+        Format records as a compact table.
+
+        Args:
+            records: Records to format, consumed lazily (e.g. a neo4j Result)
+
+        Returns:
+            The table, or "No results found." when there are no records
+        """
+        budget = self.max_tokens * CHARS_PER_TOKEN
+        lines: list[str] = []
+        used = 0
+        rows = 0
+        truncated = False
+
+        for record in records:
+            if not lines:
+                header = " | ".join(record.keys())
+                lines.append(header)
+                used += len(header) + 1
+            if rows >= self.max_rows:
+                truncated = True
+                break
+            line = " | ".join(self._cell(value) for value in record.values())
+            if used + len(line) + 1 > budget:
+                truncated = True
+                break
+            lines.append(line)
+            used += len(line) + 1
+            rows += 1
+
+        if not lines:
+            return "No results found."
+        if truncated:
+            lines.append(f"(showing first {rows} rows, more results were omitted)")
+        return "\n".join(lines)
@@ -1,9 +1,29 @@
-from fastapi import Request
+from fastapi import HTTPException, Request, status
 
 
-def get_graph(request: Request):
-    return request.app.state.graph
+def _initialized(request: Request, name: str):
+    """App state set up by the lifespan, 503 while the service is still starting."""
+    value = getattr(request.app.state, name, None)
+    if value is None:
+        raise HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail="Service is starting, try again shortly.",
+            headers={"Retry-After": "1"},
+        )
+    return value
+
+
+def get_driver(request: Request):
+    return _initialized(request, "driver")
 
 
 def get_llm(request: Request):
-    return request.app.state.llm
+    return _initialized(request, "llm")
+
+
+def get_cypher_agent(request: Request):
+    return _initialized(request, "agent")
+
+
+def get_llm_gateway(request: Request):
+    return _initialized(request, "llm_gateway")
@@ -0,0 +1,179 @@
+"""
+Text embeddings of activities for vector retrieval.
+
+The graph loader embeds every activity offline and stores the vectors in a
+Neo4j vector index; the agent embeds only the user question at query time.
+Both sides have to use the same embedder, its name is part of the cache key.
+
+sentence-transformers is an optional dependency (`database[embeddings]`),
+imported on first use. The hashing embedder needs nothing and is meant for
+the fake graph and for tests, its vectors only capture shared character
+trigrams.
+"""
+
+import hashlib
+import json
+import math
+import threading
+import unicodedata
+from pathlib import Path
+from typing import Literal, Protocol
+
+EmbeddingProvider = Literal["sentence_transformers", "hashing", "none"]
+
+DEFAULT_MODEL = "sentence-transformers/paraphrase-multilingual-MiniLM-L12-v2"
+
+VECTOR_INDEX = "activity_embedding"
+
+# The vector index returns the nearest candidates first, the graph filters
+# are applied afterwards, so more candidates than k are fetched
+VECTOR_SEARCH_QUERY = f"""
+CALL db.index.vector.queryNodes('{VECTOR_INDEX}', $candidates, $embedding)
+YIELD node, score
+WHERE ($location IS NULL OR EXISTS {{
+        MATCH (node)-[:AVAILABLE_IN]->(:Location)-[:LOCATED_IN*0..3]->(l:Location)
+        WHERE toLower(l.name) CONTAINS toLower($location)
+    }})
+  AND ($level IS NULL OR EXISTS {{
+        MATCH (node)-[:AIMS_TO]->(lv:LevelOfStudy)
+        WHERE toLower(lv.name) CONTAINS toLower($level) OR lv.code = $level
+    }})
+RETURN node.id AS id, node.name AS name, node.shortDescription AS description,
+       node.url AS url, round(score, 3) AS score
+ORDER BY score DESC
+LIMIT $k
+"""
+
+
+class Embedder(Protocol):
+    name: str
+    dimensions: int
+
+    def embed(self, texts: list[str]) -> list[list[float]]:
+        """L2-normalized vectors, one per text."""
+        ...
+
+
+class SentenceTransformerEmbedder:
+    """Local CPU model, loaded lazily on the first call."""
+
+    def __init__(self, model_name: str = DEFAULT_MODEL, batch_size: int = 64) -> None:
+        self.name = model_name
+        self.batch_size = batch_size
+        self._model = None
+        self._lock = threading.Lock()
+
+    def _load(self):
+        with self._lock:
+            if self._model is None:
+                from sentence_transformers import SentenceTransformer
+
+                self._model = SentenceTransformer(self.name, device="cpu")
+        return self._model
+
+    @property
+    def dimensions(self) -> int:
+        return self._load().get_sentence_embedding_dimension()
+
+    def embed(self, texts: list[str]) -> list[list[float]]:
+        vectors = self._load().encode(
+            texts,
+            batch_size=self.batch_size,
+            normalize_embeddings=True,
+            show_progress_bar=False,
+        )
+        return vectors.tolist()
+
+
+class HashingEmbedder:
+    """Feature hashing of character trigrams, without any model."""
+
+    def __init__(self, dimensions: int = 384) -> None:
+        self.name = f"hashing-{dimensions}"
+        self.dimensions = dimensions
+
+    def _vector(self, text: str) -> list[float]:
+        # Fold diacritics so "Vysocina" and "Vysočina" share trigrams
+        folded = unicodedata.normalize("NFKD", text.lower())
+        folded = "".join(c for c in folded if not unicodedata.combining(c))
+        vector = [0.0] * self.dimensions
+        for word in folded.split():
+            padded = f" {word} "
+            for i in range(len(padded) - 2):
+                digest = hashlib.blake2b(
+                    padded[i : i + 3].encode(), digest_size=8
+                ).digest()
+                value = int.from_bytes(digest, "little")
+                vector[value % self.dimensions] += 1.0 if value >> 63 else -1.0
+        norm = math.sqrt(sum(x * x for x in vector)) or 1.0
+        return [x / norm for x in vector]
+
+    def embed(self, texts: list[str]) -> list[list[float]]:
+        return [self._vector(text) for text in texts]
+
+
+def create_embedder(
+    provider: EmbeddingProvider, model_name: str = DEFAULT_MODEL
+) -> Embedder | None:
+    """Embedder selected by provider, None when vector search is disabled."""
+    if provider == "none":
+        return None
+    if provider == "hashing":
+        return HashingEmbedder()
+    return SentenceTransformerEmbedder(model_name)
+
+
+def activity_text(name: str, short_description: str, long_description: str) -> str:
+    """Text of an activity that is embedded."""
+    return "\n".join(
+        part for part in (name, short_description, long_description) if part
+    )
+
+
+def content_hash(embedder_name: str, text: str) -> str:
+    """Cache key of a text, changes with the text or the embedder."""
+    return hashlib.sha256(f"{embedder_name}\n{text}".encode()).hexdigest()
+
+
+class EmbeddingCache:
+    """
+    Vectors keyed by content hash, persisted as JSON between loader runs.
+
+    Unchanged activities are not embedded again.
+    """
+
+    def __init__(self, path: str | Path) -> None:
+        self.path = Path(path)
+        self._vectors: dict[str, list[float]] = {}
+        if self.path.exists():
+            with open(self.path, encoding="utf-8") as f:
+                self._vectors = json.load(f)
+
+    def __contains__(self, key: str) -> bool:
+        return key in self._vectors
+
+    def __getitem__(self, key: str) -> list[float]:
+        return self._vectors[key]
+
+    def __setitem__(self, key: str, vector: list[float]) -> None:
+        self._vectors[key] = vector
+
+    def prune(self, keep: set[str]) -> None:
+        """Drop vectors of activities that no longer exist or changed."""
+        self._vectors = {k: v for k, v in self._vectors.items() if k in keep}
+
+    def save(self) -> None:
+        tmp = self.path.with_suffix(self.path.suffix + ".tmp")
+        with open(tmp, "w", encoding="utf-8") as f:
+            json.dump(self._vectors, f)
+        tmp.replace(self.path)
+
+
+def create_vector_index_statement(dimensions: int) -> str:
+    """CREATE VECTOR INDEX statement over Activity.embedding."""
+    return (
+        f"CREATE VECTOR INDEX {VECTOR_INDEX} IF NOT EXISTS "
+        f"FOR (a:Activity) ON a.embedding "
+        f"OPTIONS {{indexConfig: {{`vector.dimensions`: {dimensions}, "
+        f"`vector.similarity_function`: 'cosine'}}}}"
+    )
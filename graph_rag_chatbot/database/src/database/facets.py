@@ -0,0 +1,175 @@
+"""
+Precomputed facet counts of activities.
+
+After loading, the graph loader counts the activities of every combination
+of up to `depth` facet values (e.g. location=Brno and type=stáž) and stores
+each non-zero count on a FacetCount node. Count and top-N questions are then
+a single index lookup instead of an aggregation over all activities.
+
+Facet values are node ids. A location also counts for its parent regions,
+an activity type for its parent types, so "stáže v Jihomoravském kraji"
+includes internships in Brno. The key encoding below is shared by the
+loader, which writes the counts, and the agent tools, which read them.
+"""
+
+from collections import Counter
+from itertools import combinations, product
+from typing import Iterable
+
+# Facet name -> (relationship from Activity, target label)
+FACETS = {
+    "location": ("AVAILABLE_IN", "Location"),
+    "level": ("AIMS_TO", "LevelOfStudy"),
+    "field": ("FOCUSES_ON", "Field"),
+    "skill": ("REQUIRES", "Skill"),
+    "activity_type": ("HAS_TYPE", "ActivityType"),
+    "funding": ("FUNDED_BY", "FundingType"),
+    "format": ("DELIVERED_AS", "Format"),
+}
+
+DEFAULT_DEPTH = 2
+
+# Facet values of every activity, including parent locations and types
+ACTIVITY_FACETS_QUERY = """
+MATCH (a:Activity)
+RETURN a.id AS id,
+       [(a)-[:AVAILABLE_IN]->(:Location)-[:LOCATED_IN*0..3]->(n:Location) | n.id] AS location,
+       [(a)-[:AIMS_TO]->(n:LevelOfStudy) | n.id] AS level,
+       [(a)-[:FOCUSES_ON]->(n:Field) | n.id] AS field,
+       [(a)-[:REQUIRES]->(n:Skill) | n.id] AS skill,
+       [(a)-[:HAS_TYPE]->(:ActivityType)<-[:PARENT_OF*0..3]-(n:ActivityType) | n.id] AS activity_type,
+       [(a)-[:FUNDED_BY]->(n:FundingType) | n.id] AS funding,
+       [(a)-[:DELIVERED_AS]->(n:Format) | n.id] AS format
+"""
+
+DELETE_FACET_COUNTS_QUERY = "MATCH (f:FacetCount) DETACH DELETE f"
+
+FACET_COUNT_INDEXES = [
+    "CREATE INDEX facet_count_key IF NOT EXISTS FOR (f:FacetCount) ON (f.key)",
+    "CREATE INDEX facet_count_facets IF NOT EXISTS FOR (f:FacetCount) ON (f.facets)",
+]
+
+SET_FACET_DEPTH_QUERY = """
+MERGE (m:GraphMeta {id: 1})
+SET m.facetDepth = $depth
+"""
+
+CREATE_FACET_COUNTS_QUERY = """
+UNWIND $rows AS row
+CREATE (f:FacetCount)
+SET f = row
+"""
+
+# Always one row, depth is null when no counts were materialized
+FACET_COUNT_QUERY = """
+OPTIONAL MATCH (m:GraphMeta)
+OPTIONAL MATCH (f:FacetCount {key: $key})
+RETURN coalesce(f.count, 0) AS count, m.facetDepth AS depth
+"""
+
+TOP_FACET_VALUES_QUERY = """
+MATCH (f:FacetCount {facets: $facets})
+WHERE all(name IN keys($filters) WHERE f[name] = $filters[name])
+RETURN f[$facet] AS id, f.count AS count
+ORDER BY count DESC
+LIMIT $k
+"""
+
+
+def facet_key(values: dict[str, int]) -> str:
+    """Canonical key of a facet combination, e.g. "activity_type=4|location=12"."""
+    return "|".join(f"{name}={values[name]}" for name in sorted(values))
+
+
+def facet_set(names: Iterable[str]) -> str:
+    """Canonical name of a set of facets, e.g. "activity_type|location"."""
+    return "|".join(sorted(names))
+
+
+def compute_facet_counts(activities: Iterable[dict], depth: int) -> list[dict]:
+    """
+    Count activities per combination of up to `depth` facet values.
+
+    Args:
+        activities: Rows of ACTIVITY_FACETS_QUERY
+        depth: Maximum number of facets in a combination
+
+    Returns:
+        Properties of the FacetCount nodes: key, facets, depth, count and
+        the id of every facet value in the combination
+    """
+    counts: Counter[tuple[tuple[str, int], ...]] = Counter()
+    for activity in activities:
+        values = {
+            name: sorted(set(activity[name] or []))
+            for name in sorted(FACETS)
+            if activity[name]
+        }
+        counts[()] += 1
+        for size in range(1, depth + 1):
+            for names in combinations(values, size):
+                for combo in product(*([(n, v) for v in values[n]] for n in names)):
+                    counts[combo] += 1
+
+    return [
+        {
+            "key": facet_key(dict(combo)),
+            "facets": facet_set(name for name, _ in combo),
+            "depth": len(combo),
+            "count": count,
+            **dict(combo),
+        }
+        for combo, count in counts.items()
+    ]
+
+
+def resolve_query(facet: str) -> str:
+    """Ids and names of the facet's nodes matching a (partial) name or code."""
+    _, label = FACETS[facet]
+    return f"""
+MATCH (n:{label})
+WHERE toLower(n.name) CONTAINS toLower($name) OR n.code = $name
+RETURN n.id AS id, n.name AS name
+ORDER BY size(n.name)
+LIMIT 5
+"""
+
+
+def names_query(facet: str) -> str:
+    """Names of the facet's nodes by id."""
+    _, label = FACETS[facet]
+    return f"MATCH (n:{label}) WHERE n.id IN $ids RETURN n.id AS id, n.name AS name"
+
+
+def _facet_pattern(name: str) -> str:
+    """Pattern from activity `a` to the facet node `n`, through parent locations and types."""
+    rel_type, label = FACETS[name]
+    if name == "location":
+        return f"(a)-[:{rel_type}]->(:{label})-[:LOCATED_IN*0..3]->(n:{label})"
+    if name == "activity_type":
+        return f"(a)-[:{rel_type}]->(:{label})<-[:PARENT_OF*0..3]-(n:{label})"
+    return f"(a)-[:{rel_type}]->(n:{label})"
+
+
+def _filters_where(values: dict[str, int]) -> str:
+    conditions = [
+        f"EXISTS {{ MATCH {_facet_pattern(name)} WHERE n.id = $values.{name} }}"
+        for name in sorted(values)
+    ]
+    return " AND ".join(conditions) or "true"
+
+
+def count_fallback_query(values: dict[str, int]) -> str:
+    """Live count for combinations deeper than the materialized ones."""
+    return f"MATCH (a:Activity) WHERE {_filters_where(values)} RETURN count(a) AS count"
+
+
+def top_fallback_query(facet: str, values: dict[str, int]) -> str:
+    """Live top-N of a facet for combinations deeper than the materialized ones."""
+    return f"""
+MATCH (a:Activity) WHERE {_filters_where(values)}
+MATCH {_facet_pattern(facet)}
+RETURN n.id AS id, count(DISTINCT a) AS count
+ORDER BY count DESC
+LIMIT $k
+"""
@@ -0,0 +1,273 @@
+"""
+Deterministic stand-ins for Azure OpenAI and Neo4j.
+
+They let the whole backend + database stack run on one machine without
+network access, e.g. for repeatable load tests and latency benchmarks.
+Enable them with DATABASE_LLM_PROVIDER=fake and DATABASE_GRAPH_PROVIDER=fake.
+"""
+
+import asyncio
+import json
+import re
+import time
+from typing import Any, AsyncIterator, Callable, Iterator, Sequence
+
+from langchain_core.language_models.chat_models import BaseChatModel
+from langchain_core.messages import (
+    AIMessage,
+    AIMessageChunk,
+    BaseMessage,
+    HumanMessage,
+    ToolMessage,
+)
+from langchain_core.outputs import ChatGeneration, ChatGenerationChunk, ChatResult
+from pydantic import Field
+
+TOKEN_PATTERN = re.compile(r"\S+\s*")
+
+# Marker present in the Cypher generation prompt
+CYPHER_PROMPT_MARKER = "Cypher statement"
+
+DEFAULT_ANSWER = "Našel jsem tyto aktivity, které odpovídají vašemu dotazu:"
+
+
+class FakeChatModel(BaseChatModel):
+    """
+    Fake chat model with a configurable first-token delay and token rate.
+
+    Bound to tools (as the agent does) it scripts the tool loop:
+    run_cypher_query with the canned Cypher, then answer_question with the
+    results, then a final message. Without tools it answers Cypher
+    generation prompts with the canned Cypher and anything else with a
+    canned answer followed by the context it was given, unless a responder
+    is set, which then answers every prompt (e.g. offline enrichment runs).
+    """
+
+    first_token_delay_seconds: float = 0.5
+    tokens_per_second: float = 50.0
+    cypher: str = "MATCH (a:Activity) RETURN a.name AS name LIMIT 5"
+    answer: str = DEFAULT_ANSWER
+    tool_names: list[str] = Field(default_factory=list)
+    responder: Callable[[str], str] | None = None
+
+    @property
+    def _llm_type(self) -> str:
+        return "fake-chat"
+
+    def bind_tools(self, tools: Sequence[Any], **kwargs: Any) -> "FakeChatModel":
+        names = [getattr(t, "name", None) or t.__name__ for t in tools]
+        return self.model_copy(update={"tool_names": names})
+
+    def _respond(self, messages: list[BaseMessage]) -> AIMessage:
+        if self.tool_names:
+            return self._next_agent_step(messages)
+
+        prompt = str(messages[-1].content)
+        if self.responder is not None:
+            return AIMessage(content=self.responder(prompt))
+        if CYPHER_PROMPT_MARKER in prompt:
+            return AIMessage(content=self.cypher)
+        context = prompt.split("Information:", 1)[-1].split("Question:", 1)[0]
+        names = [line.split(" | ")[0] for line in context.strip().splitlines()[1:6]]
+        return AIMessage(content=" ".join([self.answer, ", ".join(names)]).strip())
+
+    def _next_agent_step(self, messages: list[BaseMessage]) -> AIMessage:
+        question = next(
+            (str(m.content) for m in reversed(messages) if isinstance(m, HumanMessage)),
+            "",
+        )
+        last = messages[-1]
+        if not isinstance(last, ToolMessage):
+            return self._tool_call("run_cypher_query", {"cypher_query": self.cypher})
+        if last.name == "run_cypher_query":
+            return self._tool_call(
+                "answer_question", {"context": str(last.content), "question": question}
+            )
+        return AIMessage(content=str(last.content))
+
+    def _tool_call(self, name: str, args: dict) -> AIMessage:
+        call_id = f"call_{name}_{len(json.dumps(args))}"
+        return AIMessage(
+            content="", tool_calls=[{"name": name, "args": args, "id": call_id}]
+        )
+
+    def _tokens(self, message: AIMessage) -> list[str]:
+        return TOKEN_PATTERN.findall(str(message.content)) or [""]
+
+    def _generate(self, messages, stop=None, run_manager=None, **kwargs) -> ChatResult:
+        message = self._respond(messages)
+        time.sleep(
+            self.first_token_delay_seconds
+            + len(self._tokens(message)) / self.tokens_per_second
+        )
+        return ChatResult(generations=[ChatGeneration(message=message)])
+
+    async def _agenerate(
+        self, messages, stop=None, run_manager=None, **kwargs
+    ) -> ChatResult:
+        message = self._respond(messages)
+        await asyncio.sleep(
+            self.first_token_delay_seconds
+            + len(self._tokens(message)) / self.tokens_per_second
+        )
+        return ChatResult(generations=[ChatGeneration(message=message)])
+
+    def _chunks(self, message: AIMessage) -> Iterator[ChatGenerationChunk]:
+        if message.tool_calls:
+            call = message.tool_calls[0]
+            yield ChatGenerationChunk(
+                message=AIMessageChunk(
+                    content="",
+                    tool_call_chunks=[
+                        {
+                            "name": call["name"],
+                            "args": json.dumps(call["args"], ensure_ascii=False),
+                            "id": call["id"],
+                            "index": 0,
+                        }
+                    ],
+                )
+            )
+            return
+        for token in self._tokens(message):
+            yield ChatGenerationChunk(message=AIMessageChunk(content=token))
+
+    def _stream(self, messages, stop=None, run_manager=None, **kwargs):
+        time.sleep(self.first_token_delay_seconds)
+        for chunk in self._chunks(self._respond(messages)):
+            if run_manager:
+                run_manager.on_llm_new_token(chunk.text, chunk=chunk)
+            yield chunk
+            time.sleep(1 / self.tokens_per_second)
+
+    async def _astream(
+        self, messages, stop=None, run_manager=None, **kwargs
+    ) -> AsyncIterator[ChatGenerationChunk]:
+        await asyncio.sleep(self.first_token_delay_seconds)
+        for chunk in self._chunks(self._respond(messages)):
+            if run_manager:
+                await run_manager.on_llm_new_token(chunk.text, chunk=chunk)
+            yield chunk
+            await asyncio.sleep(1 / self.tokens_per_second)
+
+
+# Small sample of the activity graph served by FakeGraphDriver
+FAKE_ACTIVITIES = [
+    {
+        "name": "Letní škola programování",
+        "shortDescription": "Týdenní kurz Pythonu pro studenty středních škol.",
+        "url": "https://example.org/letni-skola-programovani",
+    },
+    {
+        "name": "Robotická olympiáda",
+        "shortDescription": "Soutěž týmů ve stavbě a programování robotů.",
+        "url": "https://example.org/roboticka-olympiada",
+    },
+    {
+        "name": "Stáž v datové analytice",
+        "shortDescription": "Tříměsíční stáž pro studenty vysokých škol v Brně.",
+        "url": "https://example.org/staz-datova-analytika",
+    },
+    {
+        "name": "Dobrovolnický tábor na Vysočině",
+        "shortDescription": "Dobrovolnický program zaměřený na ochranu přírody.",
+        "url": "https://example.org/dobrovolnicky-tabor",
+    },
+    {
+        "name": "Kurz veřejného vystupování",
+        "shortDescription": "Online workshop rétoriky a prezentačních dovedností.",
+        "url": "https://example.org/kurz-vystupovani",
+    },
+]
+
+FAKE_SCHEMA = """Node properties:
+Activity {id: STRING, name: STRING, shortDescription: STRING, longDescription: STRING, url: STRING}
+Location {id: INTEGER, name: STRING, type: STRING}
+LevelOfStudy {id: INTEGER, name: STRING, code: STRING}
+Field {id: INTEGER, name: STRING, description: STRING}
+Skill {id: INTEGER, name: STRING, description: STRING}
+ActivityType {id: INTEGER, name: STRING, description: STRING}
+The relationships:
+(:Activity)-[:AVAILABLE_IN]->(:Location)
+(:Activity)-[:AIMS_TO]->(:LevelOfStudy)
+(:Activity)-[:FOCUSES_ON]->(:Field)
+(:Activity)-[:REQUIRES]->(:Skill)
+(:Activity)-[:HAS_TYPE]->(:ActivityType)
+(:Location)-[:LOCATED_IN]->(:Location)"""
+
+
+class FakeRecord:
+    def __init__(self, data: dict) -> None:
+        self._data = data
+
+    def keys(self) -> list[str]:
+        return list(self._data.keys())
+
+    def values(self) -> list[Any]:
+        return list(self._data.values())
+
+    def data(self) -> dict:
+        return dict(self._data)
+
+    def __getitem__(self, key: str) -> Any:
+        return self._data[key]
+
+
+class FakeSummary:
+    def __init__(self, estimated_rows: float) -> None:
+        self.plan = {"args": {"EstimatedRows": estimated_rows}, "children": []}
+
+
+class FakeResult:
+    def __init__(self, records: list[FakeRecord]) -> None:
+        self._records = records
+
+    def __iter__(self) -> Iterator[FakeRecord]:
+        return iter(self._records)
+
+    def consume(self) -> FakeSummary:
+        return FakeSummary(float(len(self._records)))
+
+
+class FakeSession:
+    def __init__(self, driver: "FakeGraphDriver") -> None:
+        self._driver = driver
+
+    def __enter__(self) -> "FakeSession":
+        return self
+
+    def __exit__(self, *exc) -> None:
+        return None
+
+    def run(self, query: Any, parameters: dict | None = None, **kwargs) -> FakeResult:
+        text = str(getattr(query, "text", query))
+        if self._driver.query_latency_seconds:
+            time.sleep(self._driver.query_latency_seconds)
+        if text.lstrip().upper().startswith("EXPLAIN"):
+            return FakeResult([])
+        return FakeResult([FakeRecord(row) for row in self._driver.records])
+
+
+class FakeGraphDriver:
+    """
+    In-process stand-in for the neo4j Driver used by the agent.
+
+    Every read query returns the same sample activities after an optional
+    simulated latency, EXPLAIN returns an empty plan.
+    """
+
+    def __init__(
+        self,
+        records: list[dict] | None = None,
+        query_latency_seconds: float = 0.0,
+        schema: str = FAKE_SCHEMA,
+    ) -> None:
+        self.records = records if records is not None else FAKE_ACTIVITIES
+        self.query_latency_seconds = query_latency_seconds
+        self.schema = schema
+
+    def session(self, **kwargs) -> FakeSession:
+        return FakeSession(self)
+
+    def close(self) -> None:
+        return None
@@ -0,0 +1,63 @@
+"""
+Full-text indexes over activity and organisation texts.
+
+Shared by the graph loader, which creates the indexes, and by the agent's
+search tool, which queries them. Lookups through the index are ranked
+index seeks instead of CONTAINS / =~ scans over every Activity node.
+"""
+
+import re
+
+# Lucene analyzer of the indexes: Czech stop words and stemming
+FULLTEXT_ANALYZER = "czech"
+
+ACTIVITY_TEXT_INDEX = "activity_text"
+ORGANISATION_NAME_INDEX = "organisation_name"
+
+FULLTEXT_INDEXES = {
+    ACTIVITY_TEXT_INDEX: ("Activity", ["name", "shortDescription", "longDescription"]),
+    ORGANISATION_NAME_INDEX: ("Organisation", ["name"]),
+}
+
+# Characters with a meaning in the Lucene query syntax
+LUCENE_SPECIAL = re.compile(r'([+\-!(){}\[\]^"~*?:\\/]|&&|\|\|)')
+
+SEARCH_ACTIVITIES_QUERY = f"""
+CALL db.index.fulltext.queryNodes('{ACTIVITY_TEXT_INDEX}', $query, {{limit: $k}})
+YIELD node, score
+OPTIONAL MATCH (node)-[:ORGANIZED_BY]->(o:Organisation)
+RETURN node.id AS id, node.name AS name, node.shortDescription AS description,
+       node.url AS url, o.name AS organisation, round(score, 3) AS score
+ORDER BY score DESC
+"""
+
+
+def create_index_statement(name: str) -> str:
+    """CREATE FULLTEXT INDEX statement of one of FULLTEXT_INDEXES."""
+    label, properties = FULLTEXT_INDEXES[name]
+    fields = ", ".join(f"n.{prop}" for prop in properties)
+    return (
+        f"CREATE FULLTEXT INDEX {name} IF NOT EXISTS "
+        f"FOR (n:{label}) ON EACH [{fields}] "
+        f"OPTIONS {{indexConfig: {{`fulltext.analyzer`: '{FULLTEXT_ANALYZER}'}}}}"
+    )
+
+
+def escape_lucene(text: str) -> str:
+    """Escape Lucene operators so user text is matched as plain terms."""
+    return LUCENE_SPECIAL.sub(r"\\\1", text)
+
+
+def to_lucene_query(text: str) -> str:
+    """
+    Plain-text search terms as a Lucene query.
+
+    Terms are escaped and combined with OR (the Lucene default), so the
+    ranking rewards activities matching more of the terms. Reserved words
+    (AND, OR, NOT) are lower-cased so they are searched as terms.
+    """
+    terms = [
+        escape_lucene(term.lower() if term in ("AND", "OR", "NOT") else term)
+        for term in text.split()
+    ]
+    return " ".join(terms)
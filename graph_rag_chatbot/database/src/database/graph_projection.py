@@ -0,0 +1,455 @@
+"""
+In-process, read-only projection of the activity graph.
+
+The graph is small and only changes when the loader runs, so the common
+traversals (activity -> location / level / field / skill / type,
+skill -> job, location ancestors) are served from memory instead of
+making Bolt round trips. Nodes get dense integer indices, properties are
+stored column by column and every relationship type is a pair of CSR
+adjacency arrays (outgoing and incoming).
+
+The loader stamps the graph with a version on a GraphMeta node. The
+manager polls it and builds a new projection in a worker thread when it
+changes; readers keep using the old one until the reference is swapped,
+so they never see a half-built projection. Anything the projection does
+not cover still goes to Neo4j.
+
+The first projection can be built from a graph snapshot instead of the
+database; it is kept until the database reports a different version.
+"""
+
+import asyncio
+import time
+import unicodedata
+from array import array
+from typing import Any, Iterable, Sequence
+
+from database.snapshot import read_manifest, read_nodes, read_relationships
+from interfaces.telemetry import stage
+from neo4j import READ_ACCESS, Driver
+from prometheus_client import Gauge
+
+GRAPH_VERSION_QUERY = "MATCH (m:GraphMeta) RETURN m.version AS version LIMIT 1"
+
+SET_GRAPH_VERSION_QUERY = """
+MERGE (m:GraphMeta {id: 1})
+SET m.version = $version, m.loadedAt = datetime()
+"""
+
+# Labels maintained next to the domain graph, never projected
+INTERNAL_LABELS = ["GraphMeta", "FacetCount", "Community"]
+
+# Large properties not needed for traversals, searchName is rebuilt from name
+SKIPPED_PROPERTIES = ["embedding", "embeddingHash", "longDescription", "searchName"]
+
+# Labels looked up by name, the loader stores their folded name as searchName
+# so the Neo4j fallback queries match names like GraphProjection.find
+SEARCH_NAME_LABELS = [
+    "Activity",
+    "Location",
+    "LevelOfStudy",
+    "Field",
+    "Skill",
+    "ActivityType",
+]
+
+NAMED_NODES_QUERY = """
+MATCH (n)
+WHERE n.name IS NOT NULL AND any(label IN labels(n) WHERE label IN $labels)
+RETURN elementId(n) AS eid, n.name AS name
+"""
+
+SET_SEARCH_NAMES_QUERY = """
+UNWIND $rows AS row
+MATCH (n) WHERE elementId(n) = row.eid
+SET n.searchName = row.searchName
+"""
+
+NODES_QUERY = """
+MATCH (n)
+WHERE none(label IN labels(n) WHERE label IN $internal)
+RETURN elementId(n) AS eid, labels(n) AS labels,
+       [key IN keys(n) WHERE NOT key IN $skipped | [key, n[key]]] AS props
+"""
+
+RELATIONSHIPS_QUERY = """
+MATCH (a)-[r]->(b)
+WHERE none(label IN labels(a) WHERE label IN $internal)
+  AND none(label IN labels(b) WHERE label IN $internal)
+RETURN elementId(a) AS source, type(r) AS type, elementId(b) AS target
+"""
+
+PROJECTION_NODES = Gauge(
+    "graph_projection_nodes", "Nodes in the in-memory graph projection."
+)
+PROJECTION_AGE = Gauge(
+    "graph_projection_age_seconds", "Seconds since the graph projection was built."
+)
+
+
+def fold(text: str) -> str:
+    """Lower-case text without diacritics, for name matching."""
+    text = unicodedata.normalize("NFKD", text.lower())
+    return "".join(c for c in text if not unicodedata.combining(c))
+
+
+class CSR:
+    """Compressed sparse row adjacency: neighbours of i are targets[offsets[i]:offsets[i + 1]]."""
+
+    __slots__ = ("offsets", "targets")
+
+    def __init__(self, node_count: int, edges: list[tuple[int, int]]) -> None:
+        counts = [0] * (node_count + 1)
+        for source, _ in edges:
+            counts[source + 1] += 1
+        for i in range(node_count):
+            counts[i + 1] += counts[i]
+        self.offsets = array("I", counts)
+
+        targets = array("I", bytes(4 * len(edges)))
+        fill = list(counts[:-1])
+        for source, target in edges:
+            targets[fill[source]] = target
+            fill[source] += 1
+        self.targets = targets
+
+    def neighbours(self, node: int) -> array:
+        return self.targets[self.offsets[node] : self.offsets[node + 1]]
+
+
+class GraphProjection:
+    """Immutable snapshot of the graph, built once and then only read."""
+
+    def __init__(
+        self,
+        version: str | None,
+        nodes: Iterable[tuple[str, Sequence[str], dict[str, Any]]],
+        relationships: Iterable[tuple[str, str, str]],
+    ) -> None:
+        """
+        Args:
+            version: Graph version the projection was built from
+            nodes: (element id, labels, properties) of every node, a node
+                with several labels is found under each of them
+            relationships: (source element id, type, target element id)
+        """
+        self.version = version
+        self.built_at = time.time()
+
+        index: dict[str, int] = {}
+        self.labels: list[tuple[str, ...]] = []
+        self.columns: dict[str, list[Any]] = {}
+        for eid, labels, props in nodes:
+            i = index[eid] = len(self.labels)
+            self.labels.append(tuple(sorted(labels)))
+            for key, value in props.items():
+                column = self.columns.setdefault(key, [])
+                column.extend([None] * (i - len(column)))
+                column.append(value)
+        self.node_count = len(self.labels)
+        for column in self.columns.values():
+            column.extend([None] * (self.node_count - len(column)))
+
+        self.by_label: dict[str, array] = {}
+        for i, labels in enumerate(self.labels):
+            for label in labels:
+                self.by_label.setdefault(label, array("I")).append(i)
+
+        edges: dict[str, list[tuple[int, int]]] = {}
+        for source, rel_type, target in relationships:
+            if source in index and target in index:
+                edges.setdefault(rel_type, []).append((index[source], index[target]))
+        self.outgoing = {t: CSR(self.node_count, e) for t, e in edges.items()}
+        self.incoming = {
+            t: CSR(self.node_count, [(b, a) for a, b in e]) for t, e in edges.items()
+        }
+
+        names = self.columns.get("name", [None] * self.node_count)
+        self._folded_names = [
+            fold(name) if isinstance(name, str) else "" for name in names
+        ]
+
+    def get(self, node: int, prop: str) -> Any:
+        column = self.columns.get(prop)
+        return column[node] if column is not None else None
+
+    def out(self, rel_type: str, node: int) -> array:
+        csr = self.outgoing.get(rel_type)
+        return csr.neighbours(node) if csr else array("I")
+
+    def into(self, rel_type: str, node: int) -> array:
+        csr = self.incoming.get(rel_type)
+        return csr.neighbours(node) if csr else array("I")
+
+    def find(self, label: str, text: str) -> list[int]:
+        """Nodes of the label whose name (or code) contains the text, ignoring case and diacritics."""
+        needle = fold(text)
+        codes = self.columns.get("code", [])
+        return [
+            i
+            for i in self.by_label.get(label, ())
+            if needle in self._folded_names[i] or (codes and codes[i] == text)
+        ]
+
+    def closure(
+        self, start: Iterable[int], rel_type: str, reverse: bool = False
+    ) -> set[int]:
+        """Start nodes and everything reachable from them over one relationship type."""
+        step = self.into if reverse else self.out
+        seen = set(start)
+        stack = list(seen)
+        while stack:
+            for nxt in step(rel_type, stack.pop()):
+                if nxt not in seen:
+                    seen.add(nxt)
+                    stack.append(nxt)
+        return seen
+
+    def location_ancestors(self, location: int) -> list[int]:
+        """Regions, country and state containing the location, nearest first."""
+        ancestors = []
+        current = self.out("LOCATED_IN", location)
+        while current:
+            ancestors.append(current[0])
+            current = self.out("LOCATED_IN", current[0])
+        return ancestors
+
+    def _activities_via(self, rel_type: str, targets: Iterable[int]) -> set[int]:
+        return {a for t in targets for a in self.into(rel_type, t)}
+
+    def find_activities(
+        self,
+        location: str | None = None,
+        level: str | None = None,
+        field: str | None = None,
+        skill: str | None = None,
+        activity_type: str | None = None,
+    ) -> list[int]:
+        """
+        Activities matching all given filters, by name or code of the target node.
+
+        A location matches its sub-locations (a region matches its cities),
+        an activity type matches its sub-types.
+        """
+        candidates: set[int] | None = None
+
+        def narrow(found: set[int]) -> None:
+            nonlocal candidates
+            candidates = found if candidates is None else candidates & found
+
+        if location:
+            places = self.closure(
+                self.find("Location", location), "LOCATED_IN", reverse=True
+            )
+            narrow(self._activities_via("AVAILABLE_IN", places))
+        if level:
+            narrow(self._activities_via("AIMS_TO", self.find("LevelOfStudy", level)))
+        if field:
+            narrow(self._activities_via("FOCUSES_ON", self.find("Field", field)))
+        if skill:
+            narrow(self._activities_via("REQUIRES", self.find("Skill", skill)))
+        if activity_type:
+            types = self.closure(self.find("ActivityType", activity_type), "PARENT_OF")
+            narrow(self._activities_via("HAS_TYPE", types))
+
+        if candidates is None:
+            candidates = set(self.by_label.get("Activity", ()))
+        return sorted(candidates, key=lambda i: self.get(i, "name") or "")
+
+    def activity_profile(self, activity: int) -> dict[str, Any]:
+        """Name, short description and the names of all directly linked nodes."""
+
+        def names(rel_type: str) -> list[str]:
+            return [self.get(i, "name") for i in self.out(rel_type, activity)]
+
+        regions = {
+            ancestor: None
+            for location in self.out("AVAILABLE_IN", activity)
+            for ancestor in self.location_ancestors(location)
+        }
+
+        return {
+            "name": self.get(activity, "name"),
+            "description": self.get(activity, "shortDescription"),
+            "url": self.get(activity, "url"),
+            "organisation": next(iter(names("ORGANIZED_BY")), None),
+            "locations": names("AVAILABLE_IN"),
+            "regions": [self.get(i, "name") for i in regions],
+            "levels": names("AIMS_TO"),
+            "types": names("HAS_TYPE"),
+            "fields": names("FOCUSES_ON"),
+            "skills": names("REQUIRES"),
+            "formats": names("DELIVERED_AS"),
+            "funding": names("FUNDED_BY"),
+        }
+
+    def jobs_for_skill(self, skill: str) -> list[dict[str, Any]]:
+        """Jobs using a skill, with the skill they were found through."""
+        return [
+            {
+                "skill": self.get(s, "name"),
+                "job": self.get(j, "name"),
+                "averageSalary": self.get(j, "averageSalary"),
+            }
+            for s in self.find("Skill", skill)
+            for j in self.out("USED_IN", s)
+        ]
+
+
+def fetch_graph_version(driver: Driver) -> str | None:
+    with driver.session(database="neo4j", default_access_mode=READ_ACCESS) as session:
+        record = session.run(GRAPH_VERSION_QUERY).single()
+    return record["version"] if record else None
+
+
+def load_projection(driver: Driver, version: str | None) -> GraphProjection:
+    """Read the whole graph (without internal nodes and large properties) into a projection."""
+    params = {"internal": INTERNAL_LABELS, "skipped": SKIPPED_PROPERTIES}
+    with driver.session(database="neo4j", default_access_mode=READ_ACCESS) as session:
+        nodes = [
+            (r["eid"], r["labels"], dict(r["props"]))
+            for r in session.run(NODES_QUERY, params)
+        ]
+        relationships = [
+            (r["source"], r["type"], r["target"])
+            for r in session.run(RELATIONSHIPS_QUERY, params)
+        ]
+    return GraphProjection(version, nodes, relationships)
+
+
+def load_snapshot_projection(path: str) -> GraphProjection:
+    """Build a projection from a snapshot directory, without touching the database."""
+    manifest = read_manifest(path)
+    nodes = [
+        (
+            str(sid),
+            labels,
+            {k: v for k, v in props.items() if k not in SKIPPED_PROPERTIES},
+        )
+        for labels, sids, group in read_nodes(path, manifest)
+        if labels and not set(labels) & set(INTERNAL_LABELS)
+        for sid, props in zip(sids, group, strict=True)
+    ]
+    relationships = [
+        (str(source), rel_type, str(target))
+        for rel_type, sources, targets, _ in read_relationships(path, manifest)
+        for source, target in zip(sources, targets, strict=True)
+    ]
+    return GraphProjection(manifest["graphVersion"], nodes, relationships)
+
+
+class GraphProjectionManager:
+    """Keeps the current projection in sync with the graph version."""
+
+    def __init__(
+        self,
+        driver: Driver,
+        refresh_interval_seconds: float,
+        snapshot_path: str | None = None,
+    ) -> None:
+        self.driver = driver
+        self.refresh_interval_seconds = refresh_interval_seconds
+        self.snapshot_path = snapshot_path
+        # Replaced as a whole, a plain attribute read is the atomic swap
+        self.current: GraphProjection | None = None
+        PROJECTION_AGE.set_function(
+            lambda: time.time() - self.current.built_at if self.current else 0.0
+        )
+
+    def _swap(self, projection: GraphProjection, source: str) -> None:
+        self.current = projection
+        PROJECTION_NODES.set(projection.node_count)
+        print(
+            f"Graph projection loaded from {source}: "
+            f"version {projection.version}, {projection.node_count} nodes"
+        )
+
+    async def load_snapshot(self) -> None:
+        """Serve the snapshot until the database reports another version."""
+        with stage("graph_projection_load", source="snapshot"):
+            projection = await asyncio.to_thread(
+                load_snapshot_projection, self.snapshot_path
+            )
+        self._swap(projection, "snapshot")
+
+    async def refresh(self) -> bool:
+        """Rebuild the projection if the graph version changed, True if swapped."""
+        version = await asyncio.to_thread(fetch_graph_version, self.driver)
+        if self.current is not None and version == self.current.version:
+            return False
+        with stage("graph_projection_load"):
+            projection = await asyncio.to_thread(load_projection, self.driver, version)
+        self._swap(projection, "database")
+        return True
+
+    async def run(self) -> None:
+        """Refresh loop, run as a background task for the lifetime of the app."""
+        if self.snapshot_path:
+            try:
+                await self.load_snapshot()
+            except (OSError, ValueError, KeyError) as e:
+                print(f"Graph snapshot {self.snapshot_path} not loaded: {e}")
+        while True:
+            try:
+                await self.refresh()
+            except Exception as e:  # noqa: BLE001
+                # Keep serving the previous projection, tools fall back to Neo4j without one
+                # and the loop must outlive any failure
+                print(f"Graph projection refresh failed: {e}")
+            await asyncio.sleep(self.refresh_interval_seconds)
+
+
+# Neo4j equivalents of the projection lookups, used until a projection is loaded.
+# Name parameters must be folded with fold(), graphs loaded before searchName
+# was stored fall back to the lower-cased name.
+FIND_ACTIVITIES_QUERY = """
+MATCH (a:Activity)
+WHERE ($location IS NULL OR EXISTS {
+        MATCH (a)-[:AVAILABLE_IN]->(:Location)-[:LOCATED_IN*0..3]->(l:Location)
+        WHERE coalesce(l.searchName, toLower(l.name)) CONTAINS $location
+    })
+  AND ($level IS NULL OR EXISTS {
+        MATCH (a)-[:AIMS_TO]->(lv:LevelOfStudy)
+        WHERE coalesce(lv.searchName, toLower(lv.name)) CONTAINS $level OR lv.code = $level
+    })
+  AND ($field IS NULL OR EXISTS {
+        MATCH (a)-[:FOCUSES_ON]->(f:Field)
+        WHERE coalesce(f.searchName, toLower(f.name)) CONTAINS $field
+    })
+  AND ($skill IS NULL OR EXISTS {
+        MATCH (a)-[:REQUIRES]->(s:Skill)
+        WHERE coalesce(s.searchName, toLower(s.name)) CONTAINS $skill
+    })
+  AND ($activity_type IS NULL OR EXISTS {
+        MATCH (a)-[:HAS_TYPE]->(:ActivityType)<-[:PARENT_OF*0..3]-(t:ActivityType)
+        WHERE coalesce(t.searchName, toLower(t.name)) CONTAINS $activity_type
+    })
+RETURN a.name AS name, a.shortDescription AS description, a.url AS url
+ORDER BY name
+LIMIT $k
+"""
+
+ACTIVITY_DETAILS_QUERY = """
+MATCH (a:Activity)
+WHERE coalesce(a.searchName, toLower(a.name)) CONTAINS $name
+RETURN a.name AS name, a.shortDescription AS description, a.url AS url,
+       [(a)-[:ORGANIZED_BY]->(o) | o.name][0] AS organisation,
+       [(a)-[:AVAILABLE_IN]->(n) | n.name] AS locations,
+       COLLECT {
+           MATCH (a)-[:AVAILABLE_IN]->()-[:LOCATED_IN*]->(n) RETURN DISTINCT n.name
+       } AS regions,
+       [(a)-[:AIMS_TO]->(n) | n.name] AS levels,
+       [(a)-[:HAS_TYPE]->(n) | n.name] AS types,
+       [(a)-[:FOCUSES_ON]->(n) | n.name] AS fields,
+       [(a)-[:REQUIRES]->(n) | n.name] AS skills,
+       [(a)-[:DELIVERED_AS]->(n) | n.name] AS formats,
+       [(a)-[:FUNDED_BY]->(n) | n.name] AS funding
+ORDER BY name
+LIMIT $k
+"""
+
+JOBS_FOR_SKILL_QUERY = """
+MATCH (s:Skill)-[:USED_IN]->(j:Job)
+WHERE coalesce(s.searchName, toLower(s.name)) CONTAINS $skill
+RETURN s.name AS skill, j.name AS job, j.averageSalary AS averageSalary
+"""
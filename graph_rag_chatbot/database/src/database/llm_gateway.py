@@ -0,0 +1,215 @@
+import asyncio
+import heapq
+import itertools
+import random
+import time
+from contextlib import asynccontextmanager
+from contextvars import ContextVar
+from typing import Any, Awaitable, Callable, TypeVar
+
+from interfaces.telemetry import STAGE_SECONDS
+from prometheus_client import Counter, Gauge
+
+T = TypeVar("T")
+
+# Lower value is served first
+# Agent routing and Cypher generation, the user waits for first token
+PRIORITY_SHORT = 0
+PRIORITY_ANSWER = 1  # Long answer generation
+
+# Deadline (time.monotonic) of the chat request currently being processed
+request_deadline: ContextVar[float | None] = ContextVar(
+    "request_deadline", default=None
+)
+
+LLM_IN_FLIGHT = Gauge("llm_gateway_in_flight", "LLM calls currently running.")
+LLM_QUEUE_DEPTH = Gauge("llm_gateway_queue_depth", "LLM calls waiting for a slot.")
+LLM_SHED = Counter("llm_gateway_shed_total", "LLM calls shed before their deadline.")
+LLM_RETRIES = Counter("llm_gateway_retries_total", "Retried LLM calls.")
+
+RETRYABLE_STATUS_CODES = {429, 500, 502, 503, 504}
+RETRYABLE_ERRORS = {"RateLimitError", "APITimeoutError", "APIConnectionError"}
+
+
+class LLMGatewayOverloaded(Exception):
+    """Raised when a call cannot be served before its deadline."""
+
+
+def is_retryable(error: Exception) -> bool:
+    """Rate limits, timeouts and upstream 5xx are worth retrying."""
+    if getattr(error, "status_code", None) in RETRYABLE_STATUS_CODES:
+        return True
+    return type(error).__name__ in RETRYABLE_ERRORS
+
+
+class LLMGateway:
+    """
+    Concurrency limiter for outbound LLM calls.
+
+    At most max_in_flight calls run at once, the rest wait in a priority
+    queue (FIFO within the same priority). Calls that would not get a slot
+    before their deadline are shed early instead of piling up upstream.
+    Retryable errors are retried with full-jitter exponential backoff.
+    """
+
+    def __init__(
+        self,
+        max_in_flight: int,
+        max_retries: int,
+        backoff_base_seconds: float,
+        backoff_max_seconds: float,
+    ) -> None:
+        self.max_in_flight = max_in_flight
+        self.max_retries = max_retries
+        self.backoff_base_seconds = backoff_base_seconds
+        self.backoff_max_seconds = backoff_max_seconds
+
+        self._in_flight = 0
+        self._queue: list[tuple[int, int, asyncio.Future]] = []
+        self._sequence = itertools.count()
+
+        # Metrics
+        self._avg_call_seconds = 1.0  # Moving average used to predict the wait
+        self._wait_seconds_total = 0.0
+        self._wait_seconds_max = 0.0
+        self._acquired = 0
+        self._shed = 0
+        self._retries = 0
+
+        LLM_IN_FLIGHT.set_function(lambda: self._in_flight)
+        LLM_QUEUE_DEPTH.set_function(lambda: self.queue_depth)
+
+    @property
+    def queue_depth(self) -> int:
+        return sum(1 for _, _, waiter in self._queue if not waiter.done())
+
+    def _expected_wait(self) -> float:
+        if self._in_flight < self.max_in_flight:
+            return 0.0
+        return (self.queue_depth + 1) / self.max_in_flight * self._avg_call_seconds
+
+    def _shed_call(self, reason: str) -> LLMGatewayOverloaded:
+        self._shed += 1
+        LLM_SHED.inc()
+        return LLMGatewayOverloaded(reason)
+
+    async def _acquire(self, priority: int, deadline: float | None) -> None:
+        now = time.monotonic()
+        if deadline is not None and now + self._expected_wait() > deadline:
+            raise self._shed_call("LLM capacity exhausted, request would time out.")
+
+        if self._in_flight < self.max_in_flight and not self.queue_depth:
+            self._in_flight += 1
+            self._record_wait(0.0)
+            return
+
+        waiter = asyncio.get_running_loop().create_future()
+        heapq.heappush(self._queue, (priority, next(self._sequence), waiter))
+        timeout = None if deadline is None else max(0.0, deadline - now)
+        try:
+            await asyncio.wait_for(asyncio.shield(waiter), timeout)
+        except TimeoutError:
+            if waiter.done():
+                # Slot was handed over just as the deadline hit
+                self._release()
+            waiter.cancel()
+            raise self._shed_call("Timed out waiting for an LLM slot.") from None
+        except asyncio.CancelledError:
+            if waiter.done() and not waiter.cancelled():
+                self._release()
+            waiter.cancel()
+            raise
+        self._record_wait(time.monotonic() - now)
+
+    def _record_wait(self, waited: float) -> None:
+        self._acquired += 1
+        self._wait_seconds_total += waited
+        self._wait_seconds_max = max(self._wait_seconds_max, waited)
+        STAGE_SECONDS.labels("database", "llm_queue_wait").observe(waited)
+
+    def _release(self) -> None:
+        self._in_flight -= 1
+        while self._queue:
+            _, _, waiter = heapq.heappop(self._queue)
+            if not waiter.done():
+                self._in_flight += 1
+                waiter.set_result(None)
+                return
+
+    @asynccontextmanager
+    async def slot(self, priority: int = PRIORITY_SHORT, deadline: float | None = None):
+        """
+        Hold one of the in-flight slots for the duration of the block.
+
+        Args:
+            priority: PRIORITY_SHORT or PRIORITY_ANSWER
+            deadline: time.monotonic() deadline, defaults to the request deadline
+
+        Raises:
+            LLMGatewayOverloaded: If no slot is available before the deadline
+        """
+        if deadline is None:
+            deadline = request_deadline.get()
+        await self._acquire(priority, deadline)
+        started = time.monotonic()
+        try:
+            yield
+        finally:
+            elapsed = time.monotonic() - started
+            self._avg_call_seconds = 0.9 * self._avg_call_seconds + 0.1 * elapsed
+            self._release()
+
+    async def call(
+        self,
+        fn: Callable[[], Awaitable[T]],
+        priority: int = PRIORITY_SHORT,
+        started: Callable[[], bool] | None = None,
+    ) -> T:
+        """
+        Run an LLM call through the gateway, retrying retryable errors.
+
+        Args:
+            fn: Factory returning a fresh awaitable for every attempt
+            priority: PRIORITY_SHORT or PRIORITY_ANSWER
+            started: Returns True once the call has streamed output to the
+                client, a failure after that is raised instead of retried
+                so the output is not repeated
+
+        Returns:
+            The result of the call
+        """
+        for attempt in itertools.count():
+            try:
+                async with self.slot(priority):
+                    return await fn()
+            except Exception as e:
+                if (
+                    attempt >= self.max_retries
+                    or not is_retryable(e)
+                    or (started is not None and started())
+                ):
+                    raise
+            self._retries += 1
+            LLM_RETRIES.inc()
+            backoff = min(
+                self.backoff_max_seconds, self.backoff_base_seconds * 2**attempt
+            )
+            delay = random.uniform(0, backoff)
+            deadline = request_deadline.get()
+            if deadline is not None and time.monotonic() + delay > deadline:
+                raise self._shed_call("Upstream LLM is rate limiting, giving up.")
+            await asyncio.sleep(delay)
+
+    def stats(self) -> dict[str, Any]:
+        """Current queue state and counters."""
+        return {
+            "max_in_flight": self.max_in_flight,
+            "in_flight": self._in_flight,
+            "queue_depth": self.queue_depth,
+            "acquired_total": self._acquired,
+            "shed_total": self._shed,
+            "retries_total": self._retries,
+            "wait_seconds_avg": self._wait_seconds_total / max(1, self._acquired),
+            "wait_seconds_max": self._wait_seconds_max,
+            "call_seconds_avg": self._avg_call_seconds,
+        }
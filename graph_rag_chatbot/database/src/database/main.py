@@ -1,18 +1,79 @@
-import os
+import asyncio
 from contextlib import asynccontextmanager
 
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
-from langchain_openai import AzureChatOpenAI
-from pydantic import SecretStr
+from interfaces.telemetry import TracingMiddleware, setup_tracing
 from dotenv import load_dotenv
-from neo4j import GraphDatabase
 
 
-from database.config import get_settings
+from database.config import Settings, get_settings
 from database.routes import router
 
 
+def build_services(settings: Settings) -> dict:
+    """
+    Import the heavy modules (LangChain, neo4j, embeddings) and create the
+    driver, LLM, gateway and agent. Runs in a worker thread so the server
+    answers /health while this is in progress.
+    """
+    from database.cypher_agent.agent_langchain import get_agent
+    from database.graph_projection import GraphProjectionManager
+    from database.llm_gateway import LLMGateway
+    from database.providers import create_driver, create_llm, create_vector_embedder
+
+    # Create connections to database and LLM
+    print(f"LLM provider: {settings.llm_provider}, graph: {settings.graph_provider}")
+    services = {
+        "driver": create_driver(settings),
+        "llm": create_llm(settings),
+        "embedder": create_vector_embedder(settings),
+        "projection": None,
+    }
+
+    if settings.graph_projection_enabled and settings.graph_provider == "neo4j":
+        services["projection"] = GraphProjectionManager(
+            services["driver"],
+            settings.graph_projection_refresh_seconds,
+            snapshot_path=settings.graph_snapshot_path,
+        )
+
+    services["llm_gateway"] = LLMGateway(
+        max_in_flight=settings.llm_max_in_flight,
+        max_retries=settings.llm_max_retries,
+        backoff_base_seconds=settings.llm_backoff_base_seconds,
+        backoff_max_seconds=settings.llm_backoff_max_seconds,
+    )
+    services["agent"] = get_agent(
+        services["llm"],
+        services["driver"],
+        services["llm_gateway"],
+        embedder=services["embedder"],
+        projection=services["projection"],
+    )
+    return services
+
+
+async def initialize(app: FastAPI, settings: Settings) -> None:
+    """Background startup, /ready reports 503 until the agent is set."""
+    try:
+        services = await asyncio.to_thread(build_services, settings)
+    except Exception as e:  # noqa: BLE001
+        # Any startup failure is reported by /ready instead of crashing the app
+        print(f"Startup failed: {e}")
+        app.state.startup_error = str(e)
+        return
+
+    # The agent is set last, it marks the service as ready
+    for name in ["driver", "llm", "embedder", "projection", "llm_gateway", "agent"]:
+        setattr(app.state, name, services[name])
+    print("Agent ready")
+
+    # Loaded in the background, tools use Neo4j until the first projection is ready
+    if services["projection"] is not None:
+        await services["projection"].run()
+
+
 @asynccontextmanager
 async def lifespan(app: FastAPI):
     """
@@ -25,36 +86,25 @@ async def lifespan(app: FastAPI):
 
     load_dotenv()
 
-    # Create connections to database and LLM
-    app.state.driver = GraphDatabase.driver(
-        os.getenv("GRAPH_DATABASE_URI", "bolt://localhost:7687"),
-        auth=(
-            os.getenv("GRAPH_DATABASE_USERNAME", ""),
-            os.getenv("GRAPH_DATABASE_PASSWORD", ""),
-        ),
-    )
-
-    app.state.llm = AzureChatOpenAI(
-        openai_api_type="azure",
-        azure_endpoint=os.getenv("API_BASE_URL"),
-        api_version="2024-10-21",
-        api_key=SecretStr(secret_value=os.getenv("API_KEY", "")),
-        azure_deployment="gpt-5-chat-2025-08-07",
-        streaming=True,
-    )
+    app.state.driver = None
+    app.state.agent = None
+    app.state.startup_error = None
+    startup_task = asyncio.create_task(initialize(app, settings))
 
     yield
 
     # Shutdown
     print("Shutting down...")
-    # Shutdown - close connections
-    if hasattr(app.state.graph, "close"):
-        app.state.graph.close()
+    # Shutdown - stop the startup or projection task and close connections
+    startup_task.cancel()
+    if app.state.driver is not None:
+        app.state.driver.close()
 
 
 def create_app() -> FastAPI:
     """Create and configure the FastAPI application."""
     settings = get_settings()
+    setup_tracing("database", settings.tracing_exporter, settings.otlp_endpoint)
 
     app = FastAPI(
         title=settings.api_title,
@@ -72,6 +122,9 @@ def create_app() -> FastAPI:
         allow_headers=["*"],
     )
 
+    # Server span per request, continued from the caller's traceparent
+    app.add_middleware(TracingMiddleware)
+
     # Include routes
     app.include_router(router)
 
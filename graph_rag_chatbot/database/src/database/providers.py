@@ -0,0 +1,129 @@
+import asyncio
+import importlib.util
+import os
+import time
+
+from database.config import Settings
+from database.embeddings import Embedder, create_embedder
+from database.fakes import FakeChatModel, FakeGraphDriver
+from database.graph_projection import INTERNAL_LABELS
+from database.snapshot import IMPORT_LABEL
+from langchain_core.language_models.chat_models import BaseChatModel
+from neo4j import Driver, GraphDatabase
+from neo4j_graphrag.schema import get_structured_schema
+from pydantic import SecretStr
+
+# Not useful for generated Cypher, left out of the prompt
+SCHEMA_SKIPPED_PROPERTIES = {"embedding", "embeddingHash", "searchName"}
+
+
+def create_llm(settings: Settings) -> BaseChatModel:
+    """Create the chat model selected by settings.llm_provider."""
+    if settings.llm_provider == "fake":
+        return FakeChatModel(
+            first_token_delay_seconds=settings.fake_llm_first_token_delay_seconds,
+            tokens_per_second=settings.fake_llm_tokens_per_second,
+            cypher=settings.fake_llm_cypher,
+        )
+
+    # Imported here so the fake provider works without the Azure client installed
+    from langchain_openai import AzureChatOpenAI
+
+    return AzureChatOpenAI(
+        openai_api_type="azure",
+        azure_endpoint=os.getenv("API_BASE_URL"),
+        api_version="2024-10-21",
+        api_key=SecretStr(secret_value=os.getenv("API_KEY", "")),
+        azure_deployment="gpt-5-chat-2025-08-07",
+        streaming=True,
+        max_retries=0,  # Retries are handled by the LLM gateway
+    )
+
+
+def create_driver(settings: Settings) -> Driver | FakeGraphDriver:
+    """Create the graph driver selected by settings.graph_provider."""
+    if settings.graph_provider == "fake":
+        return FakeGraphDriver(
+            query_latency_seconds=settings.fake_graph_query_latency_seconds
+        )
+
+    return GraphDatabase.driver(
+        os.getenv("GRAPH_DATABASE_URI", "bolt://localhost:7687"),
+        auth=(
+            os.getenv("GRAPH_DATABASE_USERNAME", ""),
+            os.getenv("GRAPH_DATABASE_PASSWORD", ""),
+        ),
+    )
+
+
+def compact_schema(structured: dict) -> str:
+    """One line per label and relationship, without internal labels and vectors."""
+    hidden = {*INTERNAL_LABELS, IMPORT_LABEL}
+    lines = ["Node properties:"]
+    for label, props in sorted(structured["node_props"].items()):
+        if label in hidden:
+            continue
+        fields = ", ".join(
+            f"{p['property']}: {p['type']}"
+            for p in props
+            if p["property"] not in SCHEMA_SKIPPED_PROPERTIES
+        )
+        lines.append(f"{label} {{{fields}}}")
+    lines.append("The relationships:")
+    relationships = {
+        (r["start"], r["type"], r["end"])
+        for r in structured["relationships"]
+        if r["start"] not in hidden and r["end"] not in hidden
+    }
+    for start, rel_type, end in sorted(relationships):
+        lines.append(f"(:{start})-[:{rel_type}]->(:{end})")
+    return "\n".join(lines)
+
+
+def fetch_schema(driver: Driver | FakeGraphDriver) -> str:
+    """Database schema as compact text, for the Cypher generation prompt."""
+    if isinstance(driver, FakeGraphDriver):
+        return driver.schema
+    return compact_schema(get_structured_schema(driver))
+
+
+class SchemaCache:
+    """
+    Schema text fetched once and reused for ttl_seconds.
+
+    The same text for every request keeps the Cypher generation prompt
+    prefix byte-identical between requests.
+    """
+
+    def __init__(self, driver: Driver | FakeGraphDriver, ttl_seconds: float) -> None:
+        self.driver = driver
+        self.ttl_seconds = ttl_seconds
+        self._schema: str | None = None
+        self._fetched_at = 0.0
+        self._lock = asyncio.Lock()
+
+    async def get(self) -> str:
+        async with self._lock:
+            if (
+                self._schema is None
+                or time.monotonic() - self._fetched_at > self.ttl_seconds
+            ):
+                self._schema = await asyncio.to_thread(fetch_schema, self.driver)
+                self._fetched_at = time.monotonic()
+            return self._schema
+
+
+def create_vector_embedder(settings: Settings) -> Embedder | None:
+    """Embedder for vector search, None disables the vector search tool."""
+    if settings.graph_provider == "fake":
+        # No model download for offline runs
+        return create_embedder("hashing")
+    if settings.embedding_provider == "sentence_transformers" and (
+        importlib.util.find_spec("sentence_transformers") is None
+    ):
+        print(
+            "sentence-transformers not installed, vector search disabled. "
+            "Install the database[embeddings] extra to enable it."
+        )
+        return None
+    return create_embedder(settings.embedding_provider, settings.embedding_model)
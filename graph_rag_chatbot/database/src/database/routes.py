@@ -1,58 +1,113 @@
-import json
-from typing import AsyncGenerator
+import time
+from contextlib import aclosing
+from typing import TYPE_CHECKING, AsyncGenerator
 
-from database.dependencies import get_llm, get_graph
+from database.auth import verify_api_key
+from database.config import get_settings
+from database.dependencies import get_cypher_agent, get_llm_gateway
+from database.llm_gateway import LLMGatewayOverloaded, request_deadline
 from fastapi import APIRouter, Depends, Request
-from fastapi.responses import StreamingResponse
-from langchain_neo4j import GraphCypherQAChain
+from fastapi.responses import JSONResponse, Response, StreamingResponse
 
-from interfaces.models import DatabaseChatRequest, StreamChunk
+from interfaces.models import (
+    ChatMessage,
+    DatabaseChatRequest,
+    MessageRole,
+    StreamChunk,
+)
+from interfaces.api_keys import ApiKeyInfo
+from interfaces.codec import DONE_EVENT, encode_sse
 from interfaces.endpoints import APIEndpoints
+from interfaces.streaming import coalesce_chunks
+from interfaces.telemetry import metrics_payload, stage
+
+# LangChain and the agent are imported on first use, not at server start
+if TYPE_CHECKING:
+    from langchain_core.messages import BaseMessage
 
 router = APIRouter()
 
 
+def to_langchain_messages(messages: list[ChatMessage]) -> list["BaseMessage"]:
+    """Convert shared chat messages to LangChain messages for the agent."""
+    from langchain_core.messages import AIMessage, HumanMessage
+
+    converted: list[BaseMessage] = []
+    for message in messages:
+        if message.role == MessageRole.USER:
+            converted.append(HumanMessage(content=message.content))
+        elif message.role == MessageRole.ASSISTANT:
+            converted.append(AIMessage(content=message.content))
+    return converted
+
+
 async def generate_stream_response(
-    msg: DatabaseChatRequest, graph, llm
-) -> AsyncGenerator[str, None]:
+    msg: DatabaseChatRequest, agent, request: Request
+) -> AsyncGenerator[bytes, None]:
     """
-    Generate streaming response chunks.
-    This is a placeholder - will be replaced with actual database/LLM call.
+    Generate streaming response chunks from the Cypher agent.
+    Answer tokens are sent as soon as the QA step starts,
+    tool progress is sent as status-only chunks.
+    Closing the stream (e.g. on client disconnect) cancels the agent run
+    together with its in-flight LLM calls.
     """
-    chain = GraphCypherQAChain.from_llm(
-        llm=llm,
-        graph=graph,
-        allow_dangerous_requests=True,
-        verbose=True,  # Enable verbose mode to see the generated query
-    )
-    chain = llm
+    from database.cypher_agent.agent_langchain import astream_answer
+
+    settings = get_settings()
+    messages = to_langchain_messages([*msg.history, msg.query])
+    request_deadline.set(time.monotonic() + settings.llm_request_deadline_seconds)
 
-    # Use astream() for streaming responses instead of ainvoke()
-    response_stream = chain.astream(msg.query.content)  # testing purposes
+    async def agent_chunks() -> AsyncGenerator[StreamChunk, None]:
+        async with aclosing(astream_answer(agent, messages)) as events:
+            async for event in events:
+                yield StreamChunk(content=event.content, status=event.status)
 
-    async for chunk in response_stream:
-        print("Generated chunk:", chunk)
-        stream_chunk = StreamChunk(content=chunk.content, done=False)
-        yield f"data: {json.dumps(stream_chunk.model_dump())}\n\n"
+    try:
+        with stage("agent"):
+            # Tokens are batched to cut SSE events, JSON encoding and syscalls
+            stream = coalesce_chunks(
+                agent_chunks(),
+                max_bytes=settings.stream_flush_bytes,
+                max_delay_seconds=settings.stream_flush_interval_seconds,
+            )
+            async with aclosing(stream):
+                async for stream_chunk in stream:
+                    if await request.is_disconnected():
+                        print("Client disconnected, cancelling agent run")
+                        return
+                    yield encode_sse(stream_chunk)
+    except LLMGatewayOverloaded as e:
+        print("Shedding chat request:", e)
+        error_chunk = StreamChunk(
+            content="",
+            done=True,
+            error="Služba je momentálně přetížená, zkuste to prosím za chvíli.",
+        )
+        yield encode_sse(error_chunk)
+        return
+    except Exception as e:  # noqa: BLE001
+        # The stream has already started, any failure goes to the client as a chunk
+        error_chunk = StreamChunk(content="", done=True, error=str(e))
+        yield encode_sse(error_chunk)
+        return
 
     # Send final chunk
-    final_chunk = StreamChunk(content="", done=True)
-    yield f"data: {json.dumps(final_chunk.model_dump())}\n\n"
+    yield DONE_EVENT
 
 
 @router.post(APIEndpoints.DATABASE_CHAT_STREAM)
 async def chat_stream(
     request: Request,
     database_request: DatabaseChatRequest,
-    graph=Depends(get_graph),
-    llm=Depends(get_llm),
+    agent=Depends(get_cypher_agent),
+    api_key: ApiKeyInfo = Depends(verify_api_key),
 ) -> StreamingResponse:
     """
     Handle streaming chat requests.
     """
     print("Received database chat stream request:", database_request)
     return StreamingResponse(
-        generate_stream_response(database_request, graph, llm),
+        generate_stream_response(database_request, agent, request),
         media_type="text/event-stream",
         headers={
             "Cache-Control": "no-cache",
@@ -61,7 +116,33 @@ async def chat_stream(
     )
 
 
+@router.get("/metrics/llm")
+async def llm_metrics(gateway=Depends(get_llm_gateway)) -> dict:
+    """Queue depth, wait times and counters of the LLM gateway."""
+    return gateway.stats()
+
+
+@router.get("/metrics")
+async def metrics() -> Response:
+    """Prometheus metrics endpoint - no auth required."""
+    payload, content_type = metrics_payload()
+    return Response(content=payload, media_type=content_type)
+
+
 @router.get("/health")
 async def health_check() -> dict:
     """Health check endpoint - no auth required."""
     return {"status": "healthy"}
+
+
+@router.get("/ready")
+async def readiness_check(request: Request) -> JSONResponse:
+    """Readiness endpoint - 503 until the agent and connections are initialized."""
+    state = request.app.state
+    if getattr(state, "agent", None) is not None:
+        return JSONResponse({"status": "ready"})
+    error = getattr(state, "startup_error", None)
+    return JSONResponse(
+        {"status": "failed" if error else "starting", "error": error},
+        status_code=503,
+    )
@@ -0,0 +1,268 @@
+"""
+Graph snapshots for fast environment bring-up.
+
+A snapshot is a directory with one gzipped columnar JSON file per node
+label set and per relationship type, plus a manifest:
+
+    manifest.json
+    nodes/Activity.json.gz         {"sid": [...], "columns": {"name": [...], ...}}
+    relationships/REQUIRES.json.gz {"source": [...], "target": [...], "columns": {...}}
+
+Nodes get dense snapshot ids (sid) in export order, relationships refer to
+them. Import creates nodes in large UNWIND batches with a temporary
+_Snapshot label and _sid property, matches relationship endpoints through
+an index on it and removes both at the end. The in-memory graph projection
+can be built straight from a snapshot, without reading the database.
+"""
+
+import gzip
+import hashlib
+import json
+import time
+from datetime import UTC, datetime
+from pathlib import Path
+from typing import Any, Iterator
+
+from neo4j.exceptions import Neo4jError
+
+SNAPSHOT_FORMAT = 1
+
+MANIFEST_FILE = "manifest.json"
+
+EXPORT_NODES_QUERY = """
+MATCH (n)
+RETURN elementId(n) AS eid, labels(n) AS labels, properties(n) AS props
+"""
+
+EXPORT_RELATIONSHIPS_QUERY = """
+MATCH (a)-[r]->(b)
+RETURN elementId(a) AS source, type(r) AS type, elementId(b) AS target,
+       properties(r) AS props
+"""
+
+# Temporary label and property used to match relationship endpoints on import
+IMPORT_LABEL = "_Snapshot"
+IMPORT_INDEXES = [
+    f"CREATE INDEX snapshot_sid IF NOT EXISTS FOR (n:{IMPORT_LABEL}) ON (n._sid)",
+    f"CREATE INDEX ON :{IMPORT_LABEL}(_sid)",  # Memgraph syntax
+]
+DROP_IMPORT_INDEXES = [
+    "DROP INDEX snapshot_sid IF EXISTS",
+    f"DROP INDEX ON :{IMPORT_LABEL}(_sid)",
+]
+
+CLEANUP_QUERY = f"""
+MATCH (n:{IMPORT_LABEL})
+WITH n LIMIT $batch
+REMOVE n:{IMPORT_LABEL}, n._sid
+RETURN count(n) AS count
+"""
+
+
+def _quote(name: str) -> str:
+    return "`" + name.replace("`", "``") + "`"
+
+
+def _plain(value: Any) -> Any:
+    """Temporal and spatial values are stored as their string form."""
+    if isinstance(value, (str, int, float, bool)) or value is None:
+        return value
+    if isinstance(value, (list, tuple)):
+        return [_plain(v) for v in value]
+    return str(value)
+
+
+def _to_columns(rows: list[dict[str, Any]]) -> dict[str, list[Any]]:
+    columns: dict[str, list[Any]] = {}
+    for i, row in enumerate(rows):
+        for key, value in row.items():
+            column = columns.setdefault(key, [None] * len(rows))
+            column[i] = _plain(value)
+    return columns
+
+
+def _from_columns(columns: dict[str, list[Any]], size: int) -> list[dict[str, Any]]:
+    rows: list[dict[str, Any]] = [{} for _ in range(size)]
+    for key, column in columns.items():
+        for row, value in zip(rows, column, strict=True):
+            if value is not None:
+                row[key] = value
+    return rows
+
+
+def _write_file(path: Path, data: dict) -> str:
+    path.parent.mkdir(parents=True, exist_ok=True)
+    payload = json.dumps(data, ensure_ascii=False, separators=(",", ":")).encode()
+    with gzip.open(path, "wb", compresslevel=6) as f:
+        f.write(payload)
+    return hashlib.sha256(payload).hexdigest()
+
+
+def _read_file(path: Path) -> dict:
+    with gzip.open(path, "rb") as f:
+        return json.loads(f.read())
+
+
+def read_manifest(path: str | Path) -> dict:
+    with open(Path(path) / MANIFEST_FILE, encoding="utf-8") as f:
+        manifest = json.load(f)
+    if manifest.get("format") != SNAPSHOT_FORMAT:
+        raise ValueError(f"Unsupported snapshot format {manifest.get('format')}")
+    return manifest
+
+
+def export_snapshot(driver, path: str | Path, version: str | None) -> dict:
+    """
+    Dump the whole graph to a snapshot directory.
+
+    Args:
+        driver: Neo4j driver
+        path: Snapshot directory, created if missing
+        version: Graph version recorded in the manifest
+
+    Returns:
+        The written manifest
+    """
+    path = Path(path)
+    started = time.perf_counter()
+
+    sids: dict[str, int] = {}
+    node_groups: dict[tuple[str, ...], tuple[list[int], list[dict]]] = {}
+    rel_groups: dict[str, tuple[list[int], list[int], list[dict]]] = {}
+    with driver.session() as session:
+        for record in session.run(EXPORT_NODES_QUERY):
+            sid = sids[record["eid"]] = len(sids)
+            group = node_groups.setdefault(tuple(sorted(record["labels"])), ([], []))
+            group[0].append(sid)
+            group[1].append(dict(record["props"]))
+        for record in session.run(EXPORT_RELATIONSHIPS_QUERY):
+            group = rel_groups.setdefault(record["type"], ([], [], []))
+            group[0].append(sids[record["source"]])
+            group[1].append(sids[record["target"]])
+            group[2].append(dict(record["props"]))
+
+    files = {}
+    nodes = []
+    for labels, (group_sids, props) in node_groups.items():
+        name = f"nodes/{'_'.join(labels) or 'unlabelled'}.json.gz"
+        files[name] = _write_file(
+            path / name, {"sid": group_sids, "columns": _to_columns(props)}
+        )
+        nodes.append({"file": name, "labels": list(labels), "count": len(group_sids)})
+
+    relationships = []
+    for rel_type, (sources, targets, props) in rel_groups.items():
+        name = f"relationships/{rel_type}.json.gz"
+        files[name] = _write_file(
+            path / name,
+            {"source": sources, "target": targets, "columns": _to_columns(props)},
+        )
+        relationships.append({"file": name, "type": rel_type, "count": len(sources)})
+
+    manifest = {
+        "format": SNAPSHOT_FORMAT,
+        "graphVersion": version,
+        "createdAt": datetime.now(UTC).isoformat(),
+        "exportSeconds": round(time.perf_counter() - started, 3),
+        "nodeCount": len(sids),
+        "relationshipCount": sum(r["count"] for r in relationships),
+        "nodes": nodes,
+        "relationships": relationships,
+        "sha256": files,
+    }
+    with open(path / MANIFEST_FILE, "w", encoding="utf-8") as f:
+        json.dump(manifest, f, ensure_ascii=False, indent=2)
+    return manifest
+
+
+def read_nodes(
+    path: str | Path, manifest: dict
+) -> Iterator[tuple[list[str], list[int], list[dict]]]:
+    """(labels, sids, properties) of every node group of a snapshot."""
+    for group in manifest["nodes"]:
+        data = _read_file(Path(path) / group["file"])
+        yield (
+            group["labels"],
+            data["sid"],
+            _from_columns(data["columns"], len(data["sid"])),
+        )
+
+
+def read_relationships(
+    path: str | Path, manifest: dict
+) -> Iterator[tuple[str, list[int], list[int], list[dict]]]:
+    """(type, source sids, target sids, properties) of every relationship type of a snapshot."""
+    for group in manifest["relationships"]:
+        data = _read_file(Path(path) / group["file"])
+        yield (
+            group["type"],
+            data["source"],
+            data["target"],
+            _from_columns(data["columns"], len(data["source"])),
+        )
+
+
+def _run_first(session, statements: list[str]) -> None:
+    """Run the first statement the database accepts, Neo4j or Memgraph syntax."""
+    for statement in statements:
+        try:
+            session.run(statement).consume()
+            return
+        except Neo4jError:
+            continue
+
+
+def import_snapshot(driver, path: str | Path, batch_size: int = 5000) -> dict:
+    """
+    Bulk load a snapshot into an empty database.
+
+    Args:
+        driver: Neo4j driver
+        path: Snapshot directory
+        batch_size: Rows per UNWIND statement
+
+    Returns:
+        The manifest, with the measured importSeconds
+    """
+    manifest = read_manifest(path)
+    started = time.perf_counter()
+
+    with driver.session() as session:
+        _run_first(session, IMPORT_INDEXES)
+
+        for labels, sids, props in read_nodes(path, manifest):
+            label_pattern = "".join(
+                f":{_quote(label)}" for label in [IMPORT_LABEL, *labels]
+            )
+            query = f"""
+                UNWIND $rows AS row
+                CREATE (n{label_pattern} {{_sid: row.sid}})
+                SET n += row.props
+            """
+            rows = [
+                {"sid": sid, "props": p} for sid, p in zip(sids, props, strict=True)
+            ]
+            for start in range(0, len(rows), batch_size):
+                session.run(query, {"rows": rows[start : start + batch_size]}).consume()
+
+        for rel_type, sources, targets, props in read_relationships(path, manifest):
+            query = f"""
+                UNWIND $rows AS row
+                MATCH (a:{IMPORT_LABEL} {{_sid: row.source}})
+                MATCH (b:{IMPORT_LABEL} {{_sid: row.target}})
+                CREATE (a)-[r:{_quote(rel_type)}]->(b)
+                SET r += row.props
+            """
+            rows = [
+                {"source": s, "target": t, "props": p}
+                for s, t, p in zip(sources, targets, props, strict=True)
+            ]
+            for start in range(0, len(rows), batch_size):
+                session.run(query, {"rows": rows[start : start + batch_size]}).consume()
+
+        while session.run(CLEANUP_QUERY, {"batch": batch_size}).single()["count"]:
+            pass
+        _run_first(session, DROP_IMPORT_INDEXES)
+
+    manifest["importSeconds"] = round(time.perf_counter() - started, 3)
+    return manifest
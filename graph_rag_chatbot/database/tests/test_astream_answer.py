@@ -0,0 +1,77 @@
+import asyncio
+
+from database.cypher_agent.agent_langchain import (
+    ANSWER_TAG,
+    TOOL_PROGRESS,
+    AgentEvent,
+    astream_answer,
+)
+from langchain_core.messages import AIMessageChunk, HumanMessage
+
+
+def token(text: str, tags=(), node: str = "tools", **chunk) -> dict:
+    return {
+        "event": "on_chat_model_stream",
+        "name": "model",
+        "tags": list(tags),
+        "metadata": {"langgraph_node": node},
+        "data": {"chunk": AIMessageChunk(content=text, **chunk)},
+    }
+
+
+def tool(event: str, name: str) -> dict:
+    return {"event": event, "name": name, "tags": [], "metadata": {}, "data": {}}
+
+
+class ScriptedAgent:
+    """Replays agent events and records whether the run was stopped early."""
+
+    def __init__(self, events: list[dict]) -> None:
+        self.events = events
+        self.consumed = 0
+        self.closed = False
+
+    async def astream_events(self, inputs, version):
+        try:
+            for event in self.events:
+                self.consumed += 1
+                yield event
+        finally:
+            self.closed = True
+
+
+def run(agent: ScriptedAgent) -> list[AgentEvent]:
+    async def collect():
+        messages = [HumanMessage(content="Jaké kroužky jsou v Brně?")]
+        return [event async for event in astream_answer(agent, messages)]
+
+    return asyncio.run(collect())
+
+
+def test_streams_the_answer_tool_and_stops_after_it():
+    agent = ScriptedAgent(
+        [
+            tool("on_tool_start", "find_activities"),
+            token("", node="model", tool_call_chunks=[{"name": "answer_question"}]),
+            tool("on_tool_end", "find_activities"),
+            tool("on_tool_start", "answer_question"),
+            token("Robotika", tags=[ANSWER_TAG]),
+            token(" v Brně", tags=[ANSWER_TAG]),
+            token("ignored", tags=["other_chain"]),
+            tool("on_tool_end", "answer_question"),
+            token("Repeated answer", node="model"),
+        ]
+    )
+    assert run(agent) == [
+        AgentEvent(status=TOOL_PROGRESS["find_activities"]),
+        AgentEvent(status=TOOL_PROGRESS["answer_question"]),
+        AgentEvent(content="Robotika"),
+        AgentEvent(content=" v Brně"),
+    ]
+    assert agent.consumed == len(agent.events) - 1
+    assert agent.closed
+
+
+def test_streams_a_direct_agent_reply():
+    agent = ScriptedAgent([token("Ahoj", node="model"), token("!", node="model")])
+    assert run(agent) == [AgentEvent(content="Ahoj"), AgentEvent(content="!")]
@@ -0,0 +1,62 @@
+import math
+
+import pytest
+from database.communities import (
+    activity_graph,
+    detect_communities,
+    summarize_communities,
+)
+from database.facets import FACETS
+
+
+def activity(activity_id: int, name: str, **values) -> dict:
+    return {"id": activity_id, "name": name} | {
+        facet: values.get(facet, []) for facet in FACETS
+    }
+
+
+# Two groups of three activities, every activity is available in Česko
+ACTIVITIES = [
+    activity(1, "Robotika", field=["IT"], skill=["Python"], location=["Česko"]),
+    activity(2, "Arduino", field=["IT"], skill=["Python"], location=["Česko"]),
+    activity(3, "Web", field=["IT"], skill=["Python", "HTML"], location=["Česko"]),
+    activity(4, "Les", field=["Příroda"], activity_type=["Tábor"], location=["Česko"]),
+    activity(5, "Hory", field=["Příroda"], activity_type=["Tábor"], location=["Česko"]),
+    activity(6, "Voda", field=["Příroda"], activity_type=["Tábor"], location=["Česko"]),
+]
+
+
+def test_features_shared_by_most_activities_are_ignored():
+    pytest.importorskip("networkx")
+    graph = activity_graph(ACTIVITIES)
+    assert sorted(graph.nodes) == [1, 2, 3, 4, 5, 6]
+    assert not graph.has_edge(1, 4)
+    # Two shared features, each of three activities
+    assert graph[1][2]["weight"] == pytest.approx(2 / math.log(4))
+
+
+def test_detects_the_groups_reproducibly():
+    pytest.importorskip("networkx")
+    membership = detect_communities(ACTIVITIES)
+    assert membership == detect_communities(ACTIVITIES)
+    assert membership[1] == membership[2] == membership[3]
+    assert membership[4] == membership[5] == membership[6]
+    assert membership[1] != membership[4]
+    assert sorted(set(membership.values())) == [0, 1]
+
+
+def test_summaries_label_the_communities():
+    membership = {1: 0, 2: 0, 3: 0, 4: 1, 5: 1, 6: 1}
+    it, nature = summarize_communities(ACTIVITIES, membership, top=2)
+    assert it["id"] == 0
+    assert it["size"] == 3
+    assert it["label"] == "IT"
+    assert it["topSkills"] == ["Python", "HTML"]
+    assert it["sampleActivities"] == ["Robotika", "Arduino", "Web"]
+    assert nature["label"] == "Příroda, Tábor"
+    assert nature["topLocations"] == ["Česko"]
+
+
+def test_community_without_fields_is_named_by_its_id():
+    (summary,) = summarize_communities([activity(1, "Kurz")], {1: 7})
+    assert summary["label"] == "Komunita 7"
@@ -0,0 +1,95 @@
+import pytest
+from database.cypher_agent.cypher_guard import CypherGuard, CypherRejected
+from database.fakes import FakeGraphDriver
+
+
+@pytest.fixture
+def guard() -> CypherGuard:
+    return CypherGuard(
+        FakeGraphDriver(), max_estimated_rows=1000, result_limit=25, timeout_seconds=5.0
+    )
+
+
+def test_appends_missing_limit(guard):
+    assert guard.validate("MATCH (a:Activity) RETURN a.name") == (
+        "MATCH (a:Activity) RETURN a.name\nLIMIT 25"
+    )
+
+
+def test_clamps_large_limit_and_keeps_small_one(guard):
+    assert guard.validate("MATCH (a) RETURN a LIMIT 500").endswith("RETURN a LIMIT 25")
+    assert guard.validate("MATCH (a) RETURN a LIMIT 5").endswith("RETURN a LIMIT 5")
+
+
+def test_parameter_limit_is_replaced(guard):
+    assert (
+        guard.validate("MATCH (a) RETURN a LIMIT $k") == "MATCH (a) RETURN a LIMIT 25"
+    )
+
+
+def test_every_union_branch_is_limited(guard):
+    cypher = guard.validate(
+        "MATCH (a:Activity) RETURN a.name AS name UNION "
+        "MATCH (o:Organisation) RETURN o.name AS name LIMIT 100"
+    )
+    assert cypher == (
+        "MATCH (a:Activity) RETURN a.name AS name\nLIMIT 25 UNION "
+        "MATCH (o:Organisation) RETURN o.name AS name LIMIT 25"
+    )
+
+
+def test_subquery_return_and_union_are_left_alone(guard):
+    cypher = guard.validate(
+        "CALL { MATCH (a:Activity) RETURN a UNION MATCH (a:Activity) RETURN a } "
+        "RETURN a.name LIMIT 5"
+    )
+    assert cypher.count("LIMIT") == 1
+
+
+def test_statement_without_return_is_not_limited(guard):
+    assert "LIMIT" not in guard.validate("CALL db.labels()")
+
+
+@pytest.mark.parametrize(
+    "cypher",
+    [
+        "MATCH (n) SET n.name = 'x' RETURN n",
+        "MATCH (n) DETACH DELETE n",
+        "CREATE (n:Activity)",
+        "MERGE (n:Activity {name: 'x'})",
+        "LOAD CSV FROM 'file:///x.csv' AS row RETURN row",
+        "MATCH (n) RETURN n; MATCH (m) RETURN m",
+    ],
+)
+def test_rejects_writes_and_multiple_statements(guard, cypher):
+    with pytest.raises(CypherRejected):
+        guard.validate(cypher)
+
+
+@pytest.mark.parametrize(
+    "cypher",
+    [
+        "MATCH (n) RETURN n.set AS value",
+        "MATCH (n) RETURN n.name AS set",
+        "MATCH (n:`Set`) RETURN n",
+        "MATCH (n) RETURN {set: n.name, create: 1} AS m",
+        "MATCH (n) WHERE n.name = 'DELETE me' RETURN n // SET",
+        "MATCH (n) WHERE n.name = $set RETURN n",
+    ],
+)
+def test_keywords_outside_clause_position_are_allowed(guard, cypher):
+    guard.validate(cypher)
+
+
+def test_disallowed_procedure_is_rejected(guard):
+    with pytest.raises(CypherRejected) as error:
+        guard.validate(
+            "CALL apoc.periodic.iterate('a', 'b', {}) YIELD batches RETURN batches"
+        )
+    assert "apoc.periodic.iterate" in error.value.to_feedback()
+
+
+def test_prepare_strips_code_fences(guard):
+    guarded = guard.prepare("```cypher\nMATCH (a:Activity) RETURN a LIMIT 3;\n```")
+    assert guarded.cypher == "MATCH (a:Activity) RETURN a LIMIT 3"
+    assert guarded.estimated_rows == 0.0
@@ -0,0 +1,58 @@
+import math
+
+from database.embeddings import (
+    EmbeddingCache,
+    HashingEmbedder,
+    activity_text,
+    content_hash,
+    create_embedder,
+    create_vector_index_statement,
+)
+
+
+def cosine(a: list[float], b: list[float]) -> float:
+    return sum(x * y for x, y in zip(a, b, strict=True))
+
+
+def test_hashing_vectors_are_normalized_and_fold_diacritics():
+    embedder = HashingEmbedder(dimensions=64)
+    plain, accented, other, empty = embedder.embed(
+        ["Kraj Vysocina", "Kraj Vysočina", "letní tábor", ""]
+    )
+    assert len(plain) == 64
+    assert math.isclose(sum(x * x for x in plain), 1.0)
+    assert plain == accented
+    assert cosine(plain, other) < 0.5
+    assert empty == [0.0] * 64
+
+
+def test_embedder_selection():
+    assert create_embedder("none") is None
+    assert create_embedder("hashing").name == "hashing-384"
+
+
+def test_content_hash_changes_with_text_and_embedder():
+    text = activity_text("Robotika", "", "Stavíme roboty")
+    assert text == "Robotika\nStavíme roboty"
+    assert content_hash("a", text) == content_hash("a", text)
+    assert content_hash("a", text) != content_hash("b", text)
+    assert content_hash("a", text) != content_hash("a", text + ".")
+
+
+def test_cache_round_trip_and_prune(tmp_path):
+    path = tmp_path / "embeddings.json"
+    cache = EmbeddingCache(path)
+    cache["kept"] = [1.0, 0.0]
+    cache["stale"] = [0.0, 1.0]
+    cache.prune({"kept"})
+    cache.save()
+
+    reloaded = EmbeddingCache(path)
+    assert "kept" in reloaded
+    assert "stale" not in reloaded
+    assert reloaded["kept"] == [1.0, 0.0]
+    assert not path.with_suffix(".json.tmp").exists()
+
+
+def test_vector_index_statement():
+    assert "`vector.dimensions`: 384" in create_vector_index_statement(384)
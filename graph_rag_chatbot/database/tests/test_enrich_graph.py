@@ -0,0 +1,88 @@
+import asyncio
+import json
+
+from database.fakes import FakeChatModel
+from database.llm_gateway import LLMGateway
+from enrich_graph import (
+    Enricher,
+    ExtractionCache,
+    activity_text,
+    cache_key,
+    fake_extraction,
+    normalize,
+)
+
+ACTIVITIES = [
+    {"id": 1, "title": "Kroužek robotiky", "short_description": "Arduino a Python"},
+    {"id": 2, "title": "Letní tábor", "long_description": "Příroda a zdraví"},
+    {"id": 3, "title": "Programátor", "short_description": "Práce s SQL"},
+]
+
+
+def make_enricher(cache: ExtractionCache, responder=fake_extraction) -> Enricher:
+    llm = FakeChatModel(
+        first_token_delay_seconds=0.0, tokens_per_second=1e9, responder=responder
+    )
+    gateway = LLMGateway(
+        max_in_flight=2,
+        max_retries=0,
+        backoff_base_seconds=0.0,
+        backoff_max_seconds=0.0,
+    )
+    return Enricher(llm, gateway, cache, batch_size=2)
+
+
+def test_normalize_cleans_and_keys_the_extraction():
+    extraction = {
+        "concepts": ["  Věda  a  technika ", "Věda a technika", "x", 42, "a" * 81],
+        "mentioned_entities": [
+            {"name": "Týden vědy", "type": "competition"},
+            {"name": "Nadace Partner", "type": "sponsor"},
+            {"type": "program"},
+            "Bez typu",
+        ],
+        "technologies": "Python",
+        "prepares_for": ["Programátor", "Astronaut"],
+        "partners": ["Partner, z.s."],
+    }
+    assert normalize(extraction) == {
+        "concepts": [{"key": "věda a technika", "name": "Věda a technika"}],
+        "mentioned_entities": [
+            {"key": "týden vědy", "name": "Týden vědy", "type": "competition"},
+            {"key": "nadace partner", "name": "Nadace Partner", "type": "organisation"},
+        ],
+        "technologies": [],
+        "prepares_for": [{"name": "Programátor"}],
+        "partners": [{"key": "partner", "name": "Partner, z.s."}],
+    }
+
+
+def test_cache_key_depends_on_the_text():
+    assert cache_key("a") == cache_key("a")
+    assert cache_key("a") != cache_key("b")
+
+
+def test_extract_caches_every_batch_and_skips_cached_activities(tmp_path):
+    path = tmp_path / "cache.json"
+    enricher = make_enricher(ExtractionCache(path))
+    assert asyncio.run(enricher.extract(ACTIVITIES)) == 3
+
+    # Saved by the batches themselves, without an explicit save
+    saved = json.loads(path.read_text(encoding="utf-8"))
+    entry = saved[cache_key(activity_text(ACTIVITIES[0]))]
+    assert [t["name"] for t in entry["technologies"]] == ["Python", "Arduino"]
+    assert saved[cache_key(activity_text(ACTIVITIES[2]))]["prepares_for"] == [
+        {"name": "Programátor"}
+    ]
+
+    rerun = make_enricher(ExtractionCache(path))
+    assert asyncio.run(rerun.extract(ACTIVITIES)) == 0
+
+
+def test_failed_batches_are_not_cached(tmp_path):
+    enricher = make_enricher(
+        ExtractionCache(tmp_path / "cache.json"), responder=lambda prompt: "not json"
+    )
+    assert asyncio.run(enricher.extract(ACTIVITIES)) == 3
+    assert enricher.failed_batches == 2
+    assert not enricher.cache.entries
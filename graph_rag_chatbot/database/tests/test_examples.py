@@ -0,0 +1,40 @@
+from database.cypher_agent.cypher_guard import CypherGuard
+from database.cypher_agent.examples import (
+    CYPHER_EXAMPLES,
+    CypherExample,
+    ExampleIndex,
+    format_examples,
+)
+from database.fakes import FakeGraphDriver
+
+
+def test_nearest_puts_the_best_match_last():
+    index = ExampleIndex(CYPHER_EXAMPLES)
+    nearest = index.nearest("Jake souteze jsou zdarma pro stredoskolaky?", 3)
+    assert len(nearest) == 3
+    assert nearest[-1].question == "Které soutěže jsou pro středoškoláky zdarma?"
+
+
+def test_unrelated_question_gets_no_examples():
+    index = ExampleIndex(CYPHER_EXAMPLES)
+    assert index.nearest("xyzzy qwv", 3) == []
+
+
+def test_k_limits_the_examples():
+    index = ExampleIndex(CYPHER_EXAMPLES)
+    assert len(index.nearest("aktivity", 1)) == 1
+
+
+def test_format_examples():
+    example = CypherExample("Kolik?", "RETURN 1")
+    assert format_examples([example, example]) == (
+        "Question: Kolik?\nCypher:\nRETURN 1\n\nQuestion: Kolik?\nCypher:\nRETURN 1"
+    )
+
+
+def test_examples_pass_the_guard():
+    guard = CypherGuard(
+        FakeGraphDriver(), max_estimated_rows=1000, result_limit=25, timeout_seconds=5.0
+    )
+    for example in CYPHER_EXAMPLES:
+        guard.validate(example.cypher)
@@ -0,0 +1,71 @@
+from database.facets import (
+    FACETS,
+    compute_facet_counts,
+    count_fallback_query,
+    facet_key,
+    facet_set,
+)
+
+
+def activity(**values) -> dict:
+    return {"id": 0} | {name: values.get(name, []) for name in FACETS}
+
+
+# Brno (1) lies in the region 10, the loader query returns both
+ACTIVITIES = [
+    activity(location=[1, 10], activity_type=[4]),
+    activity(location=[10, 10], activity_type=[4, 5]),
+    activity(location=[2], level=None),
+]
+
+
+def counts_by_key(depth: int) -> dict[str, int]:
+    return {row["key"]: row["count"] for row in compute_facet_counts(ACTIVITIES, depth)}
+
+
+def test_keys_are_canonical():
+    assert facet_key({"location": 12, "activity_type": 4}) == (
+        "activity_type=4|location=12"
+    )
+    assert facet_set(["location", "activity_type"]) == "activity_type|location"
+
+
+def test_counts_single_facets_with_parents():
+    assert counts_by_key(depth=1) == {
+        "": 3,
+        "location=1": 1,
+        "location=2": 1,
+        "location=10": 2,
+        "activity_type=4": 2,
+        "activity_type=5": 1,
+    }
+
+
+def test_counts_combinations_up_to_depth():
+    counts = counts_by_key(depth=2)
+    assert counts["activity_type=4|location=10"] == 2
+    assert counts["activity_type=5|location=10"] == 1
+    assert counts["activity_type=4|location=1"] == 1
+    assert "activity_type=5|location=1" not in counts
+    assert "location=1|location=10" not in counts
+
+
+def test_rows_carry_the_facet_values():
+    rows = compute_facet_counts(ACTIVITIES, depth=2)
+    row = next(r for r in rows if r["key"] == "activity_type=4|location=1")
+    assert row == {
+        "key": "activity_type=4|location=1",
+        "facets": "activity_type|location",
+        "depth": 2,
+        "count": 1,
+        "activity_type": 4,
+        "location": 1,
+    }
+    assert not compute_facet_counts([], depth=2)
+
+
+def test_fallback_query_filters_every_facet():
+    query = count_fallback_query({"location": 1, "field": 3})
+    assert "n.id = $values.field" in query
+    assert "[:LOCATED_IN*0..3]" in query
+    assert count_fallback_query({}).startswith("MATCH (a:Activity) WHERE true")
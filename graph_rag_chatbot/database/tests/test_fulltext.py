@@ -0,0 +1,28 @@
+from database.fulltext import (
+    ACTIVITY_TEXT_INDEX,
+    create_index_statement,
+    escape_lucene,
+    to_lucene_query,
+)
+
+
+def test_lucene_operators_are_escaped():
+    assert escape_lucene('C++ "kroužek"') == r"C\+\+ \"kroužek\""
+    assert escape_lucene("a && b || c") == r"a \&& b \|| c"
+    assert escape_lucene("robot*? (3D):tisk/") == r"robot\*\? \(3D\)\:tisk\/"
+    assert escape_lucene("Věda a technika") == "Věda a technika"
+
+
+def test_query_keeps_terms_and_lowercases_reserved_words():
+    assert to_lucene_query("  robotika   AND Brno ") == "robotika and Brno"
+    assert to_lucene_query("NOT -Praha") == r"not \-Praha"
+    assert to_lucene_query("Not or") == "Not or"
+    assert to_lucene_query("") == ""
+
+
+def test_index_statement():
+    assert create_index_statement(ACTIVITY_TEXT_INDEX) == (
+        "CREATE FULLTEXT INDEX activity_text IF NOT EXISTS "
+        "FOR (n:Activity) ON EACH [n.name, n.shortDescription, n.longDescription] "
+        "OPTIONS {indexConfig: {`fulltext.analyzer`: 'czech'}}"
+    )
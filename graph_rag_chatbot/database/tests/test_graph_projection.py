@@ -0,0 +1,71 @@
+from database.graph_projection import (
+    ACTIVITY_DETAILS_QUERY,
+    FIND_ACTIVITIES_QUERY,
+    JOBS_FOR_SKILL_QUERY,
+    GraphProjection,
+    fold,
+)
+
+NODES = [
+    ("a1", ["Activity"], {"name": "Programování v Pythonu", "url": "https://a1"}),
+    ("a2", ["Activity"], {"name": "Letní škola robotiky", "url": "https://a2"}),
+    ("l1", ["Location"], {"name": "Jihomoravský kraj"}),
+    ("l2", ["Location"], {"name": "Brno"}),
+    ("v1", ["LevelOfStudy"], {"name": "Střední škola", "code": "student_ss"}),
+    ("s1", ["Skill"], {"name": "Programování"}),
+    ("j1", ["Job"], {"name": "Programátor", "averageSalary": 60000}),
+]
+RELATIONSHIPS = [
+    ("a1", "AVAILABLE_IN", "l2"),
+    ("l2", "LOCATED_IN", "l1"),
+    ("a1", "AIMS_TO", "v1"),
+    ("a2", "AIMS_TO", "v1"),
+    ("a1", "REQUIRES", "s1"),
+    ("s1", "USED_IN", "j1"),
+]
+
+
+def projection() -> GraphProjection:
+    return GraphProjection("v1", NODES, RELATIONSHIPS)
+
+
+def names(graph: GraphProjection, nodes) -> set[str]:
+    return {graph.get(i, "name") for i in nodes}
+
+
+def test_fold():
+    assert fold("Střední ŠKOLA") == "stredni skola"
+
+
+def test_find_ignores_case_and_diacritics():
+    graph = projection()
+    assert names(graph, graph.find("Activity", "programovani")) == {
+        "Programování v Pythonu"
+    }
+    assert names(graph, graph.find("LevelOfStudy", "student_ss")) == {"Střední škola"}
+
+
+def test_find_activities_follows_location_hierarchy():
+    graph = projection()
+    found = graph.find_activities(location="jihomoravsky", level="Střední")
+    assert names(graph, found) == {"Programování v Pythonu"}
+
+
+def test_jobs_for_skill():
+    assert projection().jobs_for_skill("programováni") == [
+        {"skill": "Programování", "job": "Programátor", "averageSalary": 60000}
+    ]
+
+
+def test_neo4j_fallback_matches_folded_search_names():
+    for query in (FIND_ACTIVITIES_QUERY, ACTIVITY_DETAILS_QUERY, JOBS_FOR_SKILL_QUERY):
+        assert "searchName" in query
+        assert "toLower($" not in query
+
+
+def test_node_with_several_labels_is_found_under_each():
+    nodes = [("t1", ["Technology", "Skill"], {"name": "Python"})]
+    graph = GraphProjection("v1", nodes, [])
+    assert graph.find("Skill", "python") == [0]
+    assert graph.find("Technology", "python") == [0]
+    assert graph.labels == [("Skill", "Technology")]
@@ -0,0 +1,181 @@
+import asyncio
+import time
+
+import pytest
+from database.llm_gateway import (
+    PRIORITY_ANSWER,
+    PRIORITY_SHORT,
+    LLMGateway,
+    LLMGatewayOverloaded,
+    is_retryable,
+    request_deadline,
+)
+
+
+class RateLimited(Exception):
+    status_code = 429
+
+
+def make_gateway(**overrides) -> LLMGateway:
+    options = dict(
+        max_in_flight=1,
+        max_retries=2,
+        backoff_base_seconds=0.0,
+        backoff_max_seconds=0.0,
+    )
+    options.update(overrides)
+    return LLMGateway(**options)
+
+
+def test_is_retryable():
+    assert is_retryable(RateLimited())
+    assert not is_retryable(ValueError())
+
+
+def test_short_calls_are_served_before_answers():
+    async def scenario():
+        gateway = make_gateway()
+        order = []
+
+        async def call(name, priority):
+            async with gateway.slot(priority):
+                order.append(name)
+
+        async with gateway.slot():
+            tasks = [
+                asyncio.create_task(call("answer", PRIORITY_ANSWER)),
+                asyncio.create_task(call("short 1", PRIORITY_SHORT)),
+                asyncio.create_task(call("short 2", PRIORITY_SHORT)),
+            ]
+            await asyncio.sleep(0)
+            assert gateway.queue_depth == 3
+        await asyncio.gather(*tasks)
+        assert order == ["short 1", "short 2", "answer"]
+        assert gateway.stats()["in_flight"] == 0
+
+    asyncio.run(scenario())
+
+
+def test_call_past_its_deadline_is_shed():
+    async def scenario():
+        gateway = make_gateway()
+        async with gateway.slot():
+            with pytest.raises(LLMGatewayOverloaded):
+                async with gateway.slot(deadline=time.monotonic() + 0.01):
+                    pass
+        assert gateway.stats()["shed_total"] == 1
+        assert gateway.stats()["in_flight"] == 0
+
+    asyncio.run(scenario())
+
+
+def test_queued_call_times_out_at_its_deadline():
+    async def scenario():
+        # An optimistic estimate admits the call to the queue, the deadline still holds
+        gateway = make_gateway()
+        gateway._avg_call_seconds = 0.0
+        async with gateway.slot():
+            with pytest.raises(LLMGatewayOverloaded):
+                async with gateway.slot(deadline=time.monotonic() + 0.01):
+                    pass
+            assert gateway.queue_depth == 0
+        assert gateway.stats()["in_flight"] == 0
+
+    asyncio.run(scenario())
+
+
+def test_cancelled_waiter_does_not_leak_a_slot():
+    async def scenario():
+        gateway = make_gateway()
+        async with gateway.slot():
+            waiting = asyncio.create_task(gateway.call(asyncio.sleep, PRIORITY_SHORT))
+            await asyncio.sleep(0)
+            waiting.cancel()
+            with pytest.raises(asyncio.CancelledError):
+                await waiting
+        assert gateway.stats()["in_flight"] == 0
+        assert await gateway.call(lambda: asyncio.sleep(0, "ok")) == "ok"
+
+    asyncio.run(scenario())
+
+
+def test_retryable_errors_are_retried():
+    async def scenario():
+        gateway = make_gateway()
+        attempts = []
+
+        async def flaky():
+            attempts.append(1)
+            if len(attempts) < 3:
+                raise RateLimited()
+            return "ok"
+
+        assert await gateway.call(flaky) == "ok"
+        assert len(attempts) == 3
+        assert gateway.stats()["retries_total"] == 2
+
+    asyncio.run(scenario())
+
+
+def test_gives_up_after_max_retries():
+    async def scenario():
+        gateway = make_gateway(max_retries=1)
+        attempts = []
+
+        async def failing():
+            attempts.append(1)
+            raise RateLimited()
+
+        with pytest.raises(RateLimited):
+            await gateway.call(failing)
+        assert len(attempts) == 2
+
+    asyncio.run(scenario())
+
+
+def test_other_errors_are_not_retried():
+    async def scenario():
+        gateway = make_gateway()
+        attempts = []
+
+        async def failing():
+            attempts.append(1)
+            raise ValueError("bad request")
+
+        with pytest.raises(ValueError):
+            await gateway.call(failing)
+        assert len(attempts) == 1
+
+    asyncio.run(scenario())
+
+
+def test_started_call_is_not_retried():
+    async def scenario():
+        gateway = make_gateway()
+        attempts = []
+
+        async def failing_mid_stream():
+            attempts.append(1)
+            raise RateLimited()
+
+        with pytest.raises(RateLimited):
+            await gateway.call(failing_mid_stream, started=lambda: True)
+        assert len(attempts) == 1
+
+    asyncio.run(scenario())
+
+
+def test_backoff_past_the_request_deadline_is_shed(monkeypatch):
+    monkeypatch.setattr("database.llm_gateway.random.uniform", lambda low, high: high)
+
+    async def scenario():
+        gateway = make_gateway(backoff_base_seconds=10.0, backoff_max_seconds=10.0)
+        request_deadline.set(time.monotonic() + 0.01)
+
+        async def failing():
+            raise RateLimited()
+
+        with pytest.raises(LLMGatewayOverloaded):
+            await gateway.call(failing)
+
+    asyncio.run(scenario())
@@ -0,0 +1,92 @@
+from organisations import (
+    OrganisationResolver,
+    normalize_name,
+    organiser_name,
+    split_legal_form,
+    website_domain,
+)
+
+
+def test_normalize_name_folds_case_diacritics_and_legal_form():
+    assert normalize_name("Junior Achievement, z. s.") == "junior achievement"
+    assert normalize_name("JUNIOR ACHIEVEMENT z.s.") == "junior achievement"
+    assert split_legal_form("Česká spořitelna, a.s.") == ("ceska sporitelna", "a s")
+
+
+def test_website_domain():
+    assert website_domain("https://www.jacr.cz/programy") == "jacr.cz"
+    assert website_domain("sci.muni.cz") == "muni.cz"
+    assert website_domain("https://www.example.co.uk/") == "example.co.uk"
+    assert website_domain("https://www.facebook.com/events/1") is None
+    assert website_domain("") is None
+
+
+def test_organiser_name_from_metadata():
+    assert organiser_name({"organizer": {"name": " Junior  Achievement "}}) == (
+        "Junior Achievement"
+    )
+    assert organiser_name({"author": "", "provider": "Mensa ČR"}) == "Mensa ČR"
+    assert organiser_name({}) is None
+
+
+def test_name_variants_resolve_to_one_organisation():
+    resolver = OrganisationResolver()
+    first = resolver.resolve({"organizer": "Junior Achievement, z. s."})
+    assert resolver.resolve({"organizer": "JUNIOR ACHIEVEMENT z.s."}) is first
+    assert resolver.resolve({"organizer": "Junior Achievment"}) is first
+    assert resolver.fuzzy_matches == 1
+    assert first.is_nonprofit
+    assert len(resolver) == 1
+
+
+def test_unnamed_organiser_is_matched_by_domain():
+    resolver = OrganisationResolver()
+    named = resolver.resolve(
+        {"organizer": "Junior Achievement"}, "https://www.jacr.cz/a"
+    )
+    assert resolver.resolve({}, "https://jacr.cz/b") is named
+    assert named.domain == "jacr.cz"
+
+
+def test_differently_named_organisers_on_one_domain_stay_apart():
+    resolver = OrganisationResolver()
+    fi = resolver.resolve(
+        {"organizer": "Fakulta informatiky MU"}, "https://www.fi.muni.cz"
+    )
+    sci = resolver.resolve(
+        {"organizer": "Přírodovědecká fakulta MU"}, "https://www.sci.muni.cz"
+    )
+    assert sci is not fi
+    assert sci.name == "Přírodovědecká fakulta MU"
+    assert len(resolver) == 2
+
+
+def test_domain_only_organisation_takes_the_first_name_seen():
+    resolver = OrganisationResolver()
+    placeholder = resolver.resolve({}, "https://www.jacr.cz")
+    assert placeholder.name == "jacr.cz"
+    assert placeholder.is_domain_only
+
+    named = resolver.resolve(
+        {"organizer": "Junior Achievement, s.r.o."}, "https://jacr.cz"
+    )
+    assert named is placeholder
+    assert named.name == "Junior Achievement, s.r.o."
+    assert named.normalized_name == "junior achievement"
+    assert not named.is_nonprofit
+    assert resolver.resolve({"organizer": "Junior Achievement"}) is named
+
+
+def test_nonprofit_is_unknown_without_a_legal_form():
+    resolver = OrganisationResolver()
+    organisation = resolver.resolve({"organizer": "Mensa ČR"})
+    assert organisation.is_nonprofit is None
+
+    assert resolver.resolve({"organizer": "Mensa ČR, z.s."}) is organisation
+    assert organisation.is_nonprofit is True
+    assert resolver.resolve({"organizer": "Mensa ČR s.r.o."}) is organisation
+    assert organisation.is_nonprofit is True
+
+
+def test_nothing_to_resolve():
+    assert OrganisationResolver().resolve({}, "https://www.facebook.com/x") is None
@@ -0,0 +1,53 @@
+import threading
+import time
+
+import database.main
+import httpx
+from database.main import app
+from fastapi.testclient import TestClient
+
+
+def wait_for(client: TestClient, status: str) -> httpx.Response:
+    """Poll /ready until the background startup reaches the status."""
+    for _ in range(200):
+        response = client.get("/ready")
+        if response.json()["status"] == status:
+            return response
+        time.sleep(0.01)
+    raise AssertionError(f"/ready never reported {status}")
+
+
+def test_not_ready_until_the_agent_is_set(monkeypatch):
+    release = threading.Event()
+
+    def build_services(settings) -> dict:
+        release.wait(5)
+        return {
+            "driver": None,
+            "llm": None,
+            "embedder": None,
+            "projection": None,
+            "llm_gateway": None,
+            "agent": object(),
+        }
+
+    monkeypatch.setattr(database.main, "build_services", build_services)
+    with TestClient(app) as client:
+        response = client.get("/ready")
+        assert response.status_code == 503
+        assert response.json() == {"status": "starting", "error": None}
+        assert client.get("/health").status_code == 200
+
+        release.set()
+        assert wait_for(client, "ready").status_code == 200
+
+
+def test_startup_failure_is_reported(monkeypatch):
+    def build_services(settings) -> dict:
+        raise ConnectionError("Neo4j is unreachable")
+
+    monkeypatch.setattr(database.main, "build_services", build_services)
+    with TestClient(app) as client:
+        response = wait_for(client, "failed")
+        assert response.status_code == 503
+        assert response.json()["error"] == "Neo4j is unreachable"
@@ -0,0 +1,55 @@
+from database.cypher_agent.result_formatter import CHARS_PER_TOKEN, ResultFormatter
+from neo4j import Record
+
+
+def records(count: int):
+    for i in range(count):
+        yield Record({"name": f"Aktivita {i}", "level": i})
+
+
+def test_formats_a_compact_table():
+    formatter = ResultFormatter(max_rows=10, max_text_length=100, max_tokens=1000)
+    rows = [
+        Record({"name": "Robotika | Brno", "fields": ["IT", "Věda"], "city": None}),
+        Record({"name": "Tábor", "fields": [], "city": {"name": "Praha"}}),
+    ]
+    assert formatter.format(rows) == (
+        "name | fields | city\n"
+        'Robotika / Brno | ["IT","Věda"] | \n'
+        'Tábor | [] | {"name":"Praha"}'
+    )
+
+
+def test_no_records():
+    formatter = ResultFormatter(max_rows=10, max_text_length=100, max_tokens=1000)
+    assert formatter.format([]) == "No results found."
+
+
+def test_long_text_is_truncated_and_excluded_properties_dropped():
+    formatter = ResultFormatter(max_rows=10, max_text_length=10, max_tokens=1000)
+    row = Record(
+        {
+            "description": "Velmi   dlouhý\npopis aktivity",
+            "activity": {"name": "Kroužek", "longDescription": "x" * 1000},
+        }
+    )
+    lines = formatter.format([row]).splitlines()
+    assert lines[1] == 'Velmi dlo… | {"name":"Kroužek"}'
+
+
+def test_row_cap_stops_consuming_records():
+    formatter = ResultFormatter(max_rows=3, max_text_length=100, max_tokens=1000)
+    source = records(100)
+    lines = formatter.format(source).splitlines()
+    assert len(lines) == 5
+    assert lines[-1] == "(showing first 3 rows, more results were omitted)"
+    # Only one record past the cap was read from the source
+    assert next(source)["level"] == 4
+
+
+def test_output_stays_within_the_token_budget():
+    formatter = ResultFormatter(max_rows=1000, max_text_length=100, max_tokens=20)
+    table = formatter.format(records(100))
+    body, note = table.rsplit("\n", 1)
+    assert len(body) <= 20 * CHARS_PER_TOKEN
+    assert note.startswith("(showing first ")
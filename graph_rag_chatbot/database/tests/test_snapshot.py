@@ -0,0 +1,88 @@
+from datetime import date
+
+from database.graph_projection import load_snapshot_projection
+from database.snapshot import (
+    EXPORT_NODES_QUERY,
+    _from_columns,
+    _to_columns,
+    export_snapshot,
+    read_manifest,
+    read_nodes,
+    read_relationships,
+)
+
+NODES = [
+    {
+        "eid": "n1",
+        "labels": ["Activity"],
+        "props": {"name": "Robotika", "searchName": "robotika"},
+    },
+    {"eid": "n2", "labels": ["Skill"], "props": {"name": "Programování"}},
+    {"eid": "n3", "labels": ["GraphMeta"], "props": {"version": "v1"}},
+]
+RELATIONSHIPS = [
+    {"source": "n1", "type": "REQUIRES", "target": "n2", "props": {"weight": 2}},
+]
+
+
+class FakeSession:
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+    def run(self, query, *args, **kwargs):
+        return NODES if query == EXPORT_NODES_QUERY else RELATIONSHIPS
+
+
+class FakeDriver:
+    def session(self, **kwargs):
+        return FakeSession()
+
+
+def test_columns_round_trip_skips_missing_values():
+    rows = [
+        {"name": "a", "tags": ("x", "y")},
+        {"name": "b", "since": date(2024, 1, 2)},
+        {},
+    ]
+    columns = _to_columns(rows)
+    assert columns == {
+        "name": ["a", "b", None],
+        "tags": [["x", "y"], None, None],
+        "since": [None, "2024-01-02", None],
+    }
+    assert _from_columns(columns, 3) == [
+        {"name": "a", "tags": ["x", "y"]},
+        {"name": "b", "since": "2024-01-02"},
+        {},
+    ]
+
+
+def test_export_and_read_back(tmp_path):
+    manifest = export_snapshot(FakeDriver(), tmp_path, "v1")
+    assert manifest["nodeCount"] == 3
+    assert manifest["relationshipCount"] == 1
+    assert read_manifest(tmp_path)["graphVersion"] == "v1"
+
+    nodes = {
+        labels[0]: (sids, props)
+        for labels, sids, props in read_nodes(tmp_path, manifest)
+    }
+    assert nodes["Activity"] == ([0], [{"name": "Robotika", "searchName": "robotika"}])
+    assert list(read_relationships(tmp_path, manifest)) == [
+        ("REQUIRES", [0], [1], [{"weight": 2}])
+    ]
+
+
+def test_projection_from_snapshot(tmp_path):
+    export_snapshot(FakeDriver(), tmp_path, "v1")
+    graph = load_snapshot_projection(str(tmp_path))
+    assert graph.version == "v1"
+    assert graph.node_count == 2  # GraphMeta is internal
+    assert "searchName" not in graph.columns
+    [activity] = graph.find("Activity", "robot")
+    assert [graph.get(s, "name") for s in graph.out("REQUIRES", activity)] == [
+        "Programování"
+    ]
@@ -0,0 +1,61 @@
+import asyncio
+
+from database.cypher_agent.agent_langchain import ANSWER_TAG
+from database.routes import generate_stream_response
+from interfaces.codec import DONE_EVENT, decode_sse_line
+from interfaces.models import ChatMessage, DatabaseChatRequest, MessageRole
+from langchain_core.messages import AIMessageChunk
+
+
+class ScriptedAgent:
+    """Streams answer tokens forever, until its event stream is closed."""
+
+    def __init__(self) -> None:
+        self.sent = 0
+        self.closed = False
+
+    async def astream_events(self, inputs, version):
+        try:
+            while True:
+                self.sent += 1
+                yield {
+                    "event": "on_chat_model_stream",
+                    "tags": [ANSWER_TAG],
+                    "metadata": {},
+                    "data": {"chunk": AIMessageChunk(content=f"token{self.sent} ")},
+                }
+                await asyncio.sleep(0)
+        finally:
+            self.closed = True
+
+
+class FakeRequest:
+    """Reports the client as disconnected after the given number of checks."""
+
+    def __init__(self, connected_checks: int) -> None:
+        self.connected_checks = connected_checks
+
+    async def is_disconnected(self) -> bool:
+        self.connected_checks -= 1
+        return self.connected_checks < 0
+
+
+def test_disconnect_closes_the_agent_run():
+    async def scenario():
+        agent = ScriptedAgent()
+        request = DatabaseChatRequest(
+            query=ChatMessage(role=MessageRole.USER, content="Kroužky v Brně?")
+        )
+        events = [
+            event
+            async for event in generate_stream_response(
+                request, agent, FakeRequest(connected_checks=2)
+            )
+        ]
+        return agent, events
+
+    agent, events = asyncio.run(scenario())
+    assert len(events) == 2
+    assert DONE_EVENT not in events
+    assert decode_sse_line(events[0].decode().rstrip("\n")).content == "token1 "
+    assert agent.closed
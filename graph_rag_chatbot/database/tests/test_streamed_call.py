@@ -0,0 +1,66 @@
+import asyncio
+
+from database.cypher_agent.agent_langchain import streamed_call
+from database.llm_gateway import LLMGateway
+from langchain_core.language_models.fake_chat_models import GenericFakeChatModel
+from langchain_core.messages import AIMessageChunk
+from langchain_core.outputs import ChatGenerationChunk
+from langchain_core.runnables import RunnableLambda
+
+
+class RateLimited(Exception):
+    status_code = 429
+
+
+class FlakyChatModel(GenericFakeChatModel):
+    """Streams two tokens, the first attempt fails before token fail_at."""
+
+    fail_at: int = 0
+    attempts: int = 0
+
+    async def _astream(self, messages, stop=None, run_manager=None, **kwargs):
+        self.attempts += 1
+        for i, token in enumerate(["Ahoj", " světe"]):
+            if i == self.fail_at and self.attempts == 1:
+                raise RateLimited()
+            chunk = ChatGenerationChunk(message=AIMessageChunk(content=token))
+            if run_manager:
+                await run_manager.on_llm_new_token(token, chunk=chunk)
+            yield chunk
+
+
+def stream(fail_at: int) -> tuple[FlakyChatModel, list[str]]:
+    gateway = LLMGateway(
+        max_in_flight=1,
+        max_retries=2,
+        backoff_base_seconds=0.0,
+        backoff_max_seconds=0.0,
+    )
+    model = FlakyChatModel(messages=iter([]), fail_at=fail_at)
+
+    async def answer(_):
+        return await streamed_call(gateway, lambda: model.ainvoke("question"), 1)
+
+    async def scenario():
+        output = []
+        try:
+            async for event in RunnableLambda(answer).astream_events("", version="v2"):
+                if event["event"] == "on_chat_model_stream":
+                    output.append(event["data"]["chunk"].content)
+        except RateLimited:
+            output.append("<error>")
+        return output
+
+    return model, asyncio.run(scenario())
+
+
+def test_retried_before_the_first_token():
+    model, output = stream(fail_at=0)
+    assert model.attempts == 2
+    assert "".join(output) == "Ahoj světe"
+
+
+def test_not_retried_after_the_first_token():
+    model, output = stream(fail_at=1)
+    assert model.attempts == 1
+    assert output == ["Ahoj", "<error>"]
@@ -1,5 +1,5 @@
 import os
-from typing import Callable
+from typing import Callable, Literal
 
 from pydantic_settings import BaseSettings, SettingsConfigDict
 
@@ -25,6 +25,18 @@ class Settings(BaseSettings):
 
     # Backend URL
     backend_url: str = "http://localhost:9001"  # Override in production
+    backend_max_connections: int = 100  # Pool shared by all sessions
+
+    # Signs the browser session cookie holding the conversation ID.
+    # Without it a random secret is used and sessions end with the process.
+    storage_secret: str | None = None
+
+    # Streamed answers are re-rendered at most this often
+    render_interval_seconds: float = 0.075
+
+    # Tracing
+    tracing_exporter: Literal["none", "console", "otlp"] = "none"
+    otlp_endpoint: str = "http://localhost:4318/v1/traces"
 
 
 # delayed singleton pattern for settings
@@ -1,49 +1,101 @@
 #!/usr/bin/env python3
 import asyncio
-import json
+import secrets
+import uuid
+
 import httpx
 
-from nicegui import ui
+from fastapi.responses import Response
+from nicegui import app, ui
 
-from interfaces.models import ChatMessage, ChatRequest, MessageRole, StreamChunk
+from interfaces.codec import JSON_HEADERS, decode_json, decode_sse_line, encode_json
+from interfaces.models import (
+    ChatMessage,
+    ChatRequest,
+    ConversationHistoryResponse,
+    MessageRole,
+)
 from interfaces.endpoints import APIEndpoints
+from interfaces.telemetry import (
+    inject_trace_headers,
+    metrics_payload,
+    setup_tracing,
+    stage,
+)
 from config import get_settings
+from rendering import AnswerBuffer
 
 
 class BackendClient:
-    """Client for communicating with the backend service."""
+    """
+    Client for communicating with the backend service.
+
+    One instance and one pooled httpx.AsyncClient are shared by all NiceGUI
+    sessions, so connections to the backend are reused across messages and
+    users. The conversation ID is passed in by the caller.
+    """
 
     def __init__(
         self,
         base_url: str = get_settings().backend_url,
         api_key: str = get_settings().api_key,
+        max_connections: int = get_settings().backend_max_connections,
     ) -> None:
         print("Using BackendClient with URL:", base_url)
         self.base_url = base_url
         self.api_key = api_key
-        self.conversation_id: str | None = None
+        self.max_connections = max_connections
+        self._client: httpx.AsyncClient | None = None
+
+    async def start(self) -> None:
+        """Open the shared connection pool, called on app startup."""
+        self._client = httpx.AsyncClient(
+            base_url=self.base_url,
+            headers={"X-API-Key": self.api_key},
+            limits=httpx.Limits(
+                max_connections=self.max_connections,
+                max_keepalive_connections=self.max_connections,
+            ),
+            timeout=60.0,
+        )
+
+    async def close(self) -> None:
+        """Close the shared connection pool, called on app shutdown."""
+        if self._client is not None:
+            await self._client.aclose()
+            self._client = None
+
+    async def history(self, conversation_id: str) -> list[ChatMessage]:
+        """Messages stored by the backend for the conversation, empty on any error."""
+        try:
+            response = await self._client.get(
+                APIEndpoints.BACKEND_CHAT_HISTORY.format(
+                    conversation_id=conversation_id
+                ),
+                headers=inject_trace_headers({}),
+            )
+            response.raise_for_status()
+        except httpx.HTTPError as e:
+            print(f"Could not load conversation history: {e}")
+            return []
+        return decode_json(ConversationHistoryResponse, response.content).messages
 
-    async def astream(self, question: str):
+    async def astream(self, question: str, conversation_id: str):
         """Stream responses from the backend."""
         request = ChatRequest(
             message=ChatMessage(role=MessageRole.USER, content=question),
-            conversation_id=self.conversation_id,
+            conversation_id=conversation_id,
             stream=True,
         )
 
-        async with httpx.AsyncClient() as client:
+        with stage("backend_stream"):
             try:
-                async with client.stream(
+                async with self._client.stream(
                     "POST",
-                    f"{self.base_url}{APIEndpoints.BACKEND_CHAT_STREAM}",
-                    json=request.model_dump(),
-                    headers={"X-API-Key": self.api_key},
-                    timeout=60.0,
+                    APIEndpoints.BACKEND_CHAT_STREAM,
+                    content=encode_json(request),
+                    headers=inject_trace_headers(dict(JSON_HEADERS)),
                 ) as response:
-                    # Store conversation ID from response header
-                    if "X-Conversation-ID" in response.headers:
-                        self.conversation_id = response.headers["X-Conversation-ID"]
-
                     if response.status_code != 200:
                         error_text = await response.aread()
                         yield ChatMessage(
@@ -53,21 +105,26 @@ class BackendClient:
                         return
 
                     async for line in response.aiter_lines():
-                        if line.startswith("data: "):
-                            data = json.loads(line[6:])
-                            chunk = StreamChunk(**data)
-                            if chunk.error:
-                                yield ChatMessage(
-                                    role=MessageRole.ASSISTANT,
-                                    content=f"Error: {chunk.error}",
-                                )
-                                return
-                            if chunk.content:
-                                yield ChatMessage(
-                                    role=MessageRole.ASSISTANT, content=chunk.content
-                                )
-                            if chunk.done:
-                                return
+                        chunk = decode_sse_line(line)
+                        if chunk is None:
+                            continue
+                        if chunk.error:
+                            yield ChatMessage(
+                                role=MessageRole.ASSISTANT,
+                                content=f"Error: {chunk.error}",
+                            )
+                            return
+                        if chunk.status:
+                            # Progress of the pipeline, shown next to the spinner
+                            yield ChatMessage(
+                                role=MessageRole.SYSTEM, content=chunk.status
+                            )
+                        if chunk.content:
+                            yield ChatMessage(
+                                role=MessageRole.ASSISTANT, content=chunk.content
+                            )
+                        if chunk.done:
+                            return
             except httpx.ConnectError:
                 yield ChatMessage(
                     role=MessageRole.ASSISTANT,
@@ -82,7 +139,10 @@ class BackendClient:
 class FakeLLMGenerator:
     """Fallback generator when backend is not available."""
 
-    async def astream(self, question: str):
+    async def history(self, conversation_id: str) -> list[ChatMessage]:
+        return []
+
+    async def astream(self, question: str, conversation_id: str):
         chunks = [
             "Hello! ",
             "This is a simulated response ",
@@ -94,30 +154,113 @@ class FakeLLMGenerator:
             yield ChatMessage(role=MessageRole.ASSISTANT, content=chunk)
 
 
+backend_client = BackendClient()
+app.on_startup(backend_client.start)
+app.on_shutdown(backend_client.close)
+
+
+@app.get("/metrics")
+async def metrics() -> Response:
+    """Prometheus metrics endpoint."""
+    payload, content_type = metrics_payload()
+    return Response(content=payload, media_type=content_type)
+
+
 def root():
-    # Use BackendClient by default, can switch to FakeLLMGenerator for testing
-    llm = BackendClient()
+    # Shared BackendClient by default, can switch to FakeLLMGenerator for testing
+    llm = backend_client
+
+    # Kept in the browser session, so a reload continues the same conversation
+    storage = app.storage.user
+
+    # Streams of this page, cancelled when the browser disconnects so the
+    # backend (and the LLM behind it) stops working on an unseen answer
+    active_streams: set[asyncio.Task] = set()
+
+    def cancel_streams() -> None:
+        for task in active_streams:
+            task.cancel()
+
+    ui.context.client.on_disconnect(cancel_streams)
+
+    def show_message(message: ChatMessage) -> None:
+        if message.role == MessageRole.USER:
+            ui.chat_message(text=message.content, name="You", sent=True)
+        elif message.role == MessageRole.ASSISTANT:
+            with ui.chat_message(name="Bot", sent=False):
+                ui.html(message.content, sanitize=False)
+                if message.truncated:
+                    ui.label("(interrupted)").classes("text-xs text-grey")
+
+    async def rehydrate() -> None:
+        # Loaded after the page is shown, the history is not needed to render it
+        conversation_id = storage.get("conversation_id")
+        if conversation_id is None:
+            return
+        messages = await llm.history(conversation_id)
+        if not messages:
+            return
+        with message_container:
+            for message in messages:
+                show_message(message)
+        ui.run_javascript("window.scrollTo(0, document.body.scrollHeight)")
+
+    def new_conversation() -> None:
+        storage.pop("conversation_id", None)
+        message_container.clear()
 
     async def send() -> None:
+        task = asyncio.current_task()
+        active_streams.add(task)
+        try:
+            await answer()
+        finally:
+            active_streams.discard(task)
+
+    async def answer() -> None:
         question = text.value
         text.value = ""
+        if "conversation_id" not in storage:
+            storage["conversation_id"] = str(uuid.uuid4())
+        conversation_id = storage["conversation_id"]
 
         with message_container:
             ui.chat_message(text=question, name="You", sent=True)
-            response_message = ui.chat_message(name="Bot", sent=False)
+            with ui.chat_message(name="Bot", sent=False):
+                # One element for the whole answer, updated in place
+                response_html = ui.html("", sanitize=False)
             spinner = ui.spinner(type="dots")
+            status = ui.label().classes("text-xs text-grey")
+
+        answer_buffer = AnswerBuffer()
 
-        response = ""
-        async for chunk in llm.astream(question):
-            response += chunk.content
-            with response_message.clear():
-                ui.html(response, sanitize=False)
+        def render() -> None:
+            # At most once per render interval and only when something new arrived,
+            # instead of pushing the whole answer and a scroll for every chunk
+            content = answer_buffer.pending()
+            if content is None:
+                return
+            response_html.set_content(content)
             ui.run_javascript("window.scrollTo(0, document.body.scrollHeight)")
+
+        with message_container:
+            render_timer = ui.timer(get_settings().render_interval_seconds, render)
+        try:
+            async for chunk in llm.astream(question, conversation_id):
+                if chunk.role == MessageRole.SYSTEM:
+                    status.text = chunk.content
+                    continue
+                answer_buffer.append(chunk.content)
+        finally:
+            render_timer.cancel()
+        render()
         message_container.remove(spinner)
+        message_container.remove(status)
 
     message_container = ui.column().classes(
         "w-full max-w-2xl mx-auto flex-grow items-stretch"
     )
+    ui.timer(0, rehydrate, once=True)
 
     with (
         ui.footer().classes("bg-white"),
@@ -131,6 +274,9 @@ def root():
                 .classes("w-full self-center")
                 .on("keydown.enter", send)
             )
+            ui.button(icon="add_comment", on_click=new_conversation).props(
+                "flat round"
+            ).tooltip("New conversation")
         ui.markdown("simple chat app built with [NiceGUI](https://nicegui.io)").classes(
             "text-xs self-end mr-8 m-[-1em] text-primary"
         ).classes("[&_a]:text-inherit [&_a]:no-underline [&_a]:font-medium")
@@ -138,4 +284,16 @@ def root():
 
 if __name__ in {"__main__", "__mp_main__"}:
     print("Using setting,", get_settings())
-    ui.run(root, title="Chat with Me...", port=get_settings().port)
+    setup_tracing(
+        "frontend", get_settings().tracing_exporter, get_settings().otlp_endpoint
+    )
+    storage_secret = get_settings().storage_secret
+    if storage_secret is None:
+        print("FRONTEND_STORAGE_SECRET not set, sessions end with the process")
+        storage_secret = secrets.token_urlsafe(32)
+    ui.run(
+        root,
+        title="Chat with Me...",
+        port=get_settings().port,
+        storage_secret=storage_secret,
+    )
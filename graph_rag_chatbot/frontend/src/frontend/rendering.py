@@ -0,0 +1,21 @@
+class AnswerBuffer:
+    """
+    Chunks of a streamed answer, rendered by a timer instead of per chunk.
+
+    pending() returns the whole answer only when chunks arrived since its
+    last call, so a timer tick without news pushes nothing to the browser.
+    """
+
+    def __init__(self) -> None:
+        self._parts: list[str] = []
+        self._rendered = 0
+
+    def append(self, text: str) -> None:
+        self._parts.append(text)
+
+    def pending(self) -> str | None:
+        """The answer so far if it changed since the last call, else None."""
+        if self._rendered == len(self._parts):
+            return None
+        self._rendered = len(self._parts)
+        return "".join(self._parts)
@@ -0,0 +1,14 @@
+from rendering import AnswerBuffer
+
+
+def test_pending_only_reports_new_content():
+    buffer = AnswerBuffer()
+    assert buffer.pending() is None
+
+    buffer.append("Robotika")
+    buffer.append(" v Brně")
+    assert buffer.pending() == "Robotika v Brně"
+    assert buffer.pending() is None
+
+    buffer.append("!")
+    assert buffer.pending() == "Robotika v Brně!"
@@ -0,0 +1,180 @@
+"""
+API key registry shared by the services.
+
+Keys are loaded from a JSON file into an in-memory map keyed by their
+SHA-256 digest, so a lookup is one hash and one dict access that takes the
+same time whatever the presented key shares with a stored one; no secret
+is ever compared byte by byte. The file is re-read when it changes.
+Services authenticate requests with the FastAPI dependency returned by
+api_key_verifier.
+
+Example file:
+    {
+        "keys": [
+            {"key_sha256": "<hex digest>", "name": "frontend", "tier": "internal",
+             "rate_limit_requests": 1000, "max_concurrent_streams": 50},
+            {"key": "plain-text-key", "name": "partner", "tier": "free",
+             "rate_limit_requests": 20, "max_concurrent_streams": 2}
+        ]
+    }
+"""
+
+import hashlib
+import json
+import os
+import time
+from dataclasses import dataclass
+from typing import Awaitable, Callable
+
+from fastapi import HTTPException, Security, status
+from fastapi.security import APIKeyHeader
+
+api_key_header = APIKeyHeader(name="X-API-Key", auto_error=False)
+
+
+@dataclass(frozen=True)
+class ApiKeyInfo:
+    name: str
+    tier: str = "default"
+    # Per key and rate limit window, None = global only
+    rate_limit_requests: int | None = None
+    max_concurrent_streams: int | None = None  # None = global cap only
+
+
+def key_digest(api_key: str) -> bytes:
+    return hashlib.sha256(api_key.encode()).digest()
+
+
+class ApiKeyRegistry:
+    def __init__(
+        self,
+        path: str | None = None,
+        fallback_key: str | None = None,
+        reload_interval_seconds: float = 5.0,
+    ) -> None:
+        """
+        Args:
+            path: JSON file with the keys, optional
+            fallback_key: Single key accepted in addition, e.g. from settings
+            reload_interval_seconds: How often the file is checked for changes
+        """
+        self.path = path
+        self.fallback_key = fallback_key
+        self.reload_interval_seconds = reload_interval_seconds
+        self._keys: dict[bytes, ApiKeyInfo] = {}
+        self._mtime: float | None = None
+        self._checked_at = 0.0
+        self._load()
+
+    def _load(self) -> None:
+        keys: dict[bytes, ApiKeyInfo] = {}
+        if self.fallback_key:
+            keys[key_digest(self.fallback_key)] = ApiKeyInfo(name="default")
+
+        if self.path and os.path.exists(self.path):
+            self._mtime = os.path.getmtime(self.path)
+            with open(self.path, encoding="utf-8") as f:
+                entries = json.load(f).get("keys", [])
+            for entry in entries:
+                fields = dict(entry)
+                if "key" in fields:
+                    digest = key_digest(fields.pop("key"))
+                else:
+                    digest = bytes.fromhex(fields.pop("key_sha256"))
+                keys[digest] = ApiKeyInfo(**fields)
+
+        # Swap the whole map at once, lookups never see a half-loaded registry
+        self._keys = keys
+
+    def _maybe_reload(self) -> None:
+        now = time.monotonic()
+        if not self.path or now - self._checked_at < self.reload_interval_seconds:
+            return
+        self._checked_at = now
+        try:
+            mtime = os.path.getmtime(self.path)
+        except OSError:
+            return
+        if mtime != self._mtime:
+            try:
+                self._load()
+                print(f"Reloaded API keys from {self.path}")
+            except (OSError, ValueError, TypeError, KeyError) as e:
+                # Keep serving with the previous keys
+                print(f"Failed to reload API keys from {self.path}: {e}")
+
+    def lookup(self, api_key: str) -> ApiKeyInfo | None:
+        """Metadata of a valid key, None for an unknown key."""
+        self._maybe_reload()
+        # Only digests are looked up, so timing reveals nothing about stored keys
+        return self._keys.get(key_digest(api_key))
+
+
+class FailureLogger:
+    """Logs failed authentication attempts at most once per interval."""
+
+    def __init__(self, interval_seconds: float = 10.0) -> None:
+        self.interval_seconds = interval_seconds
+        self._last_logged = 0.0
+        self._suppressed = 0
+
+    def log(self, reason: str, api_key: str | None) -> None:
+        now = time.monotonic()
+        if now - self._last_logged < self.interval_seconds:
+            self._suppressed += 1
+            return
+        # Never log the key or a part of it, a short digest still tells keys apart
+        hint = f"sha256:{key_digest(api_key).hex()[:8]}" if api_key else "<none>"
+        suppressed = (
+            f" ({self._suppressed} similar suppressed)" if self._suppressed else ""
+        )
+        print(f"Authentication failed: {reason}, key {hint}{suppressed}")
+        self._last_logged = now
+        self._suppressed = 0
+
+
+def api_key_verifier(
+    registry: ApiKeyRegistry, failure_logger: FailureLogger | None = None
+) -> Callable[..., Awaitable[ApiKeyInfo]]:
+    """
+    FastAPI dependency authenticating requests against the registry.
+
+    Args:
+        registry: Keys accepted by the service
+        failure_logger: Logger of failed attempts, a new one by default
+    """
+    failure_logger = failure_logger or FailureLogger()
+
+    async def verify_api_key(
+        api_key: str | None = Security(api_key_header),
+    ) -> ApiKeyInfo:
+        """
+        Verify the API key from the request header.
+
+        Args:
+            api_key: The API key from X-API-Key header
+
+        Returns:
+            Metadata of the validated API key (name, tier, quotas)
+
+        Raises:
+            HTTPException: If API key is missing or invalid
+        """
+        if api_key is None:
+            failure_logger.log("missing key", None)
+            raise HTTPException(
+                status_code=status.HTTP_401_UNAUTHORIZED,
+                detail="Missing API key. Please provide X-API-Key header.",
+            )
+
+        key_info = registry.lookup(api_key)
+        if key_info is None:
+            failure_logger.log("invalid key", api_key)
+            raise HTTPException(
+                status_code=status.HTTP_403_FORBIDDEN,
+                detail="Invalid API key.",
+            )
+
+        return key_info
+
+    return verify_api_key
@@ -0,0 +1,52 @@
+"""
+Fast JSON encoding of the shared models for the streaming hot path.
+
+pydantic-core serializes models straight to JSON bytes and parses JSON
+straight into models, without the intermediate dicts and the stdlib json
+module that model_dump() + json.dumps() / json.loads() + Model(**data) need.
+"""
+
+from functools import cache
+from typing import TypeVar
+
+from pydantic import BaseModel, TypeAdapter
+
+from interfaces.models import StreamChunk
+
+ModelT = TypeVar("ModelT", bound=BaseModel)
+
+SSE_PREFIX = "data: "
+JSON_HEADERS = {"Content-Type": "application/json"}
+
+_STREAM_CHUNK = TypeAdapter(StreamChunk)
+
+
+@cache
+def _adapter(model_type: type[ModelT]) -> TypeAdapter[ModelT]:
+    return TypeAdapter(model_type)
+
+
+def encode_json(model: BaseModel) -> bytes:
+    """Serialize a model (e.g. ChatRequest, DatabaseChatRequest) to JSON bytes."""
+    return _adapter(type(model)).dump_json(model)
+
+
+def decode_json(model_type: type[ModelT], data: str | bytes) -> ModelT:
+    """Parse JSON directly into a model."""
+    return _adapter(model_type).validate_json(data)
+
+
+def encode_sse(chunk: StreamChunk) -> bytes:
+    """Encode a chunk as one SSE event."""
+    return b"data: " + _STREAM_CHUNK.dump_json(chunk) + b"\n\n"
+
+
+def decode_sse_line(line: str) -> StreamChunk | None:
+    """Parse one SSE line, None for lines that carry no data."""
+    if not line.startswith(SSE_PREFIX):
+        return None
+    return _STREAM_CHUNK.validate_json(line[len(SSE_PREFIX) :])
+
+
+# Terminal event of every stream, encoded once
+DONE_EVENT = encode_sse(StreamChunk(content="", done=True))
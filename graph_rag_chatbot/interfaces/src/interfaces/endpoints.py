@@ -6,6 +6,7 @@ class APIEndpoints:
     # Chat endpoints
     BACKEND_CHAT: str = "/chat"
     BACKEND_CHAT_STREAM: str = "/chat/stream"
+    BACKEND_CHAT_HISTORY: str = "/chat/history/{conversation_id}"
 
     # Database endpoints
     DATABASE_CHAT_STREAM: str = "/chat/stream"
@@ -14,6 +14,7 @@ class ChatMessage(BaseModel):
     role: MessageRole
     content: str
     timestamp: Optional[datetime] = None
+    truncated: bool = False  # Stream was interrupted before the answer finished
 
 
 class ChatRequest(BaseModel):
@@ -33,7 +34,13 @@ class ChatResponse(BaseModel):
     sources: Optional[List[str]] = None
 
 
+class ConversationHistoryResponse(BaseModel):
+    conversation_id: str
+    messages: List[ChatMessage] = []
+
+
 class StreamChunk(BaseModel):
     content: str
     done: bool = False
     error: Optional[str] = None
+    status: Optional[str] = None  # Progress of the pipeline, not part of the answer
@@ -0,0 +1,86 @@
+import asyncio
+from contextlib import suppress
+from typing import AsyncIterator
+
+from interfaces.models import StreamChunk
+
+
+async def coalesce_chunks(
+    chunks: AsyncIterator[StreamChunk],
+    max_bytes: int,
+    max_delay_seconds: float,
+) -> AsyncIterator[StreamChunk]:
+    """
+    Batch small content chunks into fewer, larger ones.
+
+    Content is buffered until max_bytes is reached or max_delay_seconds has
+    passed since the first buffered token, whichever comes first. The very
+    first content chunk is sent immediately to keep time-to-first-token low.
+    Chunks carrying a status, an error or done flush the buffer and are
+    passed through unchanged.
+
+    Args:
+        chunks: Source of chunks, typically one per LLM token
+        max_bytes: Flush once this many UTF-8 bytes are buffered
+        max_delay_seconds: Flush at the latest this long after the first buffered token
+    """
+    loop = asyncio.get_running_loop()
+    source = aiter(chunks)
+    pending: list[str] = []
+    pending_bytes = 0
+    deadline: float | None = None
+    first_content = True
+    next_chunk: asyncio.Future | None = None
+
+    def flush() -> StreamChunk:
+        nonlocal pending, pending_bytes, deadline
+        chunk = StreamChunk(content="".join(pending))
+        pending, pending_bytes, deadline = [], 0, None
+        return chunk
+
+    try:
+        while True:
+            if next_chunk is None:
+                next_chunk = asyncio.ensure_future(anext(source))
+            timeout = None if deadline is None else max(0.0, deadline - loop.time())
+            done, _ = await asyncio.wait({next_chunk}, timeout=timeout)
+            if not done:
+                # Deadline hit while the source is still producing
+                yield flush()
+                continue
+
+            finished, next_chunk = next_chunk, None
+            try:
+                chunk = finished.result()
+            except StopAsyncIteration:
+                break
+
+            if chunk.status or chunk.error or chunk.done:
+                if pending:
+                    yield flush()
+                yield chunk
+                continue
+            if not chunk.content:
+                continue
+            if first_content:
+                first_content = False
+                yield chunk
+                continue
+
+            pending.append(chunk.content)
+            pending_bytes += len(chunk.content.encode())
+            if deadline is None:
+                deadline = loop.time() + max_delay_seconds
+            if pending_bytes >= max_bytes:
+                yield flush()
+
+        if pending:
+            yield flush()
+    finally:
+        if next_chunk is not None:
+            next_chunk.cancel()
+            # The step may also have finished the source before being cancelled
+            with suppress(asyncio.CancelledError, StopAsyncIteration):
+                await next_chunk
+        if hasattr(source, "aclose"):
+            await source.aclose()
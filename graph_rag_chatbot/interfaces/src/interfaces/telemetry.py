@@ -0,0 +1,140 @@
+"""
+Tracing and per-stage latency metrics shared by all services.
+
+Trace context is propagated between services with the W3C `traceparent`
+header, every stage gets a span and its duration is recorded in a
+Prometheus histogram exposed on /metrics.
+"""
+
+import time
+from contextlib import contextmanager
+from typing import Iterator, Literal, Mapping
+
+from opentelemetry import context, propagate, trace
+from opentelemetry.sdk.resources import Resource
+from opentelemetry.sdk.trace import TracerProvider
+from opentelemetry.sdk.trace.export import BatchSpanProcessor, ConsoleSpanExporter
+from prometheus_client import CONTENT_TYPE_LATEST, Histogram, generate_latest
+
+TracingExporter = Literal["none", "console", "otlp"]
+
+STAGE_SECONDS = Histogram(
+    "chat_stage_duration_seconds",
+    "Duration of a stage of the chat pipeline.",
+    ["service", "stage"],
+    buckets=(0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 20, 40, 60),
+)
+
+_service_name = "unknown"
+
+# Stage of requests that matched no route, e.g. 404s
+UNMATCHED_ROUTE = "unmatched"
+
+
+def setup_tracing(
+    service_name: str,
+    exporter: TracingExporter = "none",
+    otlp_endpoint: str = "http://localhost:4318/v1/traces",
+) -> None:
+    """
+    Configure the global tracer provider for this service.
+
+    Args:
+        service_name: Name reported on spans and metrics
+        exporter: "console" prints spans as JSON, "otlp" sends them to a collector
+        otlp_endpoint: OTLP/HTTP traces endpoint of the collector
+    """
+    global _service_name
+    _service_name = service_name
+
+    provider = TracerProvider(resource=Resource.create({"service.name": service_name}))
+    if exporter == "console":
+        provider.add_span_processor(BatchSpanProcessor(ConsoleSpanExporter()))
+    elif exporter == "otlp":
+        # Imported here as only deployments with a collector need it
+        from opentelemetry.exporter.otlp.proto.http.trace_exporter import (
+            OTLPSpanExporter,
+        )
+
+        provider.add_span_processor(
+            BatchSpanProcessor(OTLPSpanExporter(endpoint=otlp_endpoint))
+        )
+    trace.set_tracer_provider(provider)
+
+
+def inject_trace_headers(headers: dict[str, str] | None = None) -> dict[str, str]:
+    """Add the current trace context (traceparent) to outgoing HTTP headers."""
+    headers = dict(headers or {})
+    propagate.inject(headers)
+    return headers
+
+
+@contextmanager
+def stage(name: str, **attributes) -> Iterator[trace.Span]:
+    """
+    Span and duration histogram for one stage of the pipeline.
+
+    Args:
+        name: Stage name, e.g. "generate_cypher"
+        attributes: Extra span attributes
+    """
+    tracer = trace.get_tracer(_service_name)
+    started = time.perf_counter()
+    with tracer.start_as_current_span(name, attributes=attributes) as span:
+        try:
+            yield span
+        finally:
+            STAGE_SECONDS.labels(_service_name, name).observe(
+                time.perf_counter() - started
+            )
+
+
+def metrics_payload() -> tuple[bytes, str]:
+    """Prometheus exposition of all metrics and its content type."""
+    return generate_latest(), CONTENT_TYPE_LATEST
+
+
+class TracingMiddleware:
+    """
+    ASGI middleware starting a server span for each HTTP request.
+
+    The span is continued from the incoming traceparent header and stays
+    open until the response body, including SSE streams, is fully sent.
+    Requests are recorded under their route template, not the raw path.
+    """
+
+    def __init__(self, app, excluded_paths: tuple[str, ...] = ("/health", "/metrics")):
+        self.app = app
+        self.excluded_paths = excluded_paths
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or scope["path"] in self.excluded_paths:
+            await self.app(scope, receive, send)
+            return
+
+        headers: Mapping[str, str] = {
+            key.decode("latin-1"): value.decode("latin-1")
+            for key, value in scope["headers"]
+        }
+        method = scope["method"]
+        token = context.attach(propagate.extract(headers))
+        tracer = trace.get_tracer(_service_name)
+        started = time.perf_counter()
+        try:
+            with tracer.start_as_current_span(
+                method, attributes={"http.method": method}
+            ) as span:
+                try:
+                    await self.app(scope, receive, send)
+                finally:
+                    # The route template is known only after routing, raw paths
+                    # would give the metrics one label per conversation id
+                    route = getattr(scope.get("route"), "path_format", None)
+                    name = f"{method} {route}" if route else UNMATCHED_ROUTE
+                    span.update_name(name)
+                    span.set_attribute("http.route", route or UNMATCHED_ROUTE)
+                    STAGE_SECONDS.labels(_service_name, name).observe(
+                        time.perf_counter() - started
+                    )
+        finally:
+            context.detach(token)
@@ -0,0 +1,83 @@
+import hashlib
+import json
+import os
+
+from fastapi import Depends, FastAPI
+from fastapi.testclient import TestClient
+from interfaces.api_keys import (
+    ApiKeyInfo,
+    ApiKeyRegistry,
+    FailureLogger,
+    api_key_verifier,
+)
+
+
+def write_keys(path, entries, mtime: float) -> None:
+    path.write_text(json.dumps({"keys": entries}), encoding="utf-8")
+    # Distinct modification times, the registry reloads on an mtime change
+    os.utime(path, (mtime, mtime))
+
+
+def test_lookup_of_plain_and_hashed_keys(tmp_path):
+    path = tmp_path / "keys.json"
+    digest = hashlib.sha256(b"hashed-key").hexdigest()
+    write_keys(
+        path,
+        [
+            {"key": "plain-key", "name": "partner", "rate_limit_requests": 20},
+            {"key_sha256": digest, "name": "frontend", "tier": "internal"},
+        ],
+        mtime=1000,
+    )
+    registry = ApiKeyRegistry(str(path), fallback_key="fallback-key")
+
+    assert registry.lookup("plain-key") == ApiKeyInfo(
+        name="partner", rate_limit_requests=20
+    )
+    assert registry.lookup("hashed-key").tier == "internal"
+    assert registry.lookup("fallback-key").name == "default"
+    assert registry.lookup("unknown-key") is None
+
+
+def test_changed_file_is_reloaded(tmp_path):
+    path = tmp_path / "keys.json"
+    write_keys(path, [{"key": "old-key", "name": "old"}], mtime=1000)
+    registry = ApiKeyRegistry(str(path), reload_interval_seconds=0.0)
+    assert registry.lookup("old-key").name == "old"
+
+    write_keys(path, [{"key": "new-key", "name": "new"}], mtime=2000)
+    assert registry.lookup("new-key").name == "new"
+    assert registry.lookup("old-key") is None
+
+
+def test_broken_file_keeps_the_previous_keys(tmp_path):
+    path = tmp_path / "keys.json"
+    write_keys(path, [{"key": "old-key", "name": "old"}], mtime=1000)
+    registry = ApiKeyRegistry(str(path), reload_interval_seconds=0.0)
+
+    path.write_text("{not json", encoding="utf-8")
+    os.utime(path, (2000, 2000))
+    assert registry.lookup("old-key").name == "old"
+
+
+def test_failure_log_never_contains_the_key(capsys):
+    FailureLogger().log("invalid key", "secret-key-value")
+    output = capsys.readouterr().out
+    assert "secr" not in output
+    assert hashlib.sha256(b"secret-key-value").hexdigest()[:8] in output
+
+
+def test_verifier_dependency():
+    verify_api_key = api_key_verifier(ApiKeyRegistry(fallback_key="good-key"))
+    app = FastAPI()
+
+    @app.get("/")
+    async def whoami(api_key: ApiKeyInfo = Depends(verify_api_key)) -> dict:
+        return {"name": api_key.name}
+
+    client = TestClient(app)
+    assert client.get("/", headers={"X-API-Key": "good-key"}).json() == {
+        "name": "default"
+    }
+    assert client.get("/").status_code == 401
+    assert client.get("/", headers={"X-API-Key": "bad-key"}).status_code == 403
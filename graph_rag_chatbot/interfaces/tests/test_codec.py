@@ -0,0 +1,50 @@
+import json
+from datetime import datetime
+
+from interfaces.codec import (
+    DONE_EVENT,
+    decode_json,
+    decode_sse_line,
+    encode_json,
+    encode_sse,
+)
+from interfaces.models import ChatMessage, DatabaseChatRequest, MessageRole, StreamChunk
+
+
+def test_sse_round_trip():
+    chunk = StreamChunk(content='Ahoj, světe "\n', status="Vyhledávám…")
+    event = encode_sse(chunk)
+    assert event.startswith(b"data: ") and event.endswith(b"\n\n")
+    assert decode_sse_line(event.decode().rstrip("\n")) == chunk
+
+
+def test_sse_matches_stdlib_json():
+    chunk = StreamChunk(content="ř", error="x")
+    data = encode_sse(chunk)[len(b"data: ") :]
+    assert json.loads(data) == chunk.model_dump()
+
+
+def test_lines_without_data_are_skipped():
+    assert decode_sse_line("") is None
+    assert decode_sse_line(": keep-alive") is None
+
+
+def test_done_event():
+    assert decode_sse_line(DONE_EVENT.decode().strip()) == StreamChunk(
+        content="", done=True
+    )
+
+
+def test_request_round_trip():
+    request = DatabaseChatRequest(
+        query=ChatMessage(role=MessageRole.USER, content="Kde je Brno?"),
+        history=[
+            ChatMessage(
+                role=MessageRole.ASSISTANT,
+                content="Na Moravě.",
+                timestamp=datetime(2025, 1, 2, 3, 4, 5),
+                truncated=True,
+            )
+        ],
+    )
+    assert decode_json(DatabaseChatRequest, encode_json(request)) == request
@@ -0,0 +1,69 @@
+import asyncio
+
+from interfaces.models import StreamChunk
+from interfaces.streaming import coalesce_chunks
+
+
+async def source(items, delay: float = 0.0):
+    for item in items:
+        if delay:
+            await asyncio.sleep(delay)
+        yield item
+
+
+def collect(
+    chunks, max_bytes=10, max_delay_seconds=10.0, delay=0.0
+) -> list[StreamChunk]:
+    async def scenario():
+        stream = coalesce_chunks(source(chunks, delay), max_bytes, max_delay_seconds)
+        return [chunk async for chunk in stream]
+
+    return asyncio.run(scenario())
+
+
+def tokens(*contents: str) -> list[StreamChunk]:
+    return [StreamChunk(content=content) for content in contents]
+
+
+def test_first_token_is_sent_alone_and_the_rest_batched():
+    output = collect(tokens("A", "hoj", " sv", "ěte", "!"), max_bytes=6)
+    assert [chunk.content for chunk in output] == ["A", "hoj sv", "ěte!"]
+
+
+def test_status_and_done_flush_and_pass_through():
+    status = StreamChunk(content="", status="Hledám…")
+    done = StreamChunk(content="", done=True)
+    output = collect([*tokens("a", "b"), status, *tokens("c"), done])
+    assert output == [*tokens("a", "b"), status, *tokens("c"), done]
+
+
+def test_empty_content_is_dropped():
+    assert collect(tokens("a", "", "b")) == tokens("a", "b")
+
+
+def test_buffer_is_flushed_after_the_delay():
+    # Tokens arrive slower than the delay, so none of them wait for the next one
+    output = collect(
+        tokens("a", "b", "c"), max_bytes=100, max_delay_seconds=0.01, delay=0.05
+    )
+    assert output == tokens("a", "b", "c")
+
+
+def test_closing_early_closes_the_source():
+    closed = []
+
+    async def endless():
+        try:
+            while True:
+                yield StreamChunk(content="x")
+                await asyncio.sleep(0)
+        finally:
+            closed.append(True)
+
+    async def scenario():
+        stream = coalesce_chunks(endless(), max_bytes=1, max_delay_seconds=1.0)
+        assert (await anext(stream)).content == "x"
+        await stream.aclose()
+
+    asyncio.run(scenario())
+    assert closed == [True]